@@ -1,24 +1,114 @@
 import discord
 from discord.ext import commands
+import ast
+import asyncio
+import hashlib
+import importlib
+import importlib.util
+import json
 import os
+import time
 from config import GUILD_ID
+from utils import metrics, storage
+
+class InstrumentedBot(commands.Bot):
+    """Bot that times every slash command and listener of the cogs it loads"""
+
+    async def add_cog(self, cog, **kwargs):
+        metrics.instrument(cog)
+        await super().add_cog(cog, **kwargs)
 
 intents = discord.Intents.all()
-bot = commands.Bot(command_prefix="/", intents=intents)  # prefix here is ignored for slash commands
+bot = InstrumentedBot(command_prefix="/", intents=intents)  # prefix here is ignored for slash commands
+
+# Hash of the last command tree pushed to Discord; delete the file to force a sync
+SYNC_FILE = "command_sync.json"
 
 @bot.event
 async def on_ready():
+    print(f"✅ Logged in as {bot.user}")
+
+def tree_hash(guild):
+    """Stable hash of the payload tree.sync() would upload for a guild"""
+    payload = sorted(
+        (command.to_dict(bot.tree) for command in bot.tree.get_commands(guild=guild)),
+        key=lambda command: (command.get("type", 1), command["name"])
+    )
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+async def sync_tree():
+    """Push slash commands to Discord only when they changed since the last sync"""
     guild = discord.Object(id=GUILD_ID)
+    state = storage.open_store(SYNC_FILE)
+    digest = tree_hash(guild)
+    if state.get(str(GUILD_ID)) == digest:
+        print("✅ Command tree unchanged, skipping sync")
+        return
     await bot.tree.sync(guild=guild)
-    print(f"✅ Logged in as {bot.user}")
+    state[str(GUILD_ID)] = digest
+    print(f"🔄 Synced {len(bot.tree.get_commands(guild=guild))} commands")
+
+def prepare_cog(name):
+    """Import a cog's dependencies and read the files it opens as stores (runs in a worker thread)
+
+    The cog module itself isn't executed here: load_extension always runs it
+    afresh, so only what its imports and open_store() calls name is warmed up.
+    """
+    with open(importlib.util.find_spec(name).origin, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    constants = {}
+    for node in tree.body:
+        try:
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    importlib.import_module(alias.name)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0:
+                module = importlib.import_module(node.module)
+                for alias in node.names:
+                    if not hasattr(module, alias.name):
+                        importlib.import_module(f"{node.module}.{alias.name}")
+        except ImportError:
+            pass  # load_extension reports it with the cog's name
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    constants[target.id] = node.value.value
+    paths = []
+    for node in ast.walk(tree):
+        func = getattr(node, "func", None)
+        if isinstance(node, ast.Call) and getattr(func, "attr", getattr(func, "id", None)) == "open_store" and node.args:
+            arg = node.args[0]
+            path = arg.value if isinstance(arg, ast.Constant) else constants.get(getattr(arg, "id", None))
+            if isinstance(path, str):
+                paths.append(path)
+    storage.preload(*paths)
+
+async def load_cog(name):
+    start = time.perf_counter()
+    await asyncio.to_thread(prepare_cog, name)
+    prepared = time.perf_counter()
+    # Executes the cog module and its setup(); its imports and store files are already loaded
+    await bot.load_extension(name)
+    return name, prepared - start, time.perf_counter() - prepared
 
 async def load_cogs():
-    for file in os.listdir("./cogs"):
-        if file.endswith(".py"):
-            await bot.load_extension(f"cogs.{file[:-3]}")
+    start = time.perf_counter()
+    names = [f"cogs.{file[:-3]}" for file in sorted(os.listdir("./cogs")) if file.endswith(".py")]
+    timings = await asyncio.gather(*(load_cog(name) for name in names))
+    print(f"✅ Loaded {len(names)} cogs in {(time.perf_counter() - start) * 1000:.0f} ms")
+    for name, prepare, setup in sorted(timings, key=lambda t: t[1] + t[2], reverse=True):
+        print(f"   {name[5:]:<18} prepare {prepare * 1000:7.1f} ms | setup {setup * 1000:7.1f} ms")
 
 @bot.event
 async def setup_hook():
     await load_cogs()
+    # setup_hook runs once per process, so reconnects never re-sync
+    try:
+        await sync_tree()
+    except Exception as e:
+        # The digest is only saved after a successful sync, so the next start retries
+        print(f"⚠️ Command sync failed, keeping the commands Discord already has: {e}")
 
-bot.run("YOUR_BOT_TOKEN")
+# Image workers are spawned processes that re-import this module, so only start the bot when run directly
+if __name__ == "__main__":
+    bot.run("YOUR_BOT_TOKEN")
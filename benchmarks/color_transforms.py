@@ -0,0 +1,81 @@
+"""Colour effect cost per avatar, per-pixel Python loops vs utils.color_transforms
+
+Run from the repository root:
+    python -m benchmarks.color_transforms --sizes 256 512 1024
+
+"before" is what Images did originally (sepia via pixels[x, y]/putpixel, invert
+via Image.eval). "after" is the colour-matrix / lookup-table version. The max
+channel difference column checks the outputs still agree.
+"""
+import argparse
+import os
+import time
+
+from PIL import Image, ImageChops
+
+from utils import color_transforms
+
+
+def legacy_sepia(image):
+    image = image.convert("RGB")
+    sepia_image = Image.new("RGB", image.size)
+    pixels = image.load()
+    for x in range(image.width):
+        for y in range(image.height):
+            r, g, b = pixels[x, y]
+            tr = int(0.393*r + 0.769*g + 0.189*b)
+            tg = int(0.349*r + 0.686*g + 0.168*b)
+            tb = int(0.272*r + 0.534*g + 0.131*b)
+            sepia_image.putpixel((x, y), (min(tr,255), min(tg,255), min(tb,255)))
+    return sepia_image
+
+
+def legacy_invert(image):
+    return Image.eval(image.convert("RGB"), lambda x: 255 - x)
+
+
+CASES = [
+    ("sepia", legacy_sepia, color_transforms.sepia),
+    ("invert", legacy_invert, color_transforms.invert),
+    ("grayscale", lambda image: image.convert("L"), color_transforms.grayscale),
+    ("tint", None, lambda image: color_transforms.tint(image, (255, 128, 0), 0.5)),
+]
+
+
+def max_diff(a, b):
+    extrema = ImageChops.difference(a, b.convert(a.mode)).getextrema()
+    if a.mode == "L":
+        extrema = [extrema]
+    return max(hi for _, hi in extrema)
+
+
+def timed(fn, image, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(image)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 512, 1024])
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    args = parser.parse_args()
+    for size in args.sizes:
+        image = Image.frombytes("RGB", (size, size), os.urandom(size * size * 3))
+        for name, before, after in CASES:
+            after_ms, new = timed(after, image, args.repeat)
+            if before is None:
+                print(f"{size:>5}px {name:>9} | before        - | after {after_ms:9.2f} ms")
+                continue
+            before_ms, old = timed(before, image, 1 if name == "sepia" else args.repeat)
+            print(
+                f"{size:>5}px {name:>9} | before {before_ms:9.2f} ms | after {after_ms:9.2f} ms | "
+                f"{before_ms / after_ms:7.1f}x | max channel diff {max_diff(old, new)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
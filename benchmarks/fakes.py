@@ -0,0 +1,285 @@
+"""Offline stand-ins for discord.Interaction, Guild, Member, Role, channels and messages
+
+Only what the cogs actually touch is modelled. Any other attribute resolves to
+an async no-op, so a cog calling something unusual records nothing instead of
+crashing the run. Everything a command sends is counted by a Recorder.
+"""
+import contextvars
+import datetime
+import itertools
+import random
+
+import discord
+
+_ids = itertools.count(900000000000000000)
+
+# Name of the command the current task is running, so channel sends and DMs are attributed to it
+COMMAND = contextvars.ContextVar("command", default="-")
+
+
+def now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+class Fake:
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _noop
+
+
+class Recorder:
+    """Counts every reply per command; keeps the last one of each for inspection"""
+
+    def __init__(self):
+        self.counts = {}
+        self.last = {}
+
+    def record(self, kind, content=None, **payload):
+        command = COMMAND.get()
+        self.counts[command] = self.counts.get(command, 0) + 1
+        self.last[command] = (kind, content, payload)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+
+class FakeAsset(Fake):
+    def __init__(self, owner_id):
+        self.key = f"fake{owner_id}"
+        self.url = f"https://cdn.invalid/avatars/{owner_id}/{self.key}.png"
+
+    def with_size(self, size):
+        return self
+
+    def replace(self, **kwargs):
+        return self
+
+    def is_animated(self):
+        return False
+
+    def __str__(self):
+        return self.url
+
+
+class FakeMessage(Fake):
+    def __init__(self, channel, content=None, embeds=()):
+        self.id = next(_ids)
+        self.channel = channel
+        self.guild = channel.guild
+        self.content = content or ""
+        self.embeds = list(embeds)
+        self.author = channel.guild.me
+        self.reactions = []
+        self.created_at = now()
+        self.jump_url = f"https://discord.invalid/channels/{channel.guild.id}/{channel.id}/{self.id}"
+
+
+class FakeChannel(Fake):
+    def __init__(self, guild, name, kind=discord.ChannelType.text):
+        self.id = next(_ids)
+        self.guild = guild
+        self.name = name
+        self.type = kind
+        self.mention = f"<#{self.id}>"
+        self.members = []
+        self.topic = None
+        self.category = None
+        self.position = 0
+        self.last_message_id = None
+        self.created_at = now()
+
+    async def send(self, content=None, *, embed=None, embeds=None, **kwargs):
+        self.guild.recorder.record("channel.send", content, embed=embed, embeds=embeds)
+        message = FakeMessage(self, content, embeds or ([embed] if embed else []))
+        self.last_message_id = message.id
+        return message
+
+    async def fetch_message(self, message_id):
+        return FakeMessage(self)
+
+    def overwrites_for(self, target):
+        return discord.PermissionOverwrite()
+
+    def permissions_for(self, member):
+        return member.guild_permissions
+
+    async def history(self, **kwargs):
+        return
+        yield
+
+
+class FakeRole(Fake):
+    def __init__(self, guild, name, position=0):
+        self.id = guild.id if name == "@everyone" else next(_ids)
+        self.guild = guild
+        self.name = name
+        self.position = position
+        self.mention = f"<@&{self.id}>"
+        self.color = self.colour = discord.Colour.default()
+        self.mentionable = False
+        self.hoist = False
+        self.permissions = discord.Permissions.none()
+        self.created_at = now()
+
+    @property
+    def members(self):
+        return [member for member in self.guild.members if self in member.roles]
+
+
+class FakeMember(Fake):
+    def __init__(self, guild, user_id, admin=False):
+        self.id = user_id
+        self.guild = guild
+        self.name = f"user{user_id % 100000}"
+        self.display_name = self.global_name = self.name
+        self.nick = None
+        self.mention = f"<@{user_id}>"
+        self.bot = False
+        self.roles = [guild.default_role]
+        self.guild_permissions = discord.Permissions.all() if admin else discord.Permissions.none()
+        self.avatar = self.display_avatar = self.default_avatar = FakeAsset(user_id)
+        self.banner = None
+        self.voice = None
+        self.status = discord.Status.online
+        self.joined_at = self.created_at = now()
+        self.premium_since = None
+        self.activity = None
+        self.activities = ()
+
+    @property
+    def top_role(self):
+        return max(self.roles, key=lambda role: role.position)
+
+    def __str__(self):
+        return self.name
+
+    async def add_roles(self, *roles, **kwargs):
+        self.roles.extend(role for role in roles if role not in self.roles)
+
+    async def remove_roles(self, *roles, **kwargs):
+        self.roles = [role for role in self.roles if role not in roles]
+
+    async def send(self, content=None, **kwargs):
+        self.guild.recorder.record("dm", content, **kwargs)
+
+
+class FakeGuild(Fake):
+    def __init__(self, recorder, user_ids, text_channels=3, voice_channels=1):
+        self.id = next(_ids)
+        self.recorder = recorder
+        self.name = f"Guild {self.id % 1000}"
+        self.default_role = FakeRole(self, "@everyone")
+        self.roles = [self.default_role] + [FakeRole(self, f"role{i}", i + 1) for i in range(3)]
+        self.text_channels = [FakeChannel(self, f"text{i}") for i in range(text_channels)]
+        self.voice_channels = [FakeChannel(self, f"voice{i}", discord.ChannelType.voice) for i in range(voice_channels)]
+        self.channels = self.text_channels + self.voice_channels
+        self._members = {user_id: FakeMember(self, user_id, admin=(i == 0)) for i, user_id in enumerate(user_ids)}
+        self.members = list(self._members.values())
+        self.me = self.owner = self.members[0]
+        self.owner_id = self.owner.id
+        self.member_count = len(self.members)
+        self.icon = None
+        self.emojis = []
+        self.premium_tier = 0
+        self.premium_subscription_count = 0
+        self.created_at = now()
+        for channel in self.voice_channels:
+            channel.members = random.sample(self.members, min(5, len(self.members)))
+
+    def get_member(self, user_id):
+        return self._members.get(user_id)
+
+    def get_channel(self, channel_id):
+        return next((channel for channel in self.channels if channel.id == channel_id), None)
+
+    def get_role(self, role_id):
+        return next((role for role in self.roles if role.id == role_id), None)
+
+    async def fetch_member(self, user_id):
+        return self._members.get(user_id)
+
+    async def bans(self, **kwargs):
+        return []
+
+    async def create_role(self, name="new role", **kwargs):
+        role = FakeRole(self, name, len(self.roles))
+        self.roles.append(role)
+        return role
+
+    async def create_text_channel(self, name, **kwargs):
+        channel = FakeChannel(self, name)
+        self.text_channels.append(channel)
+        self.channels.append(channel)
+        return channel
+
+    async def create_voice_channel(self, name, **kwargs):
+        channel = FakeChannel(self, name, discord.ChannelType.voice)
+        self.voice_channels.append(channel)
+        self.channels.append(channel)
+        return channel
+
+
+class FakeResponse(Fake):
+    def __init__(self, interaction):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    def _respond(self):
+        if self._done:
+            raise RuntimeError("interaction already responded to")
+        self._done = True
+
+    async def send_message(self, content=None, *, embed=None, embeds=None, ephemeral=False, **kwargs):
+        self._respond()
+        self._interaction.recorder.record("response", content, embed=embed, embeds=embeds, ephemeral=ephemeral)
+
+    async def defer(self, **kwargs):
+        self._respond()
+
+    async def edit_message(self, **kwargs):
+        self._respond()
+        self._interaction.recorder.record("edit", kwargs.get("content"))
+
+    async def send_modal(self, modal):
+        self._respond()
+
+
+class FakeFollowup(Fake):
+    def __init__(self, interaction):
+        self._interaction = interaction
+
+    async def send(self, content=None, *, embed=None, embeds=None, **kwargs):
+        interaction = self._interaction
+        interaction.recorder.record("followup", content, embed=embed, embeds=embeds)
+        return FakeMessage(interaction.channel, content)
+
+
+class FakeInteraction(Fake):
+    def __init__(self, client, guild, user, channel):
+        self.id = next(_ids)
+        self.client = client
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.channel = channel
+        self.channel_id = channel.id
+        self.recorder = guild.recorder
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.created_at = now()
+        self.locale = discord.Locale.american_english
+
+    async def edit_original_response(self, content=None, **kwargs):
+        self.recorder.record("edit", content, **kwargs)
+
+    async def original_response(self):
+        return FakeMessage(self.channel)
@@ -0,0 +1,63 @@
+"""Encode time against upload size for Images outputs, per format and setting
+
+Run from the repository root:
+    python -m benchmarks.image_encoding --sizes 512 1024
+
+"photo" is a blurred avatar-like image (what /blur, /sepia, /tint produce);
+"mask" is the same image cut to a circle with a transparent background
+(what /circleavatar produces). "PNG 6" is the old default for everything.
+"""
+import argparse
+import os
+import time
+from io import BytesIO
+
+from PIL import Image, ImageFilter
+
+from utils import image_encoder, image_ops
+
+SETTINGS = [
+    ("PNG 6 (old)", dict(format="PNG")),
+    ("PNG 1", dict(format="PNG", compress_level=1)),
+    ("PNG 3", dict(format="PNG", compress_level=3)),
+    ("JPEG 85", dict(format="JPEG", quality=85, optimize=True)),
+    ("WebP 80", dict(format="WEBP", quality=80, method=4)),
+]
+
+
+def make_photo(size):
+    # Smooth gradients plus fine texture, closer to a real avatar than pure noise
+    noise = Image.frombytes("RGB", (size // 4, size // 4), os.urandom(size * size * 3 // 16)).resize((size, size), Image.BICUBIC)
+    grain = Image.frombytes("RGB", (size, size), os.urandom(size * size * 3))
+    return Image.blend(noise, grain, 0.08).filter(ImageFilter.GaussianBlur(1))
+
+
+def measure(image, options, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        buffer = BytesIO()
+        start = time.perf_counter()
+        image.save(buffer, **options)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, buffer.tell()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 1024])
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    args = parser.parse_args()
+    for size in args.sizes:
+        photo = make_photo(size)
+        for content, image in (("photo", photo), ("mask", image_ops.circle(photo))):
+            chosen = "PNG 3" if content == "mask" else ("WebP 80" if image_encoder.has_alpha(image) else "JPEG 85")
+            for label, options in SETTINGS:
+                if options["format"] == "JPEG" and image.mode == "RGBA":
+                    continue
+                ms, size_bytes = measure(image, options, args.repeat)
+                mark = " <- encoder" if label == chosen else ""
+                print(f"{size:>5}px {content:>5} | {label:<11} | {ms:8.1f} ms | {size_bytes / 1024:9.1f} KiB{mark}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Image command throughput and latency, Pillow on the event loop vs utils.image_pool
+
+Run from the repository root:
+    python -m benchmarks.image_pool --concurrency 4 8 16 --jobs 8 --size 512
+
+Each of N concurrent clients runs --jobs image commands back to back on a
+synthetic avatar. Alongside them a 10 ms ticker measures how long the event
+loop goes without running, which is what every other guild waits for.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from utils import image_ops
+from utils.image_ops import step
+from utils.image_pool import ImagePool
+
+OPS = [step("blur", radius=5), step("circle"), step("pixelate", size=10), step("invert"), step("rotate", degrees=45)]
+
+
+def make_avatar(size):
+    image = Image.frombytes("RGB", (size, size), os.urandom(size * size * 3))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def ticker(stop, stalls):
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.01)
+        now = time.perf_counter()
+        stalls.append(now - last - 0.01)
+        last = now
+
+
+async def run(mode, concurrency, jobs, avatar, workers):
+    pool = ImagePool(workers=workers, queue_size=concurrency, timeout=120) if mode == "pool" else None
+    if pool:
+        await pool.run([step("invert")], avatar)  # workers are spawned lazily; keep startup out of the numbers
+    latencies, stalls = [], []
+
+    async def client(n):
+        for i in range(jobs):
+            steps = [OPS[(n + i) % len(OPS)]]
+            start = time.perf_counter()
+            if pool:
+                await pool.run(steps, avatar)
+            else:
+                image_ops.render([avatar], steps)
+                await asyncio.sleep(0)
+            latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(stop, stalls))
+    start = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    if pool:
+        pool.shutdown()
+    return latencies, stalls, elapsed
+
+
+def report(mode, concurrency, latencies, stalls, elapsed):
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+    print(
+        f"{mode:>6} x{concurrency:<3}| {len(latencies) / elapsed:7.1f} img/s | p50 {statistics.median(latencies) * 1000:8.1f} ms | "
+        f"p95 {p95:8.1f} ms | worst loop stall {max(stalls, default=0) * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--jobs", type=int, default=8, help="commands per client")
+    parser.add_argument("--size", type=int, default=512, help="avatar edge in pixels")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+    avatar = make_avatar(args.size)
+    for concurrency in args.concurrency:
+        for mode in ("inline", "pool"):
+            report(mode, concurrency, *asyncio.run(run(mode, concurrency, args.jobs, avatar, args.workers)))
+
+
+if __name__ == "__main__":
+    main()
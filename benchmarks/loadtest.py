@@ -0,0 +1,237 @@
+"""Offline load test: drive cogs' slash commands with fake interactions at a target rate
+
+Run from the repository root (discord.py must be installed, no network or token needed):
+    python -m benchmarks.loadtest --cog economy --rate 200 --seconds 10 --users 5000 --guilds 20
+    python -m benchmarks.loadtest --cog images --command blur --command sepia --rate 20
+    python -m benchmarks.loadtest --cog economy --command pay --arg amount=5 --tracemalloc
+
+Cogs are loaded into an unconnected commands.Bot inside a scratch directory, so
+their JSON files start empty and nothing in the repository is touched. Command
+callbacks are called directly with generated arguments: permission checks and
+transformers are skipped. Latency runs from each call's scheduled arrival to its
+completion, so time spent queued behind a blocked event loop counts.
+
+Commands that need the network (memes, jokes, quotes) fail fast and show up as
+errors; the translation backend is switched to the local fake, and avatars for
+the image commands are served from a pre-filled cache.
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)  # the run happens in a scratch directory
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+import config
+from benchmarks.fakes import COMMAND, FakeGuild, FakeInteraction, Recorder
+
+config.TRANSLATION_BACKEND = "fake"
+
+from utils import storage
+
+
+def make_population(recorder, users, guilds):
+    """Spread `users` fake members across `guilds` fake guilds"""
+    user_ids = [100000000000000000 + i for i in range(users)]
+    per_guild = max(users // guilds, 1)
+    return [
+        FakeGuild(recorder, user_ids[i * per_guild:(i + 1) * per_guild] or user_ids[:1])
+        for i in range(guilds)
+    ]
+
+
+def fake_value(param, guild, user):
+    """A plausible argument for an app command parameter"""
+    kind = param.type
+    if param.choices:
+        return random.choice(param.choices).value
+    if kind is discord.AppCommandOptionType.integer:
+        low = int(param.min_value) if param.min_value is not None else 1
+        return random.randint(low, int(param.max_value) if param.max_value is not None else low + 9)
+    if kind is discord.AppCommandOptionType.number:
+        low = param.min_value if param.min_value is not None else 0.0
+        return random.uniform(low, param.max_value if param.max_value is not None else low + 1.0)
+    if kind is discord.AppCommandOptionType.boolean:
+        return random.random() < 0.5
+    if kind in (discord.AppCommandOptionType.user, discord.AppCommandOptionType.mentionable):
+        return random.choice(guild.members)
+    if kind is discord.AppCommandOptionType.role:
+        return random.choice(guild.roles[1:])
+    if kind is discord.AppCommandOptionType.channel:
+        voice = any(t in (discord.ChannelType.voice, discord.ChannelType.stage_voice) for t in param.channel_types)
+        return random.choice(guild.voice_channels if voice else guild.text_channels)
+    if kind is discord.AppCommandOptionType.attachment:
+        return None
+    return random.choice(("loadtest", "hello world", "#ff8800", str(user.id)))
+
+
+def parse_overrides(pairs):
+    overrides = {}
+    for pair in pairs:
+        name, _, value = pair.partition("=")
+        try:
+            overrides[name] = int(value)
+        except ValueError:
+            try:
+                overrides[name] = float(value)
+            except ValueError:
+                overrides[name] = value
+    return overrides
+
+
+def seed_avatars(cog, guilds):
+    # Stand-in for the CDN: every fake avatar is already in the image cog's cache
+    avatars = getattr(cog, "avatars", None)
+    if avatars is None:
+        return
+    from PIL import Image
+    buffer = BytesIO()
+    Image.linear_gradient("L").convert("RGB").resize((256, 256)).save(buffer, "PNG")
+    data = buffer.getvalue()
+    for guild in guilds:
+        for member in guild.members:
+            avatars.memory.put((member.display_avatar.key, 0), data)
+
+
+async def load(bot, cog_names, only, guilds):
+    """Load the cogs and return [(label, command)] for the app commands to drive"""
+    targets = []
+    for name in cog_names:
+        await bot.load_extension(f"cogs.{name}")
+        for cog in bot.cogs.values():
+            if type(cog).__module__ != f"cogs.{name}":
+                continue
+            seed_avatars(cog, guilds)
+            for command in cog.walk_app_commands():
+                if isinstance(command, app_commands.Command) and (not only or command.qualified_name in only):
+                    targets.append((f"{name}/{command.qualified_name}", command))
+    return targets
+
+
+async def run(args):
+    recorder = Recorder()
+    guilds = make_population(recorder, args.users, args.guilds)
+    bot = commands.Bot(command_prefix="/", intents=discord.Intents.all())
+    # Entering the client sets up its loop state without logging in
+    async with bot:
+        await drive(args, bot, recorder, guilds)
+
+
+async def drive(args, bot, recorder, guilds):
+    targets = await load(bot, args.cog, set(args.command), guilds)
+    if not targets:
+        raise SystemExit("No matching app commands")
+    overrides = parse_overrides(args.arg)
+    latencies = {label: [] for label, _ in targets}
+    errors = {}
+    dropped = 0
+    inflight = 0
+
+    async def invoke(label, command, arrival):
+        nonlocal inflight
+        COMMAND.set(label)
+        guild = random.choice(guilds)
+        user = random.choice(guild.members)
+        interaction = FakeInteraction(bot, guild, user, random.choice(guild.text_channels))
+        kwargs = {
+            param.name: overrides[param.name] if param.name in overrides else fake_value(param, guild, user)
+            for param in command.parameters
+            if param.required or param.name in overrides
+        }
+        try:
+            await asyncio.wait_for(command.callback(command.binding, interaction, **kwargs), args.timeout)
+        except Exception as e:
+            key = (label, type(e).__name__)
+            errors[key] = (errors.get(key, (0, ""))[0] + 1, str(e)[:80])
+        finally:
+            inflight -= 1
+            latencies[label].append(time.perf_counter() - arrival)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if args.tracemalloc:
+        tracemalloc.start()
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    tasks = []
+    for i in range(int(args.rate * args.seconds)):
+        arrival = start + i / args.rate
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if inflight >= args.max_inflight:
+            dropped += 1
+            continue
+        inflight += 1
+        label, command = random.choice(targets)
+        tasks.append(loop.create_task(invoke(label, command, arrival)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    traced = tracemalloc.get_traced_memory() if args.tracemalloc else None
+    tracemalloc.stop()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for name in args.cog:
+        await bot.unload_extension(f"cogs.{name}")
+    report(args, latencies, errors, dropped, elapsed, recorder, (rss_before, rss_after), traced)
+
+
+def report(args, latencies, errors, dropped, elapsed, recorder, rss, traced):
+    calls = sum(len(samples) for samples in latencies.values())
+    failed = sum(count for count, _ in errors.values())
+    print(
+        f"{calls} calls in {elapsed:.2f} s | target {args.rate:g}/s, achieved {calls / elapsed:.1f}/s | "
+        f"{failed} errors | {dropped} dropped (over {args.max_inflight} in flight) | {recorder.total} replies recorded"
+    )
+    print(f"{'command':<32} {'calls':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for label, samples in sorted(latencies.items(), key=lambda item: -len(item[1])):
+        if not samples:
+            continue
+        samples.sort()
+        pct = lambda p: samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+        err = sum(count for (name, _), (count, _) in errors.items() if name == label)
+        print(f"{label[:32]:<32} {len(samples):>6} {err:>5} {pct(0.50):>9.2f} {pct(0.95):>9.2f} {pct(0.99):>9.2f} {samples[-1] * 1000:>9.2f}")
+    # ru_maxrss is in KiB on Linux
+    print(f"memory: peak RSS {rss[0] / 1024:.1f} MiB before, {rss[1] / 1024:.1f} MiB after", end="")
+    print(f" | traced {traced[0] / 1048576:.1f} MiB now, {traced[1] / 1048576:.1f} MiB peak" if traced else "")
+    for (label, name), (count, message) in sorted(errors.items(), key=lambda item: -item[1][0])[:10]:
+        print(f"  {count:>5}x {label}: {name}: {message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cog", action="append", required=True, help="cog module to load, e.g. economy (repeatable)")
+    parser.add_argument("--command", action="append", default=[], help="only drive this command (repeatable)")
+    parser.add_argument("--arg", action="append", default=[], help="fixed argument as name=value (repeatable)")
+    parser.add_argument("--rate", type=float, default=100, help="commands per second")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--users", type=int, default=1000, help="fake members across all guilds")
+    parser.add_argument("--guilds", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=15, help="seconds before a call counts as failed")
+    parser.add_argument("--max-inflight", type=int, default=1000, help="drop arrivals beyond this many running calls")
+    parser.add_argument("--tracemalloc", action="store_true", help="trace Python allocations (slows the run)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        asyncio.run(run(args))
+        storage.flush_all()
+        # Let follow-up writes (journal truncation) land in the scratch directory, and
+        # leave nothing for the atexit flush to write once we are back in the repository
+        storage.submit_io(lambda: None).result()
+        storage._stores.clear()
+        os.chdir(ROOT)
+
+
+if __name__ == "__main__":
+    main()
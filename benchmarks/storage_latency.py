@@ -0,0 +1,108 @@
+"""Interaction latency under a synthetic command load, legacy save_data vs utils.storage
+
+Run from the repository root:
+    python -m benchmarks.storage_latency --rate 500 --seconds 2 --users 1000 --flush-interval 0.5
+
+Latency is measured from each command's scheduled arrival to its completion, so
+time spent queued behind a blocked event loop counts. The legacy mode cannot keep
+up with 500 cmd/s on any realistic file size; its run takes far longer than --seconds.
+The store's flush interval defaults to a fraction of the run (the bot uses
+storage.FLUSH_INTERVAL) so its coalesced writes happen during the measurement.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from utils import storage
+
+
+def make_dataset(users):
+    return {
+        str(100000000000000000 + i): {
+            "wallet": random.randint(0, 5000),
+            "bank": random.randint(0, 5000),
+            "inventory": random.sample(["sword", "shield", "potion", "car", "house"], 2),
+            "last_daily": None,
+            "last_work": None,
+        }
+        for i in range(users)
+    }
+
+
+def legacy_save(path, data):
+    # What every cog did before: rewrite the whole file on the event loop
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+async def run(mode, rate, seconds, users, path, flush_interval):
+    data = make_dataset(users)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+    if mode == "store":
+        storage._stores.pop(path, None)
+        data = storage.open_store(path, flush_interval=flush_interval)
+    keys = list(data)
+    latencies = []
+
+    async def command(arrival):
+        # Equivalent of /beg: one small mutation, then persist
+        user_id = random.choice(keys)
+        data[user_id]["wallet"] += random.randint(5, 50)
+        if mode == "store":
+            data.mark_dirty(user_id)
+        else:
+            legacy_save(path, data)
+        await asyncio.sleep(0)
+        latencies.append(time.perf_counter() - arrival)
+
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    tasks = []
+    for i in range(int(rate * seconds)):
+        arrival = start + i / rate
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(loop.create_task(command(arrival)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    if mode == "store":
+        pending = data.flush()
+        if pending is not None:
+            await asyncio.wrap_future(pending)
+    return latencies, elapsed
+
+
+def report(mode, latencies, elapsed):
+    latencies = sorted(latencies)
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(
+        f"{mode:>7} | {len(latencies) / elapsed:8.1f} cmd/s | p50 {pct(0.50):8.2f} ms | "
+        f"p99 {pct(0.99):8.2f} ms | max {latencies[-1] * 1000:8.2f} ms | mean {statistics.mean(latencies) * 1000:8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=int, default=500, help="commands per second")
+    parser.add_argument("--seconds", type=float, default=2)
+    parser.add_argument("--users", type=int, default=1000, help="records in the economy file")
+    parser.add_argument("--flush-interval", type=float, help="store flush interval (default: a quarter of --seconds)")
+    args = parser.parse_args()
+    flush_interval = args.flush_interval or args.seconds / 4
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("legacy", "store"):
+            path = os.path.join(tmp, f"economy_{mode}.json")
+            latencies, elapsed = asyncio.run(run(mode, args.rate, args.seconds, args.users, path, flush_interval))
+            report(mode, latencies, elapsed)
+        storage.flush_all()
+
+
+if __name__ == "__main__":
+    main()
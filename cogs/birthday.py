@@ -1,33 +1,51 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from datetime import datetime, timedelta
 from config import GUILD_ID
+from utils import storage
+from utils.scheduler import get_scheduler
 
 DATA_FILE = "birthdays.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
 
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+def next_birthday(date_str, now):
+    """Midnight UTC of the first occurrence of a YYYY-MM-DD birthday on or after now's day"""
+    birthday = datetime.strptime(date_str, "%Y-%m-%d")
+    today = datetime(now.year, now.month, now.day)
+    year = now.year
+    while True:
+        try:
+            when = birthday.replace(year=year)
+        except ValueError:
+            when = datetime(year, 2, 28)  # 29 February outside leap years
+        if when >= today:
+            return when
+        year += 1
 
 class Birthday(commands.Cog):
     """Birthday tracking and announcements"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
-        self.check_birthdays.start()
+        self.data = storage.open_store(DATA_FILE)
+        self.scheduler = get_scheduler()
+        self.scheduler.register("birthday", self.announce)
+        # Birthdays set before timers existed (or whose timer was lost) get one now
+        now = datetime.utcnow()
+        for guild_id, guild_data in self.data.items():
+            for user_id, date_str in guild_data.items():
+                if not self.scheduler.has(f"birthday:{guild_id}:{user_id}"):
+                    self.schedule(guild_id, user_id, next_birthday(date_str, now))
 
     def cog_unload(self):
-        self.check_birthdays.cancel()
+        self.scheduler.unregister("birthday")
+
+    def schedule(self, guild_id, user_id, when):
+        self.scheduler.schedule("birthday", when, {
+            "guild_id": guild_id,
+            "user_id": user_id
+        }, timer_id=f"birthday:{guild_id}:{user_id}")
 
     # --------------------
     # Set birthday
@@ -43,7 +61,8 @@ class Birthday(commands.Cog):
         guild_id = str(interaction.guild.id)
         user_id = str(interaction.user.id)
         self.data.setdefault(guild_id, {})[user_id] = date
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
+        self.schedule(guild_id, user_id, next_birthday(date, datetime.utcnow()))
         await interaction.response.send_message(f"🎉 Birthday set to {date} for {interaction.user.mention}!")
 
     # --------------------
@@ -81,25 +100,21 @@ class Birthday(commands.Cog):
     # --------------------
     # Birthday announcements
     # --------------------
-    @tasks.loop(minutes=60)
-    async def check_birthdays(self):
-        now = datetime.utcnow()
-        for guild in self.bot.guilds:
-            guild_id = str(guild.id)
-            for user_id, date_str in self.data.get(guild_id, {}).items():
-                member = guild.get_member(int(user_id))
-                if not member:
-                    continue
-                birthday = datetime.strptime(date_str, "%Y-%m-%d")
-                # Check if birthday is today (month & day)
-                if birthday.month == now.month and birthday.day == now.day:
-                    channel = discord.utils.get(guild.text_channels, permissions__send_messages=True)
-                    if channel:
-                        await channel.send(f"🎉 Happy Birthday {member.mention}! 🎂")
-
-    @check_birthdays.before_loop
-    async def before_check_birthdays(self):
+    async def announce(self, payload):
+        guild_id, user_id = payload["guild_id"], payload["user_id"]
+        date_str = self.data.get(guild_id, {}).get(user_id)
+        if date_str is None:
+            return
+        # Re-arm for next year first so a restart mid-announcement doesn't repeat it
+        self.schedule(guild_id, user_id, next_birthday(date_str, datetime.utcnow() + timedelta(days=1)))
         await self.bot.wait_until_ready()
+        guild = self.bot.get_guild(int(guild_id))
+        member = guild.get_member(int(user_id)) if guild else None
+        if not member:
+            return
+        channel = discord.utils.get(guild.text_channels, permissions__send_messages=True)
+        if channel:
+            await channel.send(f"🎉 Happy Birthday {member.mention}! 🎂")
 
 
 async def setup(bot):
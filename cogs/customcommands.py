@@ -2,27 +2,17 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import json
-import os
 from config import GUILD_ID
+from utils import storage
 
 DATA_FILE = "customcommands.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class CustomCommands(commands.Cog):
     """Custom commands system with JSON persistence"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
 
     # ----------------------------
     # 1. /create_command
@@ -31,7 +21,7 @@ class CustomCommands(commands.Cog):
     async def create_command(self, interaction: discord.Interaction, name: str, *, response: str):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})[name] = response
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Command `{name}` created.")
 
     # ----------------------------
@@ -42,7 +32,7 @@ class CustomCommands(commands.Cog):
         guild_id = str(interaction.guild.id)
         if name in self.data.get(guild_id, {}):
             self.data[guild_id].pop(name)
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ Command `{name}` deleted.")
         else:
             await interaction.response.send_message("❌ Command not found.", ephemeral=True)
@@ -55,7 +45,7 @@ class CustomCommands(commands.Cog):
         guild_id = str(interaction.guild.id)
         if name in self.data.get(guild_id, {}):
             self.data[guild_id][name] = new_response
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ Command `{name}` updated.")
         else:
             await interaction.response.send_message("❌ Command not found.", ephemeral=True)
@@ -108,7 +98,7 @@ class CustomCommands(commands.Cog):
             if "=" in entry:
                 name, response = entry.split("=", 1)
                 self.data.setdefault(guild_id, {})[name.strip()] = response.strip()
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Bulk commands created.")
 
     # ----------------------------
@@ -123,7 +113,7 @@ class CustomCommands(commands.Cog):
             if name in self.data.get(guild_id, {}):
                 self.data[guild_id].pop(name)
                 removed.append(name)
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Removed commands: {', '.join(removed)}")
 
     # ----------------------------
@@ -133,7 +123,7 @@ class CustomCommands(commands.Cog):
     async def reset_commands(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data[guild_id] = {}
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ All custom commands deleted.")
 
     # ----------------------------
@@ -145,7 +135,7 @@ class CustomCommands(commands.Cog):
         commands_dict = self.data.get(guild_id, {})
         if old_name in commands_dict:
             commands_dict[new_name] = commands_dict.pop(old_name)
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ `{old_name}` renamed to `{new_name}`")
         else:
             await interaction.response.send_message("❌ Command not found.", ephemeral=True)
@@ -168,7 +158,7 @@ class CustomCommands(commands.Cog):
         commands_dict = self.data.get(guild_id, {})
         if source in commands_dict:
             commands_dict[new_name] = commands_dict[source]
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ `{source}` copied to `{new_name}`")
         else:
             await interaction.response.send_message("❌ Command not found.", ephemeral=True)
@@ -216,7 +206,7 @@ class CustomCommands(commands.Cog):
             commands_dict = json.loads(json_text)
             if isinstance(commands_dict, dict):
                 self.data.setdefault(guild_id, {}).update(commands_dict)
-                save_data(self.data)
+                self.data.mark_dirty(guild_id)
                 await interaction.response.send_message(f"✅ Imported {len(commands_dict)} commands.")
             else:
                 await interaction.response.send_message("❌ Invalid JSON format.", ephemeral=True)
@@ -246,7 +236,7 @@ class CustomCommands(commands.Cog):
         if name in commands_dict:
             new_name = f"{name}_copy"
             commands_dict[new_name] = commands_dict[name]
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ Command duplicated as `{new_name}`")
         else:
             await interaction.response.send_message("❌ Command not found.", ephemeral=True)
@@ -260,7 +250,7 @@ class CustomCommands(commands.Cog):
         commands_dict = self.data.get(guild_id, {})
         if name in commands_dict:
             commands_dict[name] = commands_dict[name].replace(old, new)
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ Replaced `{old}` with `{new}` in `{name}`")
         else:
             await interaction.response.send_message("❌ Command not found.", ephemeral=True)
@@ -272,7 +262,7 @@ class CustomCommands(commands.Cog):
     async def clear_all(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data[guild_id] = {}
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ All custom commands cleared permanently.")
 
 async def setup(bot):
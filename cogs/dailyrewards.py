@@ -1,29 +1,18 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from datetime import datetime, timedelta
 from config import GUILD_ID
+from utils import storage
 
 DATA_FILE = "daily_rewards.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class DailyRewards(commands.Cog):
     """Daily rewards system for server members"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
 
     # --------------------
     # Claim daily reward
@@ -63,7 +52,7 @@ class DailyRewards(commands.Cog):
         coins = self.data[guild_id][user_id].get("coins", 0) + total_reward
         self.data[guild_id][user_id]["coins"] = coins
 
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(
             f"💰 You claimed **{total_reward} coins**! (Streak: {streak} days) Total coins: {coins}"
         )
@@ -98,7 +87,7 @@ class DailyRewards(commands.Cog):
         user_id = str(member.id)
         if guild_id in self.data and user_id in self.data[guild_id]:
             self.data[guild_id][user_id]["streak"] = 0
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ {member.mention}'s daily streak has been reset.")
         else:
             await interaction.response.send_message(f"❌ {member.mention} has no streak data.", ephemeral=True)
@@ -113,7 +102,7 @@ class DailyRewards(commands.Cog):
         user_id = str(member.id)
         if guild_id in self.data and user_id in self.data[guild_id]:
             self.data[guild_id][user_id]["coins"] = 0
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ {member.mention}'s coins have been reset.")
         else:
             await interaction.response.send_message(f"❌ {member.mention} has no coin data.", ephemeral=True)
@@ -1,23 +1,15 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 import random
 import datetime
 from config import GUILD_ID
+from utils import storage
+from utils.journal import Journal
+from utils.schemas import ECONOMY
 
 DATA_FILE = "economy.json"
-
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+JOURNAL_FILE = "economy.journal"
 
 SHOP_ITEMS = {
     "sword": 100,
@@ -32,7 +24,9 @@ class Economy(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
+        # Every balance change goes through the journal; economy.json is only its snapshot
+        self.journal = Journal(JOURNAL_FILE, self.data, ECONOMY.columns)
 
     def ensure_user(self, user_id):
         user_id = str(user_id)
@@ -45,6 +39,12 @@ class Economy(commands.Cog):
         })
         return user_id
 
+    async def interaction_check(self, interaction: discord.Interaction):
+        # Read the records this command will touch on the database thread, not the loop
+        users = [interaction.user] + [v for _, v in interaction.namespace if isinstance(v, (discord.User, discord.Member))]
+        await self.data.load(*{str(user.id) for user in users})
+        return True
+
     # 1. /balance
     @app_commands.command(name="balance", description="Check your balance")
     async def balance(self, interaction: discord.Interaction, member: discord.Member = None):
@@ -66,9 +66,7 @@ class Economy(commands.Cog):
                 await interaction.response.send_message("⏳ You already claimed your daily reward.")
                 return
         reward = random.randint(50, 150)
-        self.data[user_id]["wallet"] += reward
-        self.data[user_id]["last_daily"] = now.isoformat()
-        save_data(self.data)
+        self.journal.apply((user_id, "wallet", reward), sets=[(user_id, "last_daily", now.isoformat())])
         await interaction.response.send_message(f"🎉 You received {reward} coins!")
 
     # 3. /work
@@ -83,9 +81,7 @@ class Economy(commands.Cog):
                 await interaction.response.send_message("⏳ You can work again in 1 hour.")
                 return
         reward = random.randint(20, 100)
-        self.data[user_id]["wallet"] += reward
-        self.data[user_id]["last_work"] = now.isoformat()
-        save_data(self.data)
+        self.journal.apply((user_id, "wallet", reward), sets=[(user_id, "last_work", now.isoformat())])
         await interaction.response.send_message(f"💼 You worked and earned {reward} coins!")
 
     # 4. /pay
@@ -99,9 +95,7 @@ class Economy(commands.Cog):
         if self.data[sender_id]["wallet"] < amount:
             await interaction.response.send_message("❌ You don't have enough coins.")
             return
-        self.data[sender_id]["wallet"] -= amount
-        self.data[receiver_id]["wallet"] += amount
-        save_data(self.data)
+        self.journal.apply((sender_id, "wallet", -amount), (receiver_id, "wallet", amount))
         await interaction.response.send_message(f"💸 {interaction.user.mention} paid {member.mention} {amount} coins.")
 
     # 5. /beg
@@ -109,8 +103,7 @@ class Economy(commands.Cog):
     async def beg(self, interaction: discord.Interaction):
         user_id = self.ensure_user(interaction.user.id)
         amount = random.randint(5, 50)
-        self.data[user_id]["wallet"] += amount
-        save_data(self.data)
+        self.journal.apply((user_id, "wallet", amount))
         await interaction.response.send_message(f"🙏 Someone gave you {amount} coins!")
 
     # 6. /gamble
@@ -125,12 +118,10 @@ class Economy(commands.Cog):
             return
         win = random.choice([True, False])
         if win:
-            self.data[user_id]["wallet"] += amount
-            save_data(self.data)
+            self.journal.apply((user_id, "wallet", amount))
             await interaction.response.send_message(f"🎉 You won {amount} coins!")
         else:
-            self.data[user_id]["wallet"] -= amount
-            save_data(self.data)
+            self.journal.apply((user_id, "wallet", -amount))
             await interaction.response.send_message(f"❌ You lost {amount} coins.")
 
     # 7. /shop
@@ -151,9 +142,8 @@ class Economy(commands.Cog):
         if self.data[user_id]["wallet"] < price:
             await interaction.response.send_message("❌ Not enough coins.")
             return
-        self.data[user_id]["wallet"] -= price
-        self.data[user_id]["inventory"].append(item)
-        save_data(self.data)
+        inventory = self.data[user_id]["inventory"] + [item]
+        self.journal.apply((user_id, "wallet", -price), sets=[(user_id, "inventory", inventory)])
         await interaction.response.send_message(f"🛒 You bought **{item}** for {price} coins!")
 
     # 9. /inventory
@@ -173,9 +163,7 @@ class Economy(commands.Cog):
         if amount <= 0 or self.data[user_id]["wallet"] < amount:
             await interaction.response.send_message("❌ Invalid amount or insufficient coins.")
             return
-        self.data[user_id]["wallet"] -= amount
-        self.data[user_id]["bank"] += amount
-        save_data(self.data)
+        self.journal.apply((user_id, "wallet", -amount), (user_id, "bank", amount))
         await interaction.response.send_message(f"🏦 Deposited {amount} coins.")
 
     # 11. /withdraw
@@ -185,20 +173,14 @@ class Economy(commands.Cog):
         if amount <= 0 or self.data[user_id]["bank"] < amount:
             await interaction.response.send_message("❌ Invalid amount or insufficient coins in bank.")
             return
-        self.data[user_id]["wallet"] += amount
-        self.data[user_id]["bank"] -= amount
-        save_data(self.data)
+        self.journal.apply((user_id, "wallet", amount), (user_id, "bank", -amount))
         await interaction.response.send_message(f"🏦 Withdrew {amount} coins.")
 
     # 12. /leaderboard
     @app_commands.command(name="leaderboard", description="Show richest users")
     async def leaderboard(self, interaction: discord.Interaction):
-        leaderboard = sorted(
-            ((uid, data["wallet"] + data["bank"]) for uid,data in self.data.items()),
-            key=lambda x: x[1],
-            reverse=True
-        )
-        msg = "\n".join([f"<@{uid}>: {score}" for uid,score in leaderboard[:10]])
+        leaderboard = await self.data.top("total", 10)
+        msg = "\n".join([f"<@{uid}>: {data['wallet'] + data['bank']}" for uid,data in leaderboard])
         await interaction.response.send_message(f"🏆 Richest Users:\n{msg or 'No data yet.'}")
 
     # 13. /workbonus
@@ -206,8 +188,7 @@ class Economy(commands.Cog):
     async def workbonus(self, interaction: discord.Interaction):
         user_id = self.ensure_user(interaction.user.id)
         bonus = random.randint(10, 50)
-        self.data[user_id]["wallet"] += bonus
-        save_data(self.data)
+        self.journal.apply((user_id, "wallet", bonus))
         await interaction.response.send_message(f"💰 You received a work bonus of {bonus} coins!")
 
     # 14. /lottery
@@ -218,15 +199,13 @@ class Economy(commands.Cog):
         if self.data[user_id]["wallet"] < cost:
             await interaction.response.send_message("❌ Not enough coins for lottery.")
             return
-        self.data[user_id]["wallet"] -= cost
         win = random.randint(1,10) == 1
         if win:
             reward = 200
-            self.data[user_id]["wallet"] += reward
-            save_data(self.data)
+            self.journal.apply((user_id, "wallet", reward - cost))
             await interaction.response.send_message(f"🎉 You won the lottery! +{reward} coins")
         else:
-            save_data(self.data)
+            self.journal.apply((user_id, "wallet", -cost))
             await interaction.response.send_message("❌ You lost the lottery.")
 
     # 15. /rob
@@ -240,9 +219,7 @@ class Economy(commands.Cog):
         win = random.choice([True, False])
         if win:
             stolen = random.randint(10, min(100, self.data[victim_id]["wallet"]))
-            self.data[victim_id]["wallet"] -= stolen
-            self.data[robber_id]["wallet"] += stolen
-            save_data(self.data)
+            self.journal.apply((victim_id, "wallet", -stolen), (robber_id, "wallet", stolen))
             await interaction.response.send_message(f"💰 You stole {stolen} coins from {member.mention}!")
         else:
             await interaction.response.send_message("❌ Robbery failed!")
@@ -264,8 +241,7 @@ class Economy(commands.Cog):
     async def scratch(self, interaction: discord.Interaction):
         user_id = self.ensure_user(interaction.user.id)
         reward = random.choice([0,0,0,50,100])
-        self.data[user_id]["wallet"] += reward
-        save_data(self.data)
+        self.journal.apply((user_id, "wallet", reward))
         await interaction.response.send_message(f"🎫 Scratch card: +{reward} coins")
 
     # 19. /stealbank
@@ -279,9 +255,7 @@ class Economy(commands.Cog):
         win = random.choice([True, False])
         if win:
             stolen = random.randint(10, min(100, self.data[victim_id]["bank"]))
-            self.data[victim_id]["bank"] -= stolen
-            self.data[thief_id]["wallet"] += stolen
-            save_data(self.data)
+            self.journal.apply((victim_id, "bank", -stolen), (thief_id, "wallet", stolen))
             await interaction.response.send_message(f"🏦 You stole {stolen} coins from {member.mention}'s bank!")
         else:
             await interaction.response.send_message("❌ Bank robbery failed!")
@@ -293,13 +267,11 @@ class Economy(commands.Cog):
         success = random.choice([True, False, False])  # 33% chance
         if success:
             reward = random.randint(150, 300)
-            self.data[user_id]["wallet"] += reward
-            save_data(self.data)
+            self.journal.apply((user_id, "wallet", reward))
             await interaction.response.send_message(f"💰 You succeeded! Earned {reward} coins!")
         else:
             loss = random.randint(20, 50)
-            self.data[user_id]["wallet"] = max(0, self.data[user_id]["wallet"] - loss)
-            save_data(self.data)
+            self.journal.apply((user_id, "wallet", -min(loss, self.data[user_id]["wallet"])))
             await interaction.response.send_message(f"❌ Failed work! Lost {loss} coins.")
 
 async def setup(bot):
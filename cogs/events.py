@@ -1,29 +1,18 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from datetime import datetime, timedelta
 from config import GUILD_ID
+from utils import storage
 
 DATA_FILE = "events.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Events(commands.Cog):
     """Server Events management with 20 slash commands"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
 
     # ----------------------------
     # 1. /createevent
@@ -42,7 +31,7 @@ class Events(commands.Cog):
             "datetime": dt,
             "attendees": []
         }
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message(f"✅ Event `{title}` created with ID `{event_id}`")
 
     # ----------------------------
@@ -53,7 +42,7 @@ class Events(commands.Cog):
         guild_data = self.data.get(str(interaction.guild.id), {}).get("events", {})
         if event_id in guild_data:
             del guild_data[event_id]
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"🗑️ Event `{event_id}` deleted")
         else:
             await interaction.response.send_message("❌ Event not found", ephemeral=True)
@@ -98,7 +87,7 @@ class Events(commands.Cog):
             return
         if interaction.user.id not in guild_data[event_id]["attendees"]:
             guild_data[event_id]["attendees"].append(interaction.user.id)
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"✅ You joined the event `{guild_data[event_id]['title']}`")
         else:
             await interaction.response.send_message("⚠️ You are already attending this event", ephemeral=True)
@@ -114,7 +103,7 @@ class Events(commands.Cog):
             return
         if interaction.user.id in guild_data[event_id]["attendees"]:
             guild_data[event_id]["attendees"].remove(interaction.user.id)
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"✅ You left the event `{guild_data[event_id]['title']}`")
         else:
             await interaction.response.send_message("⚠️ You are not attending this event", ephemeral=True)
@@ -143,7 +132,7 @@ class Events(commands.Cog):
         guild_data = self.data.get(str(interaction.guild.id), {}).get("events", {})
         if event_id in guild_data:
             guild_data[event_id]["title"] = new_title
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"✅ Event title updated to `{new_title}`")
         else:
             await interaction.response.send_message("❌ Event not found", ephemeral=True)
@@ -156,7 +145,7 @@ class Events(commands.Cog):
         guild_data = self.data.get(str(interaction.guild.id), {}).get("events", {})
         if event_id in guild_data:
             guild_data[event_id]["description"] = new_description
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"✅ Event description updated")
         else:
             await interaction.response.send_message("❌ Event not found", ephemeral=True)
@@ -169,7 +158,7 @@ class Events(commands.Cog):
         guild_data = self.data.get(str(interaction.guild.id), {}).get("events", {})
         if event_id in guild_data:
             guild_data[event_id]["datetime"] = f"{date} {time}"
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"✅ Event date/time updated")
         else:
             await interaction.response.send_message("❌ Event not found", ephemeral=True)
@@ -183,7 +172,7 @@ class Events(commands.Cog):
         if event_id in guild_data:
             if member.id not in guild_data[event_id]["attendees"]:
                 guild_data[event_id]["attendees"].append(member.id)
-                save_data(self.data)
+                self.data.mark_dirty(str(interaction.guild.id))
                 await interaction.response.send_message(f"✅ {member.mention} added to the event")
             else:
                 await interaction.response.send_message("⚠️ Member already attending", ephemeral=True)
@@ -199,7 +188,7 @@ class Events(commands.Cog):
         if event_id in guild_data:
             if member.id in guild_data[event_id]["attendees"]:
                 guild_data[event_id]["attendees"].remove(member.id)
-                save_data(self.data)
+                self.data.mark_dirty(str(interaction.guild.id))
                 await interaction.response.send_message(f"✅ {member.mention} removed from the event")
             else:
                 await interaction.response.send_message("⚠️ Member is not attending", ephemeral=True)
@@ -267,7 +256,7 @@ class Events(commands.Cog):
             if old_member.id in attendees:
                 attendees.remove(old_member.id)
                 attendees.append(new_member.id)
-                save_data(self.data)
+                self.data.mark_dirty(str(interaction.guild.id))
                 await interaction.response.send_message(f"✅ Replaced {old_member.mention} with {new_member.mention}")
             else:
                 await interaction.response.send_message(f"⚠️ {old_member.mention} is not attending", ephemeral=True)
@@ -282,7 +271,7 @@ class Events(commands.Cog):
         guild_data = self.data.get(str(interaction.guild.id), {}).get("events", {})
         if event_id in guild_data:
             guild_data[event_id]["attendees"] = []
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"🗑️ All attendees removed from event `{guild_data[event_id]['title']}`")
         else:
             await interaction.response.send_message("❌ Event not found", ephemeral=True)
@@ -296,7 +285,7 @@ class Events(commands.Cog):
         if event_id in guild_data:
             if field.lower() in ["title", "description", "datetime"]:
                 guild_data[event_id][field.lower()] = value
-                save_data(self.data)
+                self.data.mark_dirty(str(interaction.guild.id))
                 await interaction.response.send_message(f"✅ Event {field} updated")
             else:
                 await interaction.response.send_message("⚠️ Field must be title, description, or datetime", ephemeral=True)
@@ -309,7 +298,7 @@ class Events(commands.Cog):
     @app_commands.command(name="eventreset", description="Delete all events in server")
     async def eventreset(self, interaction: discord.Interaction):
         self.data[str(interaction.guild.id)]["events"] = {}
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message("🔄 All events reset")
 
 async def setup(bot):
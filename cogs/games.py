@@ -2,29 +2,18 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import random
-import json
-import os
 import asyncio
 from config import GUILD_ID
+from utils import storage
 
 DATA_FILE = "games.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Games(commands.Cog):
     """Interactive games cog with 20+ commands and JSON persistence"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
         self.active_games = {}  # channel_id: game_state
 
     # ----------------------------
@@ -317,7 +306,7 @@ class Games(commands.Cog):
         user_id = str(user_id)
         self.data.setdefault(user_id, {}).setdefault("scores", {}).setdefault(game,0)
         self.data[user_id]["scores"][game] += 1
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
 
 async def setup(bot):
     await bot.add_cog(Games(bot), guild=discord.Object(id=GUILD_ID))
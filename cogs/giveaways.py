@@ -1,31 +1,36 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-import json
-import os
-import asyncio
 from datetime import datetime, timedelta
 from config import GUILD_ID
+from utils import storage
+from utils.scheduler import get_scheduler
 
 DATA_FILE = "giveaways.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Giveaways(commands.Cog):
     """Giveaways system with 20 slash commands and JSON persistence"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
-        self.check_giveaways.start()
+        self.data = storage.open_store(DATA_FILE)
+        self.scheduler = get_scheduler()
+        self.scheduler.register("giveaway", self.end_giveaway)
+        # Giveaways started before timers existed (or whose timer was lost) get one now
+        for guild_id, g_data in self.data.items():
+            for msg_id, g in g_data.get("giveaways", {}).items():
+                if not g["ended"] and not self.scheduler.has(f"giveaway:{msg_id}"):
+                    self.schedule(guild_id, msg_id, g)
+
+    def cog_unload(self):
+        self.scheduler.unregister("giveaway")
+
+    def schedule(self, guild_id, msg_id, g):
+        """Arm or move the timer that ends this giveaway"""
+        self.scheduler.schedule("giveaway", datetime.fromisoformat(g["end_time"]), {
+            "guild_id": guild_id,
+            "msg_id": msg_id
+        }, timer_id=f"giveaway:{msg_id}")
 
     # ----------------------------
     # 1. /creategiveaway
@@ -40,14 +45,16 @@ class Giveaways(commands.Cog):
         embed = discord.Embed(title=f"🎉 Giveaway: {prize}", description=f"React with 🎉 to enter!\nEnds at {end_time} UTC\nWinners: {winners}", color=discord.Color.green())
         msg = await channel.send(embed=embed)
         await msg.add_reaction("🎉")
-        self.data.setdefault(str(interaction.guild.id), {}).setdefault("giveaways", {})[str(msg.id)] = {
+        g = {
             "channel_id": channel.id,
             "prize": prize,
             "end_time": end_time.isoformat(),
             "winners": winners,
             "ended": False
         }
-        save_data(self.data)
+        self.data.setdefault(str(interaction.guild.id), {}).setdefault("giveaways", {})[str(msg.id)] = g
+        self.schedule(str(interaction.guild.id), str(msg.id), g)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message(f"✅ Giveaway created in {channel.mention}")
 
     # ----------------------------
@@ -58,7 +65,8 @@ class Giveaways(commands.Cog):
         guild_data = self.data.get(str(interaction.guild.id), {}).get("giveaways", {})
         if message_id in guild_data:
             guild_data[message_id]["end_time"] = datetime.utcnow().isoformat()
-            save_data(self.data)
+            self.schedule(str(interaction.guild.id), message_id, guild_data[message_id])
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"✅ Giveaway {message_id} ended early")
         else:
             await interaction.response.send_message("❌ Giveaway not found", ephemeral=True)
@@ -132,7 +140,8 @@ class Giveaways(commands.Cog):
         guild_data = self.data.get(str(interaction.guild.id), {}).get("giveaways", {})
         if message_id in guild_data:
             del guild_data[message_id]
-            save_data(self.data)
+            self.scheduler.cancel(f"giveaway:{message_id}")
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"🗑️ Giveaway {message_id} deleted")
         else:
             await interaction.response.send_message("❌ Giveaway not found", ephemeral=True)
@@ -182,7 +191,8 @@ class Giveaways(commands.Cog):
         mentions = ", ".join(w.mention for w in winners)
         await channel.send(f"🏆 Giveaway winners: {mentions}")
         giveaway["ended"] = True
-        save_data(self.data)
+        self.scheduler.cancel(f"giveaway:{message_id}")
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message("✅ Giveaway drawn")
 
     # ----------------------------
@@ -197,7 +207,9 @@ class Giveaways(commands.Cog):
         g = guild_data[message_id]
         end_time = datetime.fromisoformat(g["end_time"]) + timedelta(minutes=minutes)
         g["end_time"] = end_time.isoformat()
-        save_data(self.data)
+        if not g["ended"]:
+            self.schedule(str(interaction.guild.id), message_id, g)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message(f"⏱️ Extended giveaway by {minutes} minutes")
 
     # ----------------------------
@@ -210,7 +222,7 @@ class Giveaways(commands.Cog):
             await interaction.response.send_message("❌ Giveaway not found")
             return
         guild_data[message_id]["prize"] = prize
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message(f"🎁 Prize updated to {prize}")
 
     # ----------------------------
@@ -300,8 +312,10 @@ class Giveaways(commands.Cog):
     # ----------------------------
     @app_commands.command(name="deleteallgiveaways", description="Delete all giveaways")
     async def deleteallgiveaways(self, interaction: discord.Interaction):
+        for msg_id in self.data[str(interaction.guild.id)]["giveaways"]:
+            self.scheduler.cancel(f"giveaway:{msg_id}")
         self.data[str(interaction.guild.id)]["giveaways"] = {}
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message("🗑️ All giveaways deleted")
 
     # ----------------------------
@@ -338,35 +352,30 @@ class Giveaways(commands.Cog):
         return []
 
     # ----------------------------
-    # Background task to end giveaways automatically
+    # Timer callback to end giveaways automatically
     # ----------------------------
-    @tasks.loop(seconds=60)
-    async def check_giveaways(self):
-        for guild_id, g_data in self.data.items():
-            for msg_id, g in g_data.get("giveaways", {}).items():
-                if not g["ended"]:
-                    end_time = datetime.fromisoformat(g["end_time"])
-                    if datetime.utcnow() >= end_time:
-                        guild = self.bot.get_guild(int(guild_id))
-                        channel = guild.get_channel(g["channel_id"])
-                        msg = await channel.fetch_message(int(msg_id))
-                        users = await self.get_users(msg)
-                        winners_count = g["winners"]
-                        winners = []
-                        if users:
-                            if len(users) <= winners_count:
-                                winners = users
-                            else:
-                                while len(winners) < winners_count:
-                                    winners.append(users.pop(0))
-                        mentions = ", ".join(w.mention for w in winners)
-                        await channel.send(f"🏆 Giveaway ended! Winners: {mentions}")
-                        g["ended"] = True
-        save_data(self.data)
-
-    @check_giveaways.before_loop
-    async def before_check_giveaways(self):
+    async def end_giveaway(self, payload):
+        guild_id, msg_id = payload["guild_id"], payload["msg_id"]
+        g = self.data.get(guild_id, {}).get("giveaways", {}).get(msg_id)
+        if g is None or g["ended"]:
+            return
         await self.bot.wait_until_ready()
+        guild = self.bot.get_guild(int(guild_id))
+        channel = guild.get_channel(g["channel_id"])
+        msg = await channel.fetch_message(int(msg_id))
+        users = await self.get_users(msg)
+        winners_count = g["winners"]
+        winners = []
+        if users:
+            if len(users) <= winners_count:
+                winners = users
+            else:
+                while len(winners) < winners_count:
+                    winners.append(users.pop(0))
+        mentions = ", ".join(w.mention for w in winners)
+        await channel.send(f"🏆 Giveaway ended! Winners: {mentions}")
+        g["ended"] = True
+        self.data.mark_dirty(guild_id)
 
 async def setup(bot):
     await bot.add_cog(Giveaways(bot), guild=discord.Object(id=GUILD_ID))
@@ -1,32 +1,73 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from datetime import datetime
-from config import GUILD_ID
-import aiohttp
-from PIL import Image, ImageDraw, ImageFont
+from config import GUILD_ID, OWNER_ID, RESULT_CACHE_BYTES
+from utils import http, storage
+from utils.avatar_cache import AvatarCache
+from utils.image_pool import ImagePool, PoolBusy
+from utils.lazy import lazy_import
+from utils.lru import ByteLRU
 from io import BytesIO
+import asyncio
 
-DATA_FILE = "images.json"
-
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
+# Pillow is imported by the first image command, not at startup
+image_ops = lazy_import("utils.image_ops")
+image_encoder = lazy_import("utils.image_encoder")
 
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+DATA_FILE = "images.json"
 
 class Images(commands.Cog):
-    """Image commands with 20 functional slash commands"""
+    """Image commands with 23 functional slash commands"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
+        self.session = http.acquire()
+        self.pool = ImagePool()
+        self.avatars = AvatarCache(self.session)
+        self.results = ByteLRU(RESULT_CACHE_BYTES)
+
+    async def cog_unload(self):
+        self.pool.shutdown()
+        await http.release()
+
+    def upload(self, data, name):
+        return discord.File(fp=BytesIO(data), filename=f"{name}.{image_encoder.extension(data)}")
+
+    async def render(self, interaction, name, steps, *assets):
+        """Run a pipeline of image steps on avatars in the worker pool and reply with the result"""
+        try:
+            steps = image_ops.validate(steps)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+        # Steps are pure, so (steps, avatar hashes) identifies the output
+        key = (steps, tuple(asset.key for asset in assets))
+        png = self.results.get(key)
+        if png is not None:
+            await interaction.response.send_message(file=self.upload(png, name))
+            return
+        if self.pool.full():
+            await interaction.response.send_message("⏳ Image workers are busy, try again in a moment.", ephemeral=True)
+            return
+        await interaction.response.defer()
+        try:
+            images = await asyncio.gather(*(self.avatars.fetch(asset) for asset in assets))
+            png = await self.pool.run(steps, *images)
+        except PoolBusy:
+            await interaction.followup.send("⏳ Image workers are busy, try again in a moment.")
+            return
+        except asyncio.TimeoutError:
+            await interaction.followup.send("❌ That image took too long to process.")
+            return
+        except Exception as e:
+            # Download failures, oversized avatars and worker errors: never leave the reply "thinking…"
+            print(f"⚠️ Image command {name} failed: {e!r}")
+            await interaction.followup.send("❌ Couldn't process that image, try again later.")
+            return
+        self.results.put(key, png)
+        await interaction.followup.send(file=self.upload(png, name))
 
     # ----------------------------
     # 1. /avatar
@@ -42,16 +83,7 @@ class Images(commands.Cog):
     @app_commands.command(name="pixelate", description="Pixelate a user's avatar")
     async def pixelate(self, interaction: discord.Interaction, member: discord.Member = None, size: int = 10):
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes)).convert("RGB")
-        image_small = image.resize((size, size), resample=Image.BILINEAR)
-        image = image_small.resize(image.size, Image.NEAREST)
-        buffer = BytesIO()
-        image.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="pixelate.png"))
+        await self.render(interaction, "pixelate", [image_ops.step("pixelate", size=size)], member.display_avatar)
 
     # ----------------------------
     # 3. /invert
@@ -59,15 +91,7 @@ class Images(commands.Cog):
     @app_commands.command(name="invert", description="Invert a user's avatar colors")
     async def invert(self, interaction: discord.Interaction, member: discord.Member = None):
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes)).convert("RGB")
-        inverted = Image.eval(image, lambda x: 255 - x)
-        buffer = BytesIO()
-        inverted.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="invert.png"))
+        await self.render(interaction, "invert", [image_ops.step("invert")], member.display_avatar)
 
     # ----------------------------
     # 4. /grayscale
@@ -75,31 +99,15 @@ class Images(commands.Cog):
     @app_commands.command(name="grayscale", description="Convert a user's avatar to grayscale")
     async def grayscale(self, interaction: discord.Interaction, member: discord.Member = None):
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes)).convert("L")
-        buffer = BytesIO()
-        image.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="grayscale.png"))
+        await self.render(interaction, "grayscale", [image_ops.step("grayscale")], member.display_avatar)
 
     # ----------------------------
     # 5. /blur
     # ----------------------------
     @app_commands.command(name="blur", description="Apply blur to a user's avatar")
     async def blur(self, interaction: discord.Interaction, member: discord.Member = None, radius: int = 5):
-        from PIL import ImageFilter
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes)).convert("RGB")
-        image = image.filter(ImageFilter.GaussianBlur(radius))
-        buffer = BytesIO()
-        image.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="blur.png"))
+        await self.render(interaction, "blur", [image_ops.step("blur", radius=radius)], member.display_avatar)
 
     # ----------------------------
     # 6. /rotate
@@ -107,29 +115,14 @@ class Images(commands.Cog):
     @app_commands.command(name="rotate", description="Rotate a user's avatar")
     async def rotate(self, interaction: discord.Interaction, member: discord.Member = None, degrees: int = 90):
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes)).convert("RGBA")
-        rotated = image.rotate(degrees, expand=True)
-        buffer = BytesIO()
-        rotated.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="rotate.png"))
+        await self.render(interaction, "rotate", [image_ops.step("rotate", degrees=degrees)], member.display_avatar)
 
     # ----------------------------
     # 7. /textimage
     # ----------------------------
     @app_commands.command(name="textimage", description="Create an image with custom text")
     async def textimage(self, interaction: discord.Interaction, text: str):
-        image = Image.new("RGB", (600, 200), color=(73, 109, 137))
-        draw = ImageDraw.Draw(image)
-        font = ImageFont.load_default()
-        draw.text((10, 80), text, fill=(255, 255, 255), font=font)
-        buffer = BytesIO()
-        image.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="text.png"))
+        await self.render(interaction, "text", [image_ops.step("textimage", text=text)])
 
     # ----------------------------
     # 8. /flip
@@ -137,15 +130,7 @@ class Images(commands.Cog):
     @app_commands.command(name="flip", description="Flip a user's avatar horizontally")
     async def flip(self, interaction: discord.Interaction, member: discord.Member = None):
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes))
-        flipped = image.transpose(Image.FLIP_LEFT_RIGHT)
-        buffer = BytesIO()
-        flipped.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="flip.png"))
+        await self.render(interaction, "flip", [image_ops.step("flip")], member.display_avatar)
 
     # ----------------------------
     # 9. /mirror
@@ -153,15 +138,7 @@ class Images(commands.Cog):
     @app_commands.command(name="mirror", description="Mirror a user's avatar vertically")
     async def mirror(self, interaction: discord.Interaction, member: discord.Member = None):
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes))
-        mirrored = image.transpose(Image.FLIP_TOP_BOTTOM)
-        buffer = BytesIO()
-        mirrored.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="mirror.png"))
+        await self.render(interaction, "mirror", [image_ops.step("mirror")], member.display_avatar)
 
     # ----------------------------
     # 10. /circleavatar
@@ -169,37 +146,15 @@ class Images(commands.Cog):
     @app_commands.command(name="circleavatar", description="Make avatar circular")
     async def circleavatar(self, interaction: discord.Interaction, member: discord.Member = None):
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes)).convert("RGBA")
-        size = image.size
-        mask = Image.new("L", size, 0)
-        draw = ImageDraw.Draw(mask)
-        draw.ellipse((0, 0) + size, fill=255)
-        output = Image.new("RGBA", size)
-        output.paste(image, mask=mask)
-        buffer = BytesIO()
-        output.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="circle.png"))
+        await self.render(interaction, "circle", [image_ops.step("circle")], member.display_avatar)
 
     # ----------------------------
     # 11. /sharpen
     # ----------------------------
     @app_commands.command(name="sharpen", description="Sharpen a user's avatar")
     async def sharpen(self, interaction: discord.Interaction, member: discord.Member = None):
-        from PIL import ImageFilter
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes))
-        sharp = image.filter(ImageFilter.SHARPEN)
-        buffer = BytesIO()
-        sharp.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="sharpen.png"))
+        await self.render(interaction, "sharpen", [image_ops.step("sharpen")], member.display_avatar)
 
     # ----------------------------
     # 12. /sepia
@@ -207,40 +162,15 @@ class Images(commands.Cog):
     @app_commands.command(name="sepia", description="Apply sepia filter to avatar")
     async def sepia(self, interaction: discord.Interaction, member: discord.Member = None):
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes)).convert("RGB")
-        sepia_image = Image.new("RGB", image.size)
-        pixels = image.load()
-        for x in range(image.width):
-            for y in range(image.height):
-                r, g, b = pixels[x, y]
-                tr = int(0.393*r + 0.769*g + 0.189*b)
-                tg = int(0.349*r + 0.686*g + 0.168*b)
-                tb = int(0.272*r + 0.534*g + 0.131*b)
-                sepia_image.putpixel((x, y), (min(tr,255), min(tg,255), min(tb,255)))
-        buffer = BytesIO()
-        sepia_image.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="sepia.png"))
+        await self.render(interaction, "sepia", [image_ops.step("sepia")], member.display_avatar)
 
     # ----------------------------
     # 13. /sketch
     # ----------------------------
     @app_commands.command(name="sketch", description="Sketch effect on avatar")
     async def sketch(self, interaction: discord.Interaction, member: discord.Member = None):
-        from PIL import ImageFilter
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes)).convert("L")
-        sketch = image.filter(ImageFilter.CONTOUR)
-        buffer = BytesIO()
-        sketch.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="sketch.png"))
+        await self.render(interaction, "sketch", [image_ops.step("sketch")], member.display_avatar)
 
     # ----------------------------
     # 14. /thumbnail
@@ -248,15 +178,7 @@ class Images(commands.Cog):
     @app_commands.command(name="thumbnail", description="Create a 128x128 thumbnail of avatar")
     async def thumbnail(self, interaction: discord.Interaction, member: discord.Member = None):
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes))
-        image.thumbnail((128,128))
-        buffer = BytesIO()
-        image.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="thumbnail.png"))
+        await self.render(interaction, "thumbnail", [image_ops.step("thumbnail")], member.display_avatar)
 
     # ----------------------------
     # 15. /banner
@@ -276,16 +198,7 @@ class Images(commands.Cog):
     @app_commands.command(name="frameavatar", description="Add a red frame to avatar")
     async def frameavatar(self, interaction: discord.Interaction, member: discord.Member = None):
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes)).convert("RGBA")
-        draw = ImageDraw.Draw(image)
-        draw.rectangle([0,0,image.width-1,image.height-1], outline="red", width=10)
-        buffer = BytesIO()
-        image.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="frame.png"))
+        await self.render(interaction, "frame", [image_ops.step("frame")], member.display_avatar)
 
     # ----------------------------
     # 17. /resize
@@ -293,15 +206,7 @@ class Images(commands.Cog):
     @app_commands.command(name="resize", description="Resize avatar to width and height")
     async def resize(self, interaction: discord.Interaction, member: discord.Member = None, width: int = 256, height: int = 256):
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes))
-        image = image.resize((width, height))
-        buffer = BytesIO()
-        image.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="resize.png"))
+        await self.render(interaction, "resize", [image_ops.step("resize", width=width, height=height)], member.display_avatar)
 
     # ----------------------------
     # 18. /textoverlay
@@ -309,37 +214,14 @@ class Images(commands.Cog):
     @app_commands.command(name="textoverlay", description="Overlay text on avatar")
     async def textoverlay(self, interaction: discord.Interaction, text: str, member: discord.Member = None):
         member = member or interaction.user
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member.avatar.url)) as resp:
-                img_bytes = await resp.read()
-        image = Image.open(BytesIO(img_bytes)).convert("RGBA")
-        draw = ImageDraw.Draw(image)
-        font = ImageFont.load_default()
-        draw.text((10,10), text, fill=(255,255,255), font=font)
-        buffer = BytesIO()
-        image.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="overlay.png"))
+        await self.render(interaction, "overlay", [image_ops.step("textoverlay", text=text)], member.display_avatar)
 
     # ----------------------------
     # 19. /combineavatars
     # ----------------------------
     @app_commands.command(name="combineavatars", description="Combine two user avatars side by side")
     async def combineavatars(self, interaction: discord.Interaction, member1: discord.Member, member2: discord.Member):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(member1.avatar.url)) as resp:
-                img1 = Image.open(BytesIO(await resp.read())).convert("RGBA")
-            async with session.get(str(member2.avatar.url)) as resp:
-                img2 = Image.open(BytesIO(await resp.read())).convert("RGBA")
-        width = img1.width + img2.width
-        height = max(img1.height, img2.height)
-        new_img = Image.new("RGBA", (width, height))
-        new_img.paste(img1, (0,0))
-        new_img.paste(img2, (img1.width,0))
-        buffer = BytesIO()
-        new_img.save(buffer, format="PNG")
-        buffer.seek(0)
-        await interaction.response.send_message(file=discord.File(fp=buffer, filename="combine.png"))
+        await self.render(interaction, "combine", [image_ops.step("combine")], member1.display_avatar, member2.display_avatar)
 
     # ----------------------------
     # 20. /saveimage
@@ -348,8 +230,53 @@ class Images(commands.Cog):
     async def saveimage(self, interaction: discord.Interaction, url: str):
         user_id = str(interaction.user.id)
         self.data.setdefault(user_id, {}).setdefault("images", []).append(url)
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
         await interaction.response.send_message("✅ Image saved to your record")
 
+    # ----------------------------
+    # 21. /tint
+    # ----------------------------
+    @app_commands.command(name="tint", description="Tint a user's avatar with a colour (hex, e.g. #ff0000)")
+    async def tint(self, interaction: discord.Interaction, color: str = "#ff0000", strength: float = 0.5, member: discord.Member = None):
+        try:
+            rgb = discord.Color.from_str(color).to_rgb()
+        except ValueError:
+            await interaction.response.send_message("❌ Invalid colour! Use a hex code like #ff0000.", ephemeral=True)
+            return
+        member = member or interaction.user
+        await self.render(interaction, "tint", [image_ops.step("tint", color=rgb, strength=max(0.0, min(strength, 1.0)))], member.display_avatar)
+
+    # ----------------------------
+    # 22. /imagecache
+    # ----------------------------
+    @app_commands.command(name="imagecache", description="Show image cache hit rates (owner only)")
+    async def imagecache(self, interaction: discord.Interaction):
+        if interaction.user.id != OWNER_ID:
+            await interaction.response.send_message("❌ Owner only.", ephemeral=True)
+            return
+        embed = discord.Embed(title="🖼️ Image caches", color=discord.Color.blurple())
+        for name, stats in (("Rendered results", self.results.stats()), ("Avatars (memory)", self.avatars.memory.stats())):
+            embed.add_field(name=name, value=(
+                f"Hits: {stats['hits']} | Misses: {stats['misses']} ({stats['hit_rate']:.0%})\n"
+                f"Entries: {stats['entries']} | {stats['bytes'] / 1048576:.1f}/{stats['max_bytes'] / 1048576:.0f} MiB"
+            ), inline=False)
+        embed.add_field(name="Avatar downloads", value=(
+            f"Disk hits: {self.avatars.hits['disk']} | Shared: {self.avatars.hits['shared']} | Fetched: {self.avatars.misses}"
+        ), inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ----------------------------
+    # 23. /pipeline
+    # ----------------------------
+    @app_commands.command(name="pipeline", description="Chain effects on an avatar, e.g. blur radius=3 > sepia > frame")
+    async def pipeline(self, interaction: discord.Interaction, steps: str, member: discord.Member = None):
+        try:
+            parsed = image_ops.parse_pipeline(steps)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+        member = member or interaction.user
+        await self.render(interaction, "pipeline", parsed, member.display_avatar)
+
 async def setup(bot):
     await bot.add_cog(Images(bot), guild=discord.Object(id=GUILD_ID))
@@ -0,0 +1,108 @@
+import discord
+from discord.ext import commands, tasks
+from discord import app_commands
+import os
+from config import GUILD_ID, OWNER_ID, METRICS_FILE, METRICS_DUMP_INTERVAL
+from utils.metrics import get_metrics
+from utils.watchdog import get_watchdog
+
+TOP = 15
+
+def format_ms(seconds):
+    return ">10s" if seconds == float("inf") else f"{seconds * 1000:.0f}ms"
+
+class Instrumentation(commands.Cog):
+    """Per-command and per-listener call counts, errors and latency, plus event loop lag"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.metrics = get_metrics()
+        self.watchdog = get_watchdog()
+        self.dump.start()
+
+    async def cog_load(self):
+        self.watchdog.start()
+
+    def cog_unload(self):
+        self.dump.cancel()
+        self.watchdog.stop()
+        self.metrics.dump(METRICS_FILE)
+
+    # --------------------
+    # Periodic OpenMetrics dump
+    # --------------------
+    @tasks.loop(seconds=METRICS_DUMP_INTERVAL)
+    async def dump(self):
+        self.metrics.dump(METRICS_FILE)
+
+    # --------------------
+    # Command stats
+    # --------------------
+    @app_commands.command(name="command_stats", description="Show call counts, errors and latency per command")
+    @app_commands.describe(cog="Only show handlers of this cog (e.g. Images)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def command_stats(self, interaction: discord.Interaction, cog: str = None):
+        if cog:
+            rows = [
+                (f"{kind[0]} {name}", histogram)
+                for (kind, cog_name, name), histogram in self.metrics.series.items()
+                if cog_name.lower() == cog.lower() and histogram.count
+            ]
+            title = f"📊 {cog}"
+        else:
+            rows = [(name, histogram) for name, histogram in self.metrics.by_cog().items() if histogram.count]
+            title = "📊 Cogs"
+        if not rows:
+            await interaction.response.send_message("📊 Nothing recorded yet.", ephemeral=True)
+            return
+        # Most total time first: that is where a speed-up pays off
+        rows.sort(key=lambda row: row[1].total, reverse=True)
+        lines = [f"{'name':<24} {'calls':>6} {'err':>4} {'p50':>6} {'p95':>6} {'p99':>6}"]
+        for name, histogram in rows[:TOP]:
+            lines.append(
+                f"{name[:24]:<24} {histogram.count:>6} {histogram.errors:>4} "
+                f"{format_ms(histogram.quantile(0.5)):>6} {format_ms(histogram.quantile(0.95)):>6} "
+                f"{format_ms(histogram.quantile(0.99)):>6}"
+            )
+        body = "\n".join(lines)
+        await interaction.response.send_message(
+            f"{title} (top {min(len(rows), TOP)} by total time, full dump in `{METRICS_FILE}`)\n```\n{body}\n```",
+            ephemeral=True
+        )
+
+    # --------------------
+    # Event loop lag
+    # --------------------
+    @app_commands.command(name="loop_lag", description="Show event loop lag and what blocked it (owner only)")
+    async def loop_lag(self, interaction: discord.Interaction):
+        if interaction.user.id != OWNER_ID:
+            await interaction.response.send_message("❌ Owner only.", ephemeral=True)
+            return
+        watchdog = self.watchdog
+        embed = discord.Embed(title="🐢 Event loop lag", color=discord.Color.blurple())
+        embed.add_field(name="Last minute", value=(
+            f"p50 {format_ms(watchdog.percentile(0.5))} | p99 {format_ms(watchdog.percentile(0.99))} | "
+            f"worst {format_ms(watchdog.percentile(1.0))}"
+        ), inline=False)
+        offenders = sorted(watchdog.offenders.items(), key=lambda item: item[1][1], reverse=True)[:TOP]
+        if offenders:
+            lines = [
+                f"{cog}.{handler}: {count}x, worst {format_ms(worst)} at {where}"
+                for (cog, handler), (count, total, worst, where) in offenders
+            ]
+            embed.add_field(name=f"Stalls over {format_ms(watchdog.threshold)} since start", value="\n".join(lines)[:1024], inline=False)
+        if watchdog.stalls:
+            stall = watchdog.stalls[-1]
+            frames = "".join(f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}\n" for frame in (stall.stack or [])[-6:])
+            embed.add_field(
+                name=f"Latest: {format_ms(stall.lag)} in {stall.cog}.{stall.handler} <t:{int(stall.at)}:R>",
+                value=f"```\n{frames or stall.where}```"[:1024],
+                inline=False
+            )
+        else:
+            embed.add_field(name="Latest", value="✅ No stalls recorded", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Instrumentation(bot), guild=discord.Object(id=GUILD_ID))
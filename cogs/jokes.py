@@ -1,15 +1,19 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
 import random
 from config import GUILD_ID
+from utils import http
 
 class Jokes(commands.Cog):
     """Jokes system with 20 commands using JokeAPI"""
 
     def __init__(self, bot):
         self.bot = bot
+        self.session = http.acquire()
+
+    async def cog_unload(self):
+        await http.release()
 
     async def fetch_joke(self, category: str = "Any", blacklist: str = None, type_: str = None):
         url = f"https://v2.jokeapi.dev/joke/{category}"
@@ -18,11 +22,10 @@ class Jokes(commands.Cog):
             params["blacklistFlags"] = blacklist
         if type_:
             params["type"] = type_
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    return data
+        async with self.session.get(url, params=params) as resp:
+            if resp.status == 200:
+                data = await resp.json()
+                return data
         return None
 
     # 1. /joke
@@ -1,21 +1,17 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from config import GUILD_ID
+from utils import storage
 
-# Load JSON data files
+# Shared JSON stores (same live objects the owning cogs write to)
 LEVEL_FILE = "leveling.json"
 ECON_FILE = "economy.json"
 VOICE_FILE = "voice_data.json"
 SOCIAL_FILE = "social_data.json"
 
 def load_json(file):
-    if os.path.exists(file):
-        with open(file, "r") as f:
-            return json.load(f)
-    return {}
+    return storage.open_store(file)
 
 class Leaderboard(commands.Cog):
     """Server-wide leaderboards"""
@@ -28,8 +24,7 @@ class Leaderboard(commands.Cog):
     # --------------------
     @app_commands.command(name="level_leaderboard", description="Show top 10 users by level")
     async def level_leaderboard(self, interaction: discord.Interaction):
-        data = load_json(LEVEL_FILE).get(str(interaction.guild.id), {})
-        sorted_users = sorted(data.items(), key=lambda x: x[1].get("level", 0), reverse=True)[:10]
+        sorted_users = await load_json(LEVEL_FILE).top("level", 10)
         if not sorted_users:
             await interaction.response.send_message("No leveling data yet!")
             return
@@ -45,8 +40,7 @@ class Leaderboard(commands.Cog):
     # --------------------
     @app_commands.command(name="money_leaderboard", description="Top 10 richest users")
     async def money_leaderboard(self, interaction: discord.Interaction):
-        data = load_json(ECON_FILE).get(str(interaction.guild.id), {})
-        sorted_users = sorted(data.items(), key=lambda x: x[1].get("balance", 0), reverse=True)[:10]
+        sorted_users = await load_json(ECON_FILE).top("total", 10)
         if not sorted_users:
             await interaction.response.send_message("No economy data yet!")
             return
@@ -54,7 +48,7 @@ class Leaderboard(commands.Cog):
         for i, (uid, info) in enumerate(sorted_users, start=1):
             member = interaction.guild.get_member(int(uid))
             if member:
-                embed.add_field(name=f"{i}. {member.display_name}", value=f"Balance: {info.get('balance',0)}", inline=False)
+                embed.add_field(name=f"{i}. {member.display_name}", value=f"Balance: {info.get('wallet',0) + info.get('bank',0)}", inline=False)
         await interaction.response.send_message(embed=embed)
 
     # --------------------
@@ -62,8 +56,7 @@ class Leaderboard(commands.Cog):
     # --------------------
     @app_commands.command(name="vc_leaderboard", description="Top 10 users by voice time")
     async def vc_leaderboard(self, interaction: discord.Interaction):
-        data = load_json(VOICE_FILE).get(str(interaction.guild.id), {})
-        sorted_users = sorted(data.items(), key=lambda x: x[1].get("voice_time", 0), reverse=True)[:10]
+        sorted_users = await load_json(VOICE_FILE).top("voice_time", 10, group=str(interaction.guild.id))
         if not sorted_users:
             await interaction.response.send_message("No voice data yet!")
             return
@@ -80,8 +73,7 @@ class Leaderboard(commands.Cog):
     # --------------------
     @app_commands.command(name="social_leaderboard", description="Top 10 users by social interactions")
     async def social_leaderboard(self, interaction: discord.Interaction):
-        data = load_json(SOCIAL_FILE).get(str(interaction.guild.id), {})
-        sorted_users = sorted(data.items(), key=lambda x: x[1].get("interactions", 0), reverse=True)[:10]
+        sorted_users = await load_json(SOCIAL_FILE).top("interactions", 10, group=str(interaction.guild.id))
         if not sorted_users:
             await interaction.response.send_message("No social data yet!")
             return
@@ -92,24 +84,46 @@ class Leaderboard(commands.Cog):
                 embed.add_field(name=f"{i}. {member.display_name}", value=f"Interactions: {info.get('interactions',0)}", inline=False)
         await interaction.response.send_message(embed=embed)
 
+    # --------------------
+    # Personal ranks
+    # --------------------
+    @app_commands.command(name="myrank", description="Show your position on the XP and money leaderboards")
+    async def myrank(self, interaction: discord.Interaction, member: discord.Member = None):
+        member = member or interaction.user
+        user_id = str(member.id)
+        xp_rank = await load_json(LEVEL_FILE).rank("xp", user_id)
+        money_rank = await load_json(ECON_FILE).rank("total", user_id)
+        embed = discord.Embed(title=f"📊 {member.display_name}'s Ranks", color=discord.Color.gold())
+        embed.add_field(name="XP", value=f"#{xp_rank}" if xp_rank else "Unranked", inline=False)
+        embed.add_field(name="Money", value=f"#{money_rank}" if money_rank else "Unranked", inline=False)
+        await interaction.response.send_message(embed=embed)
+
     # --------------------
     # Combined leaderboard
     # --------------------
     @app_commands.command(name="combined_leaderboard", description="Top 10 users by total points (level + money + VC time + social)")
     async def combined_leaderboard(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
-        leveling = load_json(LEVEL_FILE).get(guild_id, {})
-        economy = load_json(ECON_FILE).get(guild_id, {})
-        voice = load_json(VOICE_FILE).get(guild_id, {})
-        social = load_json(SOCIAL_FILE).get(guild_id, {})
+        members = [str(m.id) for m in interaction.guild.members]
+        leveling = load_json(LEVEL_FILE)
+        economy = load_json(ECON_FILE)
+        voice_store = load_json(VOICE_FILE)
+        social_store = load_json(SOCIAL_FILE)
+        # One read per store on the database thread (no-ops on JSON), so the lookups below hit memory
+        await leveling.load(*members)
+        await economy.load(*members)
+        await voice_store.load(*((guild_id, uid) for uid in members))
+        await social_store.load(*((guild_id, uid) for uid in members))
+        voice = voice_store.get(guild_id, {})
+        social = social_store.get(guild_id, {})
 
         scores = {}
-        for uid in set(list(leveling.keys()) + list(economy.keys()) + list(voice.keys()) + list(social.keys())):
-            lvl = leveling.get(uid, {}).get("level", 0)
-            money = economy.get(uid, {}).get("balance", 0)
-            vc_time = voice.get(uid, {}).get("voice_time", 0)
-            social_int = social.get(uid, {}).get("interactions", 0)
-            scores[uid] = lvl + money + vc_time + social_int
+        for uid in members:
+            records = [leveling.get(uid), economy.get(uid), voice.get(uid), social.get(uid)]
+            if not any(records):
+                continue
+            lvl, money, vc, soc = (record or {} for record in records)
+            scores[uid] = lvl.get("level", 0) + money.get("wallet", 0) + money.get("bank", 0) + vc.get("voice_time", 0) + soc.get("interactions", 0)
 
         sorted_users = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:10]
         if not sorted_users:
@@ -1,35 +1,30 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 import random
 from config import GUILD_ID
+from utils import storage
 
 DATA_FILE = "leveling.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Leveling(commands.Cog):
     """Leveling system with 20+ slash commands"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
 
     def ensure_user(self, user_id):
         user_id = str(user_id)
         self.data.setdefault(user_id, {"xp": 0, "level": 1})
         return user_id
 
+    async def interaction_check(self, interaction: discord.Interaction):
+        # Read the records this command will touch on the database thread, not the loop
+        users = [interaction.user] + [v for _, v in interaction.namespace if isinstance(v, (discord.User, discord.Member))]
+        await self.data.load(*{str(user.id) for user in users})
+        return True
+
     def xp_to_level(self, xp):
         # Simple leveling formula: level = int(xp**0.5)
         return int(xp ** 0.5)
@@ -46,8 +41,8 @@ class Leveling(commands.Cog):
     # 2. /top
     @app_commands.command(name="top", description="Show top 10 users")
     async def top(self, interaction: discord.Interaction):
-        leaderboard = sorted(self.data.items(), key=lambda x: x[1]["xp"], reverse=True)
-        msg = "\n".join([f"<@{uid}> - Level {info['level']} ({info['xp']} XP)" for uid,info in leaderboard[:10]])
+        leaderboard = await self.data.top("xp", 10)
+        msg = "\n".join([f"<@{uid}> - Level {info['level']} ({info['xp']} XP)" for uid,info in leaderboard])
         await interaction.response.send_message(f"🏆 Top 10 Users:\n{msg or 'No data yet.'}")
 
     # 3. /addxp
@@ -59,7 +54,7 @@ class Leveling(commands.Cog):
         user_id = self.ensure_user(member.id)
         self.data[user_id]["xp"] += xp
         self.data[user_id]["level"] = self.xp_to_level(self.data[user_id]["xp"])
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
         await interaction.response.send_message(f"✅ Added {xp} XP to {member.mention}")
 
     # 4. /removexp
@@ -71,7 +66,7 @@ class Leveling(commands.Cog):
         user_id = self.ensure_user(member.id)
         self.data[user_id]["xp"] = max(0, self.data[user_id]["xp"] - xp)
         self.data[user_id]["level"] = self.xp_to_level(self.data[user_id]["xp"])
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
         await interaction.response.send_message(f"✅ Removed {xp} XP from {member.mention}")
 
     # 5. /setlevel
@@ -83,7 +78,7 @@ class Leveling(commands.Cog):
         user_id = self.ensure_user(member.id)
         self.data[user_id]["level"] = level
         self.data[user_id]["xp"] = level**2
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
         await interaction.response.send_message(f"✅ Set {member.mention} to level {level}")
 
     # 6. /setxp
@@ -95,7 +90,7 @@ class Leveling(commands.Cog):
         user_id = self.ensure_user(member.id)
         self.data[user_id]["xp"] = xp
         self.data[user_id]["level"] = self.xp_to_level(xp)
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
         await interaction.response.send_message(f"✅ Set {member.mention} to {xp} XP")
 
     # 7. /xp
@@ -115,15 +110,15 @@ class Leveling(commands.Cog):
     # 9. /leaderboardxp
     @app_commands.command(name="leaderboardxp", description="Show top users by XP")
     async def leaderboardxp(self, interaction: discord.Interaction):
-        leaderboard = sorted(self.data.items(), key=lambda x: x[1]["xp"], reverse=True)
-        msg = "\n".join([f"<@{uid}> - {info['xp']} XP" for uid, info in leaderboard[:10]])
+        leaderboard = await self.data.top("xp", 10)
+        msg = "\n".join([f"<@{uid}> - {info['xp']} XP" for uid, info in leaderboard])
         await interaction.response.send_message(f"🏅 XP Leaderboard:\n{msg or 'No data'}")
 
     # 10. /leaderboardlevel
     @app_commands.command(name="leaderboardlevel", description="Show top users by level")
     async def leaderboardlevel(self, interaction: discord.Interaction):
-        leaderboard = sorted(self.data.items(), key=lambda x: x[1]["level"], reverse=True)
-        msg = "\n".join([f"<@{uid}> - Level {info['level']}" for uid, info in leaderboard[:10]])
+        leaderboard = await self.data.top("level", 10)
+        msg = "\n".join([f"<@{uid}> - Level {info['level']}" for uid, info in leaderboard])
         await interaction.response.send_message(f"🏅 Level Leaderboard:\n{msg or 'No data'}")
 
     # 11. /resetxp
@@ -135,7 +130,7 @@ class Leveling(commands.Cog):
         user_id = self.ensure_user(member.id)
         self.data[user_id]["xp"] = 0
         self.data[user_id]["level"] = 1
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
         await interaction.response.send_message(f"✅ Reset XP for {member.mention}")
 
     # 12. /resetlevel
@@ -147,7 +142,7 @@ class Leveling(commands.Cog):
         user_id = self.ensure_user(member.id)
         self.data[user_id]["level"] = 1
         self.data[user_id]["xp"] = 0
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
         await interaction.response.send_message(f"✅ Reset level for {member.mention}")
 
     # 13. /awardxp
@@ -159,7 +154,7 @@ class Leveling(commands.Cog):
         for uid in self.data:
             self.data[uid]["xp"] += xp
             self.data[uid]["level"] = self.xp_to_level(self.data[uid]["xp"])
-        save_data(self.data)
+        self.data.mark_dirty()
         await interaction.response.send_message(f"✅ Awarded {xp} XP to all users")
 
     # 14. /randomxp
@@ -169,7 +164,7 @@ class Leveling(commands.Cog):
         xp = random.randint(5, 25)
         self.data[user_id]["xp"] += xp
         self.data[user_id]["level"] = self.xp_to_level(self.data[user_id]["xp"])
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
         await interaction.response.send_message(f"🎲 You gained {xp} random XP!")
 
     # 15. /rankup
@@ -178,18 +173,14 @@ class Leveling(commands.Cog):
         user_id = self.ensure_user(interaction.user.id)
         self.data[user_id]["level"] += 1
         self.data[user_id]["xp"] = self.data[user_id]["level"]**2
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
         await interaction.response.send_message(f"⬆️ You ranked up to level {self.data[user_id]['level']}!")
 
     # 16. /leaderboardall
     @app_commands.command(name="leaderboardall", description="Top users by level + XP")
     async def leaderboardall(self, interaction: discord.Interaction):
-        leaderboard = sorted(
-            self.data.items(),
-            key=lambda x: (x[1]["level"], x[1]["xp"]),
-            reverse=True
-        )
-        msg = "\n".join([f"<@{uid}> - Level {info['level']} ({info['xp']} XP)" for uid, info in leaderboard[:10]])
+        leaderboard = await self.data.top("all", 10)
+        msg = "\n".join([f"<@{uid}> - Level {info['level']} ({info['xp']} XP)" for uid, info in leaderboard])
         await interaction.response.send_message(f"🏆 Leaderboard:\n{msg or 'No data'}")
 
     # 17. /showxp
@@ -216,7 +207,7 @@ class Leveling(commands.Cog):
         for uid in self.data:
             self.data[uid]["xp"] = 0
             self.data[uid]["level"] = 1
-        save_data(self.data)
+        self.data.mark_dirty()
         await interaction.response.send_message("✅ Reset XP and level for all users")
 
     # 20. /randomlevel
@@ -226,7 +217,7 @@ class Leveling(commands.Cog):
         gained = random.randint(0,2)
         self.data[user_id]["level"] += gained
         self.data[user_id]["xp"] = self.data[user_id]["level"]**2
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
         await interaction.response.send_message(f"🎲 You gained {gained} random level(s)! Now level {self.data[user_id]['level']}")
 
 async def setup(bot):
@@ -1,28 +1,23 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-import json
-import os
 from config import GUILD_ID
+from utils import storage
+from utils.log_dispatcher import get_dispatcher
 
 DATA_FILE = "logging.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Logging(commands.Cog):
     """Logging system with 20 slash commands and JSON persistence"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
+        # Log lines are batched per channel instead of one message each
+        self.logs = get_dispatcher()
+
+    async def cog_unload(self):
+        await self.logs.flush()
 
     # ----------------------------
     # 1. /setlog
@@ -33,7 +28,7 @@ class Logging(commands.Cog):
             await interaction.response.send_message("❌ Only admins can set log channels.", ephemeral=True)
             return
         self.data[str(interaction.guild.id)] = {"log_channel": channel.id}
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message(f"✅ Logging channel set to {channel.mention}")
 
     # ----------------------------
@@ -57,7 +52,7 @@ class Logging(commands.Cog):
         log_channel_id = self.data.get(str(interaction.guild.id), {}).get("log_channel")
         if log_channel_id:
             channel = interaction.guild.get_channel(log_channel_id)
-            await channel.send(f"📝 {message}")
+            await self.logs.put(channel, f"📝 {message}")
             await interaction.response.send_message("✅ Message logged.")
         else:
             await interaction.response.send_message("❌ Logging channel not set.")
@@ -70,7 +65,7 @@ class Logging(commands.Cog):
         log_channel_id = self.data.get(str(interaction.guild.id), {}).get("log_channel")
         if log_channel_id:
             channel = interaction.guild.get_channel(log_channel_id)
-            await channel.send(f"👤 User logged: {member} (ID: {member.id})")
+            await self.logs.put(channel, f"👤 User logged: {member} (ID: {member.id})")
             await interaction.response.send_message(f"✅ Logged {member.mention}")
         else:
             await interaction.response.send_message("❌ Logging channel not set.")
@@ -82,7 +77,7 @@ class Logging(commands.Cog):
     async def enablejoinlog(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["join_leave"] = True
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Join/Leave logging enabled.")
 
     # ----------------------------
@@ -92,7 +87,7 @@ class Logging(commands.Cog):
     async def disablejoinlog(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["join_leave"] = False
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("❌ Join/Leave logging disabled.")
 
     # ----------------------------
@@ -102,7 +97,7 @@ class Logging(commands.Cog):
     async def enablemessageeditlog(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["message_edit"] = True
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Message edit logging enabled.")
 
     # ----------------------------
@@ -112,7 +107,7 @@ class Logging(commands.Cog):
     async def disablemessageeditlog(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["message_edit"] = False
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("❌ Message edit logging disabled.")
 
     # ----------------------------
@@ -122,7 +117,7 @@ class Logging(commands.Cog):
     async def enablemessagedeletelog(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["message_delete"] = True
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Message delete logging enabled.")
 
     # ----------------------------
@@ -132,7 +127,7 @@ class Logging(commands.Cog):
     async def disablemessagedeletelog(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["message_delete"] = False
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("❌ Message delete logging disabled.")
 
     # ----------------------------
@@ -143,7 +138,7 @@ class Logging(commands.Cog):
         log_channel_id = self.data.get(str(interaction.guild.id), {}).get("log_channel")
         if log_channel_id:
             channel = interaction.guild.get_channel(log_channel_id)
-            await channel.send(f"🔨 {member} was banned. Reason: {reason}")
+            await self.logs.put(channel, f"🔨 {member} was banned. Reason: {reason}")
             await interaction.response.send_message(f"✅ {member.mention} ban logged")
         else:
             await interaction.response.send_message("❌ Logging channel not set.")
@@ -156,7 +151,7 @@ class Logging(commands.Cog):
         log_channel_id = self.data.get(str(interaction.guild.id), {}).get("log_channel")
         if log_channel_id:
             channel = interaction.guild.get_channel(log_channel_id)
-            await channel.send(f"👢 {member} was kicked. Reason: {reason}")
+            await self.logs.put(channel, f"👢 {member} was kicked. Reason: {reason}")
             await interaction.response.send_message(f"✅ {member.mention} kick logged")
         else:
             await interaction.response.send_message("❌ Logging channel not set.")
@@ -169,7 +164,7 @@ class Logging(commands.Cog):
         log_channel_id = self.data.get(str(interaction.guild.id), {}).get("log_channel")
         if log_channel_id:
             channel = interaction.guild.get_channel(log_channel_id)
-            await channel.send(f"➕ Role {role.name} added to {member}")
+            await self.logs.put(channel, f"➕ Role {role.name} added to {member}")
             await interaction.response.send_message("✅ Role add logged")
         else:
             await interaction.response.send_message("❌ Logging channel not set.")
@@ -182,7 +177,7 @@ class Logging(commands.Cog):
         log_channel_id = self.data.get(str(interaction.guild.id), {}).get("log_channel")
         if log_channel_id:
             channel = interaction.guild.get_channel(log_channel_id)
-            await channel.send(f"➖ Role {role.name} removed from {member}")
+            await self.logs.put(channel, f"➖ Role {role.name} removed from {member}")
             await interaction.response.send_message("✅ Role remove logged")
         else:
             await interaction.response.send_message("❌ Logging channel not set.")
@@ -195,7 +190,7 @@ class Logging(commands.Cog):
         log_channel_id = self.data.get(str(interaction.guild.id), {}).get("log_channel")
         if log_channel_id:
             ch = interaction.guild.get_channel(log_channel_id)
-            await ch.send(f"📂 Channel created: {channel.name} ({channel.id})")
+            await self.logs.put(ch, f"📂 Channel created: {channel.name} ({channel.id})")
             await interaction.response.send_message("✅ Channel creation logged")
         else:
             await interaction.response.send_message("❌ Logging channel not set.")
@@ -208,7 +203,7 @@ class Logging(commands.Cog):
         log_channel_id = self.data.get(str(interaction.guild.id), {}).get("log_channel")
         if log_channel_id:
             ch = interaction.guild.get_channel(log_channel_id)
-            await ch.send(f"🗑️ Channel deleted: {channel_name}")
+            await self.logs.put(ch, f"🗑️ Channel deleted: {channel_name}")
             await interaction.response.send_message("✅ Channel deletion logged")
         else:
             await interaction.response.send_message("❌ Logging channel not set.")
@@ -221,7 +216,7 @@ class Logging(commands.Cog):
         log_channel_id = self.data.get(str(interaction.guild.id), {}).get("log_channel")
         if log_channel_id:
             ch = interaction.guild.get_channel(log_channel_id)
-            await ch.send(f"➕ Role created: {role.name} ({role.id})")
+            await self.logs.put(ch, f"➕ Role created: {role.name} ({role.id})")
             await interaction.response.send_message("✅ Role creation logged")
         else:
             await interaction.response.send_message("❌ Logging channel not set.")
@@ -234,7 +229,7 @@ class Logging(commands.Cog):
         log_channel_id = self.data.get(str(interaction.guild.id), {}).get("log_channel")
         if log_channel_id:
             ch = interaction.guild.get_channel(log_channel_id)
-            await ch.send(f"➖ Role deleted: {role_name}")
+            await self.logs.put(ch, f"➖ Role deleted: {role_name}")
             await interaction.response.send_message("✅ Role deletion logged")
         else:
             await interaction.response.send_message("❌ Logging channel not set.")
@@ -248,9 +243,10 @@ class Logging(commands.Cog):
         log_channel_id = self.data.get(str(interaction.guild.id), {}).get("log_channel")
         if log_channel_id:
             ch = interaction.guild.get_channel(log_channel_id)
-            for ban_entry in bans:
-                await ch.send(f"🔨 Banned: {ban_entry.user} | Reason: {ban_entry.reason}")
+            # Reply first: a long ban list can fill the queue and make put() wait
             await interaction.response.send_message("✅ Ban list logged")
+            for ban_entry in bans:
+                await self.logs.put(ch, f"🔨 Banned: {ban_entry.user} | Reason: {ban_entry.reason}")
         else:
             await interaction.response.send_message("❌ Logging channel not set.")
 
@@ -270,7 +266,7 @@ class Logging(commands.Cog):
         embed.add_field(name="Channels", value=len(guild.channels))
         embed.add_field(name="Roles", value=len(guild.roles))
         embed.add_field(name="Boost Level", value=guild.premium_tier)
-        await ch.send(embed=embed)
+        await self.logs.put(ch, embed=embed)
         await interaction.response.send_message("✅ Full server info logged")
 
 async def setup(bot):
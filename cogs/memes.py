@@ -1,26 +1,29 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
 import random
 from config import GUILD_ID
+from utils import http
 
 class Memes(commands.Cog):
     """Memes cog using meme‑api.com for real memes"""
 
     def __init__(self, bot):
         self.bot = bot
+        self.session = http.acquire()
+
+    async def cog_unload(self):
+        await http.release()
 
     async def fetch_meme(self, subreddit: str = None):
         url = "https://meme-api.com/gimme"
         if subreddit:
             url += f"/{subreddit}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    return data
-                return None
+        async with self.session.get(url) as resp:
+            if resp.status == 200:
+                data = await resp.json()
+                return data
+            return None
 
     # 1. /meme
     @app_commands.command(name="meme", description="Get a random meme")
@@ -2,29 +2,50 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from config import GUILD_ID
-import json
+from utils import storage
+from utils.scheduler import get_scheduler
+from utils.outbound import get_outbound, edit_progress, finish, summary, token_time_left
+from functools import partial
 import datetime
-import asyncio
-import os
 
 DATA_FILE = "moderation.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Moderation(commands.Cog):
     """Full moderation cog with 20+ slash commands and JSON persistence"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
+        self.scheduler = get_scheduler()
+        self.scheduler.register("unmute", self.expire_mute)
+        self.scheduler.register("unban", self.expire_ban)
+        self.outbound = get_outbound()
+
+    def cog_unload(self):
+        self.scheduler.unregister("unmute")
+        self.scheduler.unregister("unban")
+
+    # ----------------------------
+    # Timer callbacks for temporary mutes and bans
+    # ----------------------------
+    async def expire_mute(self, payload):
+        guild_id, user_id = payload["guild_id"], payload["user_id"]
+        if not self.data.get(guild_id, {}).get(user_id, {}).get("mute", None):
+            return
+        await self.bot.wait_until_ready()
+        guild = self.bot.get_guild(int(guild_id))
+        member = guild.get_member(int(user_id)) if guild else None
+        mute_role = discord.utils.get(guild.roles, name="Muted") if guild else None
+        if member and mute_role in member.roles:
+            await member.remove_roles(mute_role, reason="Temporary mute expired")
+        del self.data[guild_id][user_id]["mute"]
+        self.data.mark_dirty(guild_id)
+
+    async def expire_ban(self, payload):
+        await self.bot.wait_until_ready()
+        guild = self.bot.get_guild(int(payload["guild_id"]))
+        if guild:
+            await guild.unban(discord.Object(id=int(payload["user_id"])), reason="Temporary ban expired")
 
     # ----------------------------
     # 1. Kick
@@ -72,7 +93,7 @@ class Moderation(commands.Cog):
             "timestamp": datetime.datetime.utcnow().isoformat()
         }
         self.data[guild_id][user_id]["warns"].append(warn_entry)
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await self.log_action(guild_id, f"Warned {member} for: {reason}", str(interaction.user))
         await interaction.response.send_message(f"⚠️ {member.mention} has been warned for: {reason}")
 
@@ -103,7 +124,7 @@ class Moderation(commands.Cog):
         user_id = str(member.id)
         if guild_id in self.data and user_id in self.data[guild_id]:
             self.data[guild_id][user_id]["warns"] = []
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ Cleared all warnings for {member.mention}.")
         else:
             await interaction.response.send_message(f"{member.mention} has no warnings.")
@@ -116,10 +137,17 @@ class Moderation(commands.Cog):
     async def mute(self, interaction: discord.Interaction, member: discord.Member, duration: int = 0, reason: str = "No reason provided"):
         guild = interaction.guild
         mute_role = discord.utils.get(guild.roles, name="Muted")
+        warning = ""
         if not mute_role:
+            await interaction.response.defer()
             mute_role = await guild.create_role(name="Muted", color=discord.Color.dark_gray())
-            for channel in guild.channels:
-                await channel.set_permissions(mute_role, speak=False, send_messages=False, add_reactions=False)
+            # One overwrite per channel; each channel is its own bucket so they go out side by side
+            done, failed, skipped = await self.outbound.run([
+                (("permissions", channel.id), partial(channel.set_permissions, mute_role, speak=False, send_messages=False, add_reactions=False))
+                for channel in guild.channels
+            ])
+            if failed or skipped:
+                warning = f"\n⚠️ Couldn't deny the Muted role in {failed + skipped} of {done + failed + skipped} channels; they can still talk there."
         await member.add_roles(mute_role, reason=reason)
         guild_id = str(guild.id)
         user_id = str(member.id)
@@ -129,20 +157,23 @@ class Moderation(commands.Cog):
             "timestamp": datetime.datetime.utcnow().isoformat(),
             "duration": duration
         }
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         msg = f"🔇 {member.mention} has been muted"
         if duration > 0:
             msg += f" for {duration} minutes"
-        await interaction.response.send_message(msg + f". Reason: {reason}")
+        msg += f". Reason: {reason}" + warning
+        if interaction.response.is_done():
+            await interaction.followup.send(msg)
+        else:
+            await interaction.response.send_message(msg)
+        timer_id = f"unmute:{guild_id}:{user_id}"
         if duration > 0:
-            await asyncio.sleep(duration * 60)
-            # Reload data in case of restart
-            data = load_data()
-            if data.get(guild_id, {}).get(user_id, {}).get("mute", None):
-                if mute_role in member.roles:
-                    await member.remove_roles(mute_role, reason="Temporary mute expired")
-                    del data[guild_id][user_id]["mute"]
-                    save_data(data)
+            self.scheduler.schedule("unmute", datetime.datetime.utcnow() + datetime.timedelta(minutes=duration), {
+                "guild_id": guild_id,
+                "user_id": user_id
+            }, timer_id=timer_id)
+        else:
+            self.scheduler.cancel(timer_id)
 
     # ----------------------------
     # 8. Unmute
@@ -158,7 +189,8 @@ class Moderation(commands.Cog):
             user_id = str(member.id)
             if guild_id in self.data and user_id in self.data[guild_id]:
                 self.data[guild_id][user_id].pop("mute", None)
-                save_data(self.data)
+                self.data.mark_dirty(guild_id)
+            self.scheduler.cancel(f"unmute:{guild_id}:{user_id}")
             await interaction.response.send_message(f"🔊 {member.mention} has been unmuted.")
         else:
             await interaction.response.send_message(f"{member.mention} is not muted.", ephemeral=True)
@@ -220,8 +252,10 @@ class Moderation(commands.Cog):
     async def tempban(self, interaction: discord.Interaction, member: discord.Member, duration: int, reason: str = "No reason provided"):
         await member.ban(reason=reason)
         await interaction.response.send_message(f"⏳ {member.mention} has been temporarily banned for {duration} minutes. Reason: {reason}")
-        await asyncio.sleep(duration * 60)
-        await member.unban(reason="Temporary ban expired")
+        self.scheduler.schedule("unban", datetime.datetime.utcnow() + datetime.timedelta(minutes=duration), {
+            "guild_id": str(interaction.guild.id),
+            "user_id": str(member.id)
+        }, timer_id=f"unban:{interaction.guild.id}:{member.id}")
 
     # ----------------------------
     # 15. Kick History
@@ -263,12 +297,7 @@ class Moderation(commands.Cog):
         if interaction.user.id != interaction.guild.owner_id:
             await interaction.response.send_message("❌ Only the server owner can mass kick.", ephemeral=True)
             return
-        user_ids = [int(x.strip()) for x in members.split(",")]
-        for uid in user_ids:
-            member = interaction.guild.get_member(uid)
-            if member:
-                await member.kick(reason="Mass kick by owner")
-        await interaction.response.send_message("✅ Mass kick completed.")
+        await self.bulk_action(interaction, members, "kick", "👢 Mass kick", reason="Mass kick by owner")
 
     # ----------------------------
     # 18. Mass Ban
@@ -278,12 +307,20 @@ class Moderation(commands.Cog):
         if interaction.user.id != interaction.guild.owner_id:
             await interaction.response.send_message("❌ Only the server owner can mass ban.", ephemeral=True)
             return
+        await self.bulk_action(interaction, members, "ban", "🔨 Mass ban", reason="Mass ban by owner")
+
+    async def bulk_action(self, interaction, members, action, label, reason):
+        """Kick or ban a comma-separated list of member IDs, paced by the outbound scheduler"""
         user_ids = [int(x.strip()) for x in members.split(",")]
-        for uid in user_ids:
-            member = interaction.guild.get_member(uid)
-            if member:
-                await member.ban(reason="Mass ban by owner")
-        await interaction.response.send_message("✅ Mass ban completed.")
+        targets = [m for m in map(interaction.guild.get_member, user_ids) if m]
+        await interaction.response.send_message(f"⏳ {label}: 0/{len(targets)}")
+        route = (action, interaction.guild.id)
+        done, failed, skipped = await self.outbound.run(
+            [(route, partial(getattr(member, action), reason=reason)) for member in targets],
+            progress=edit_progress(interaction, label),
+            limit=token_time_left(interaction)
+        )
+        await finish(interaction, summary(label, done, failed, skipped))
 
     # ----------------------------
     # 19. Anti-Raid Toggle
@@ -293,7 +330,7 @@ class Moderation(commands.Cog):
     async def antiraid(self, interaction: discord.Interaction, state: bool):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["antiraid"] = state
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"🛡️ Anti-raid protection is now {'ON' if state else 'OFF'}.")
 
     # ----------------------------
@@ -323,7 +360,7 @@ class Moderation(commands.Cog):
             "moderator": moderator,
             "timestamp": datetime.datetime.utcnow().isoformat()
         })
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
 
 async def setup(bot):
     await bot.add_cog(Moderation(bot), guild=discord.Object(id=GUILD_ID))
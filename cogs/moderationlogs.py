@@ -1,28 +1,25 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from config import GUILD_ID
+from utils import storage
+from utils.content_cache import ContentCache
+from utils.log_dispatcher import get_dispatcher
 
 DATA_FILE = "modlogs.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class ModerationLogs(commands.Cog):
     """Logs moderation actions in a specified channel"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
+        # discord.py's own message cache is too small for busy guilds; keep our own copy of content
+        self.messages = ContentCache()
+        self.logs = get_dispatcher()
+
+    async def cog_unload(self):
+        await self.logs.flush()
 
     # --------------------
     # Set log channel
@@ -32,7 +29,7 @@ class ModerationLogs(commands.Cog):
     async def set_log_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
         guild_id = str(interaction.guild.id)
         self.data[guild_id] = {"log_channel": channel.id}
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Moderation log channel set to {channel.mention}")
 
     # --------------------
@@ -63,7 +60,7 @@ class ModerationLogs(commands.Cog):
             embed = discord.Embed(title="🔨 User Banned", color=discord.Color.red())
             embed.add_field(name="User", value=f"{user} ({user.id})", inline=False)
             embed.add_field(name="Time", value=discord.utils.utcnow().strftime("%Y-%m-%d %H:%M:%S"), inline=False)
-            await channel.send(embed=embed)
+            await self.logs.put(channel, embed=embed)
 
     # --------------------
     # Unban listener
@@ -75,40 +72,83 @@ class ModerationLogs(commands.Cog):
             embed = discord.Embed(title="✅ User Unbanned", color=discord.Color.green())
             embed.add_field(name="User", value=f"{user} ({user.id})", inline=False)
             embed.add_field(name="Time", value=discord.utils.utcnow().strftime("%Y-%m-%d %H:%M:%S"), inline=False)
-            await channel.send(embed=embed)
+            await self.logs.put(channel, embed=embed)
+
+    # --------------------
+    # Message content cache
+    # --------------------
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild and not message.author.bot and self.get_log_channel(message.guild):
+            self.messages.add(message.guild.id, message.id, message.channel.id, message.author.id, message.content)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        for message_id in payload.message_ids:
+            self.messages.pop(payload.guild_id, message_id)
+
+    def describe_user(self, guild: discord.Guild, user_id: int):
+        user = guild.get_member(user_id) or self.bot.get_user(user_id)
+        return f"{user} ({user_id})" if user else f"<@{user_id}> ({user_id})"
 
     # --------------------
     # Message delete listener
     # --------------------
     @commands.Cog.listener()
-    async def on_message_delete(self, message: discord.Message):
-        if message.author.bot:
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if payload.guild_id is None:
             return
-        channel = self.get_log_channel(message.guild)
+        record = self.messages.pop(payload.guild_id, payload.message_id)
+        message = payload.cached_message
+        if message is not None:
+            if message.author.bot:
+                return
+            author_id, content = message.author.id, message.content
+        elif record is not None:
+            author_id, content = record.author_id, record.content
+        else:
+            return  # Sent before we started watching (or by a bot); nothing to show
+        guild = self.bot.get_guild(payload.guild_id)
+        channel = self.get_log_channel(guild) if guild else None
         if channel:
             embed = discord.Embed(title="🗑️ Message Deleted", color=discord.Color.orange())
-            embed.add_field(name="User", value=f"{message.author} ({message.author.id})", inline=False)
-            embed.add_field(name="Channel", value=message.channel.mention, inline=False)
-            embed.add_field(name="Content", value=message.content or "None", inline=False)
+            embed.add_field(name="User", value=self.describe_user(guild, author_id), inline=False)
+            embed.add_field(name="Channel", value=f"<#{payload.channel_id}>", inline=False)
+            embed.add_field(name="Content", value=content or "None", inline=False)
             embed.add_field(name="Time", value=discord.utils.utcnow().strftime("%Y-%m-%d %H:%M:%S"), inline=False)
-            await channel.send(embed=embed)
+            await self.logs.put(channel, embed=embed)
 
     # --------------------
     # Message edit listener
     # --------------------
     @commands.Cog.listener()
-    async def on_message_edit(self, before: discord.Message, after: discord.Message):
-        if before.author.bot or before.content == after.content:
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        # Embed unfurls also arrive as edits, without content
+        if payload.guild_id is None or "content" not in payload.data:
             return
-        channel = self.get_log_channel(before.guild)
+        after = payload.data["content"]
+        record = self.messages.update(payload.guild_id, payload.message_id, after)
+        message = payload.cached_message
+        if message is not None:
+            if message.author.bot:
+                return
+            author_id, before = message.author.id, message.content
+        elif record is not None:
+            author_id, before = record.author_id, record.content
+        else:
+            return
+        if before == after:
+            return
+        guild = self.bot.get_guild(payload.guild_id)
+        channel = self.get_log_channel(guild) if guild else None
         if channel:
             embed = discord.Embed(title="✏️ Message Edited", color=discord.Color.blue())
-            embed.add_field(name="User", value=f"{before.author} ({before.author.id})", inline=False)
-            embed.add_field(name="Channel", value=before.channel.mention, inline=False)
-            embed.add_field(name="Before", value=before.content or "None", inline=False)
-            embed.add_field(name="After", value=after.content or "None", inline=False)
+            embed.add_field(name="User", value=self.describe_user(guild, author_id), inline=False)
+            embed.add_field(name="Channel", value=f"<#{payload.channel_id}>", inline=False)
+            embed.add_field(name="Before", value=before or "None", inline=False)
+            embed.add_field(name="After", value=after or "None", inline=False)
             embed.add_field(name="Time", value=discord.utils.utcnow().strftime("%Y-%m-%d %H:%M:%S"), inline=False)
-            await channel.send(embed=embed)
+            await self.logs.put(channel, embed=embed)
 
     # --------------------
     # Role changes
@@ -128,14 +168,14 @@ class ModerationLogs(commands.Cog):
             embed.add_field(name="User", value=f"{after} ({after.id})", inline=False)
             embed.add_field(name="Roles", value=", ".join([r.name for r in added]), inline=False)
             embed.add_field(name="Time", value=discord.utils.utcnow().strftime("%Y-%m-%d %H:%M:%S"), inline=False)
-            await channel.send(embed=embed)
+            await self.logs.put(channel, embed=embed)
 
         if removed:
             embed = discord.Embed(title="➖ Role(s) Removed", color=discord.Color.red())
             embed.add_field(name="User", value=f"{after} ({after.id})", inline=False)
             embed.add_field(name="Roles", value=", ".join([r.name for r in removed]), inline=False)
             embed.add_field(name="Time", value=discord.utils.utcnow().strftime("%Y-%m-%d %H:%M:%S"), inline=False)
-            await channel.send(embed=embed)
+            await self.logs.put(channel, embed=embed)
 
     # --------------------
     # Warn command
@@ -150,11 +190,37 @@ class ModerationLogs(commands.Cog):
             embed.add_field(name="Moderator", value=f"{interaction.user} ({interaction.user.id})", inline=False)
             embed.add_field(name="Reason", value=reason, inline=False)
             embed.add_field(name="Time", value=discord.utils.utcnow().strftime("%Y-%m-%d %H:%M:%S"), inline=False)
-            await channel.send(embed=embed)
+            await self.logs.put(channel, embed=embed)
             await interaction.response.send_message(f"✅ Logged warning for {member.mention}", ephemeral=True)
         else:
             await interaction.response.send_message("❌ No log channel set.", ephemeral=True)
 
+    # --------------------
+    # Message cache stats
+    # --------------------
+    @app_commands.command(name="log_cache_stats", description="Show memory used by the deleted/edited message cache")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def log_cache_stats(self, interaction: discord.Interaction):
+        stats = self.messages.stats()
+        await interaction.response.send_message(
+            f"🗃️ {stats['messages']} messages cached across {stats['guilds']} guilds | "
+            f"{stats['bytes'] / 1024:.1f} KiB total | {stats['per_message']:.0f} bytes per message",
+            ephemeral=True
+        )
+
+    # --------------------
+    # Log queue stats
+    # --------------------
+    @app_commands.command(name="log_queue_stats", description="Show the state of the batched log delivery queue")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def log_queue_stats(self, interaction: discord.Interaction):
+        stats = self.logs.stats()
+        await interaction.response.send_message(
+            f"📨 {stats['entries']} entries sent in {stats['messages']} messages | "
+            f"{stats['queued']} queued | {stats['dropped']} dropped",
+            ephemeral=True
+        )
+
 
 async def setup(bot):
     await bot.add_cog(ModerationLogs(bot), guild=discord.Object(id=GUILD_ID))
@@ -1,54 +1,60 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from datetime import datetime, timedelta
-import asyncio
+import uuid
 from config import GUILD_ID
+from utils import storage
+from utils.scheduler import get_scheduler
 
 DATA_FILE = "notifications.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Notifications(commands.Cog):
     """Notification system with JSON persistence"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
-        self.check_notifications.start()
+        self.data = storage.open_store(DATA_FILE)
+        self.scheduler = get_scheduler()
+        self.scheduler.register("notification", self.deliver)
+        # Notifications saved before timers existed (or whose timer was lost) get one now
+        for guild_id, users in self.data.items():
+            for user_id, notes in users.items():
+                for note in notes:
+                    if not self.scheduler.has(note.get("id")):
+                        self.schedule(guild_id, user_id, note)
+                        self.data.mark_dirty(guild_id)
 
     def cog_unload(self):
-        self.check_notifications.cancel()
+        self.scheduler.unregister("notification")
 
-    @tasks.loop(seconds=60)
-    async def check_notifications(self):
-        now = datetime.utcnow()
-        changed = False
-        for guild_id, users in list(self.data.items()):
-            for user_id, notes in list(users.items()):
-                for note in list(notes):
-                    notify_time = datetime.fromisoformat(note["time"])
-                    if now >= notify_time:
-                        try:
-                            user = self.bot.get_user(int(user_id))
-                            if user:
-                                await user.send(f"🔔 Notification: {note['message']}")
-                        except:
-                            pass
-                        notes.remove(note)
-                        changed = True
-        if changed:
-            save_data(self.data)
+    def schedule(self, guild_id, user_id, note):
+        """Arm or move the timer that delivers this notification"""
+        note.setdefault("id", uuid.uuid4().hex)
+        self.scheduler.schedule("notification", datetime.fromisoformat(note["time"]), {
+            "guild_id": guild_id,
+            "user_id": user_id,
+            "id": note["id"]
+        }, timer_id=note["id"])
+
+    async def deliver(self, payload):
+        guild_id = payload["guild_id"]
+        notes = self.data.get(guild_id, {}).get(payload["user_id"], [])
+        note = next((n for n in notes if n.get("id") == payload["id"]), None)
+        if note is None:
+            return
+        await self.bot.wait_until_ready()
+        try:
+            user = self.bot.get_user(int(payload["user_id"]))
+            if user:
+                await user.send(f"🔔 Notification: {note['message']}")
+        except:
+            pass
+        # The list may have been edited or replaced while the DM was sent
+        notes = self.data.get(guild_id, {}).get(payload["user_id"], [])
+        if note in notes:
+            notes.remove(note)
+            self.data.mark_dirty(guild_id)
 
     # --------------------
     # 1. /notify_add
@@ -58,11 +64,13 @@ class Notifications(commands.Cog):
         notify_time = datetime.utcnow() + timedelta(minutes=minutes)
         guild_id = str(interaction.guild.id)
         user_id = str(interaction.user.id)
-        self.data.setdefault(guild_id, {}).setdefault(user_id, []).append({
+        note = {
             "message": message,
             "time": notify_time.isoformat()
-        })
-        save_data(self.data)
+        }
+        self.data.setdefault(guild_id, {}).setdefault(user_id, []).append(note)
+        self.schedule(guild_id, user_id, note)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Notification set in {minutes} minutes: {message}")
 
     # --------------------
@@ -89,7 +97,8 @@ class Notifications(commands.Cog):
         notes = self.data.get(guild_id, {}).get(user_id, [])
         if 0 <= index-1 < len(notes):
             removed = notes.pop(index-1)
-            save_data(self.data)
+            self.scheduler.cancel(removed.get("id"))
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ Removed notification: {removed['message']}")
         else:
             await interaction.response.send_message("❌ Invalid index.", ephemeral=True)
@@ -101,8 +110,10 @@ class Notifications(commands.Cog):
     async def notify_clear(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         user_id = str(interaction.user.id)
+        for n in self.data.get(guild_id, {}).get(user_id, []):
+            self.scheduler.cancel(n.get("id"))
         self.data.setdefault(guild_id, {})[user_id] = []
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ All notifications cleared.")
 
     # --------------------
@@ -115,7 +126,7 @@ class Notifications(commands.Cog):
         notes = self.data.get(guild_id, {}).get(user_id, [])
         if 0 <= index-1 < len(notes):
             notes[index-1]["message"] = new_message
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ Notification {index} updated.")
         else:
             await interaction.response.send_message("❌ Invalid index.", ephemeral=True)
@@ -130,7 +141,8 @@ class Notifications(commands.Cog):
         notes = self.data.get(guild_id, {}).get(user_id, [])
         if 0 <= index-1 < len(notes):
             notes[index-1]["time"] = (datetime.utcnow() + timedelta(minutes=minutes)).isoformat()
-            save_data(self.data)
+            self.schedule(guild_id, user_id, notes[index-1])
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ Notification {index} rescheduled to {minutes} minutes from now.")
         else:
             await interaction.response.send_message("❌ Invalid index.", ephemeral=True)
@@ -235,8 +247,10 @@ class Notifications(commands.Cog):
         user_id = str(interaction.user.id)
         notes = self.data.get(guild_id, {}).get(user_id, [])
         removed = [n for n in notes if message.lower() in n["message"].lower()]
+        for n in removed:
+            self.scheduler.cancel(n.get("id"))
         self.data[guild_id][user_id] = [n for n in notes if message.lower() not in n["message"].lower()]
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         if removed:
             await interaction.response.send_message(f"✅ Removed {len(removed)} notifications.")
         else:
@@ -260,7 +274,8 @@ class Notifications(commands.Cog):
         notes = self.data.get(guild_id, {}).get(user_id, [])
         for n in notes:
             n["time"] = (datetime.fromisoformat(n["time"]) + timedelta(minutes=minutes)).isoformat()
-        save_data(self.data)
+            self.schedule(guild_id, user_id, n)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Rescheduled all notifications by {minutes} minutes.")
 
     @app_commands.command(name="notify_edit_all", description="Edit all notifications to same message")
@@ -270,7 +285,7 @@ class Notifications(commands.Cog):
         notes = self.data.get(guild_id, {}).get(user_id, [])
         for n in notes:
             n["message"] = new_message
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ All notifications updated.")
 
 async def setup(bot):
@@ -1,29 +1,18 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from datetime import datetime, timedelta
 from config import GUILD_ID
+from utils import storage
 
 DATA_FILE = "polls.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Polls(commands.Cog):
     """Server Polls management with 20 slash commands"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
 
     # ----------------------------
     # 1. /createpoll
@@ -44,7 +33,7 @@ class Polls(commands.Cog):
             "created_at": datetime.utcnow().isoformat(),
             "status": "open"
         }
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         options_list = "\n".join(f"{i+1}. {opt}" for i, opt in enumerate(options))
         await interaction.response.send_message(f"📊 Poll `{poll_id}` created:\n**{question}**\n{options_list}")
 
@@ -58,7 +47,7 @@ class Polls(commands.Cog):
             await interaction.response.send_message("❌ Poll not found", ephemeral=True)
             return
         guild_data[poll_id]["status"] = "closed"
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message(f"✅ Poll `{poll_id}` closed")
 
     # ----------------------------
@@ -82,7 +71,7 @@ class Polls(commands.Cog):
             await interaction.response.send_message("❌ Invalid option", ephemeral=True)
             return
         poll["votes"][option].append(interaction.user.id)
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message(f"✅ You voted for `{option}`")
 
     # ----------------------------
@@ -108,7 +97,7 @@ class Polls(commands.Cog):
         guild_data = self.data.get(str(interaction.guild.id), {}).get("polls", {})
         if poll_id in guild_data:
             del guild_data[poll_id]
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"🗑️ Poll `{poll_id}` deleted")
         else:
             await interaction.response.send_message("❌ Poll not found", ephemeral=True)
@@ -167,7 +156,7 @@ class Polls(commands.Cog):
                 return
             poll["options"].append(option)
             poll["votes"][option] = []
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"✅ Option `{option}` added to poll `{poll_id}`")
         else:
             await interaction.response.send_message("❌ Poll not found", ephemeral=True)
@@ -183,7 +172,7 @@ class Polls(commands.Cog):
             if option in poll["options"]:
                 poll["options"].remove(option)
                 poll["votes"].pop(option, None)
-                save_data(self.data)
+                self.data.mark_dirty(str(interaction.guild.id))
                 await interaction.response.send_message(f"🗑️ Option `{option}` removed from poll `{poll_id}`")
             else:
                 await interaction.response.send_message("⚠️ Option not found", ephemeral=True)
@@ -239,7 +228,7 @@ class Polls(commands.Cog):
         if poll_id in guild_data:
             for key in guild_data[poll_id]["votes"]:
                 guild_data[poll_id]["votes"][key] = []
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"🔄 All votes reset for poll `{poll_id}`")
         else:
             await interaction.response.send_message("❌ Poll not found", ephemeral=True)
@@ -299,7 +288,7 @@ class Polls(commands.Cog):
     @app_commands.command(name="pollresetall", description="Delete all polls")
     async def pollresetall(self, interaction: discord.Interaction):
         self.data[str(interaction.guild.id)]["polls"] = {}
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message("🔄 All polls deleted")
 
     # ----------------------------
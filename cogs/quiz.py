@@ -5,21 +5,12 @@ import json
 import os
 import random
 from config import GUILD_ID
+from utils import storage
 
 DATA_FILE = "quiz_scores.json"
 QUESTIONS_FILE = "quiz_questions.json"
 
 # Load user scores
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 # Load questions
 def load_questions():
     if os.path.exists(QUESTIONS_FILE):
@@ -40,7 +31,7 @@ class Quiz(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.scores = load_data()
+        self.scores = storage.open_store(DATA_FILE)
         self.questions = load_questions()
 
     # --------------------
@@ -78,7 +69,7 @@ class Quiz(commands.Cog):
 
         if selected_option == correct_answer:
             self.scores[guild_id][user_id]["score"] += 1
-            save_data(self.scores)
+            self.scores.mark_dirty(guild_id)
             await interaction.followup.send(f"✅ Correct! Your score: {self.scores[guild_id][user_id]['score']}")
         else:
             await interaction.followup.send(f"❌ Incorrect. The correct answer was: **{correct_answer}**. Your score: {self.scores[guild_id][user_id]['score']}")
@@ -121,7 +112,7 @@ class Quiz(commands.Cog):
         user_id = str(member.id)
         if guild_id in self.scores and user_id in self.scores[guild_id]:
             self.scores[guild_id][user_id]["score"] = 0
-            save_data(self.scores)
+            self.scores.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ {member.mention}'s quiz score has been reset.")
         else:
             await interaction.response.send_message(f"❌ {member.mention} has no quiz score.", ephemeral=True)
@@ -2,35 +2,28 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import json
-import os
-import aiohttp
 from config import GUILD_ID
+from utils import http, storage
 
 DATA_FILE = "quotes.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {"quotes": {}}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Quotes(commands.Cog):
     """Quotes system with 20 commands and API support"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE, default={"quotes": {}})
+        self.session = http.acquire()
+
+    async def cog_unload(self):
+        await http.release()
 
     # 1. /add_quote
     @app_commands.command(name="add_quote", description="Add a custom quote")
     async def add_quote(self, interaction: discord.Interaction, *, quote: str):
         guild_id = str(interaction.guild.id)
         self.data.setdefault("quotes", {}).setdefault(guild_id, []).append(quote)
-        save_data(self.data)
+        self.data.mark_dirty("quotes")
         await interaction.response.send_message("✅ Quote added.")
 
     # 2. /remove_quote
@@ -40,7 +33,7 @@ class Quotes(commands.Cog):
         quotes = self.data.get("quotes", {}).get(guild_id, [])
         if 0 <= index-1 < len(quotes):
             removed = quotes.pop(index-1)
-            save_data(self.data)
+            self.data.mark_dirty("quotes")
             await interaction.response.send_message(f"✅ Removed quote: {removed}")
         else:
             await interaction.response.send_message("❌ Invalid index.", ephemeral=True)
@@ -72,7 +65,7 @@ class Quotes(commands.Cog):
     async def clear_quotes(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data["quotes"][guild_id] = []
-        save_data(self.data)
+        self.data.mark_dirty("quotes")
         await interaction.response.send_message("✅ All quotes cleared.")
 
     # 6. /quote_count
@@ -99,7 +92,7 @@ class Quotes(commands.Cog):
         quotes = self.data.get("quotes", {}).get(guild_id, [])
         if 0 <= index-1 < len(quotes):
             quotes[index-1] = new_text
-            save_data(self.data)
+            self.data.mark_dirty("quotes")
             await interaction.response.send_message(f"✅ Quote {index} updated.")
         else:
             await interaction.response.send_message("❌ Invalid index.", ephemeral=True)
@@ -118,13 +111,12 @@ class Quotes(commands.Cog):
     # 10. /random_api_quote
     @app_commands.command(name="random_api_quote", description="Get a random inspirational quote from API")
     async def random_api_quote(self, interaction: discord.Interaction):
-        async with aiohttp.ClientSession() as session:
-            async with session.get("https://api.quotable.io/random") as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    await interaction.response.send_message(f"💬 \"{data['content']}\" — {data['author']}")
-                else:
-                    await interaction.response.send_message("Failed to fetch API quote.")
+        async with self.session.get("https://api.quotable.io/random") as resp:
+            if resp.status == 200:
+                data = await resp.json()
+                await interaction.response.send_message(f"💬 \"{data['content']}\" — {data['author']}")
+            else:
+                await interaction.response.send_message("Failed to fetch API quote.")
 
     # 11. /quote_info
     @app_commands.command(name="quote_info", description="Show info of a quote by index")
@@ -167,7 +159,7 @@ class Quotes(commands.Cog):
             quotes = json.loads(json_text)
             if isinstance(quotes, list):
                 self.data.setdefault("quotes", {}).setdefault(guild_id, []).extend(quotes)
-                save_data(self.data)
+                self.data.mark_dirty("quotes")
                 await interaction.response.send_message(f"✅ Imported {len(quotes)} quotes.")
             else:
                 await interaction.response.send_message("❌ Invalid JSON.", ephemeral=True)
@@ -198,28 +190,26 @@ class Quotes(commands.Cog):
     # 18. /quote_search_api
     @app_commands.command(name="quote_search_api", description="Get a quote containing keyword from API")
     async def quote_search_api(self, interaction: discord.Interaction, keyword: str):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"https://api.quotable.io/quotes?query={keyword}") as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    results = data.get("results", [])
-                    if results:
-                        quote = random.choice(results)
-                        await interaction.response.send_message(f"💬 \"{quote['content']}\" — {quote['author']}")
-                        return
-                await interaction.response.send_message("No quotes found from API.")
+        async with self.session.get(f"https://api.quotable.io/quotes?query={keyword}") as resp:
+            if resp.status == 200:
+                data = await resp.json()
+                results = data.get("results", [])
+                if results:
+                    quote = random.choice(results)
+                    await interaction.response.send_message(f"💬 \"{quote['content']}\" — {quote['author']}")
+                    return
+            await interaction.response.send_message("No quotes found from API.")
 
     # 19. /quote_random_api_embed
     @app_commands.command(name="quote_random_api_embed", description="Random API quote in embed")
     async def quote_random_api_embed(self, interaction: discord.Interaction):
-        async with aiohttp.ClientSession() as session:
-            async with session.get("https://api.quotable.io/random") as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    embed = discord.Embed(description=f"\"{data['content']}\" — {data['author']}", color=discord.Color.random())
-                    await interaction.response.send_message(embed=embed)
-                else:
-                    await interaction.response.send_message("Failed to fetch API quote.")
+        async with self.session.get("https://api.quotable.io/random") as resp:
+            if resp.status == 200:
+                data = await resp.json()
+                embed = discord.Embed(description=f"\"{data['content']}\" — {data['author']}", color=discord.Color.random())
+                await interaction.response.send_message(embed=embed)
+            else:
+                await interaction.response.send_message("Failed to fetch API quote.")
 
     # 20. /quote_random_combined
     @app_commands.command(name="quote_random_combined", description="Random quote from API or custom")
@@ -229,12 +219,11 @@ class Quotes(commands.Cog):
         quotes = self.data.get("quotes", {}).get(guild_id, [])
         use_api = random.choice([True, False])
         if use_api:
-            async with aiohttp.ClientSession() as session:
-                async with session.get("https://api.quotable.io/random") as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        await interaction.response.send_message(f"💬 \"{data['content']}\" — {data['author']}")
-                        return
+            async with self.session.get("https://api.quotable.io/random") as resp:
+                if resp.status == 200:
+                    data = await resp.json()
+                    await interaction.response.send_message(f"💬 \"{data['content']}\" — {data['author']}")
+                    return
         if quotes:
             await interaction.response.send_message(f"💬 {random.choice(quotes)}")
         else:
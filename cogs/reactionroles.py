@@ -1,28 +1,17 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from config import GUILD_ID
+from utils import storage
 
 DATA_FILE = "reactionroles.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class ReactionRoles(commands.Cog):
     """Reaction Roles system with 20 slash commands and JSON persistence"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
 
     # ----------------------------
     # 1. /createrolemessage
@@ -34,7 +23,7 @@ class ReactionRoles(commands.Cog):
             return
         message = await channel.send(content)
         self.data.setdefault(str(interaction.guild.id), {}).setdefault("messages", {})[str(message.id)] = {}
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message(f"✅ Reaction role message created in {channel.mention}")
 
     # ----------------------------
@@ -47,7 +36,7 @@ class ReactionRoles(commands.Cog):
             await interaction.response.send_message("❌ Message ID not found.", ephemeral=True)
             return
         guild_data[message_id][emoji] = role.id
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         message = await interaction.channel.fetch_message(int(message_id))
         await message.add_reaction(emoji)
         await interaction.response.send_message(f"✅ Added reaction {emoji} for role {role.name}")
@@ -60,7 +49,7 @@ class ReactionRoles(commands.Cog):
         guild_data = self.data.setdefault(str(interaction.guild.id), {}).setdefault("messages", {})
         if message_id in guild_data and emoji in guild_data[message_id]:
             del guild_data[message_id][emoji]
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             message = await interaction.channel.fetch_message(int(message_id))
             await message.clear_reaction(emoji)
             await interaction.response.send_message(f"✅ Removed reaction {emoji}")
@@ -93,7 +82,7 @@ class ReactionRoles(commands.Cog):
         guild_data = self.data.setdefault(str(interaction.guild.id), {}).setdefault("messages", {})
         if message_id in guild_data:
             del guild_data[message_id]
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"🗑️ Reaction role message {message_id} deleted")
         else:
             await interaction.response.send_message("❌ Message ID not found.", ephemeral=True)
@@ -198,7 +187,7 @@ class ReactionRoles(commands.Cog):
     @app_commands.command(name="clearallreactionroles", description="Clear all reaction roles in a server")
     async def clearallreactionroles(self, interaction: discord.Interaction):
         self.data[str(interaction.guild.id)]["messages"] = {}
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message("🗑️ Cleared all reaction roles in the server.")
 
     # ----------------------------
@@ -302,7 +291,7 @@ class ReactionRoles(commands.Cog):
     @app_commands.command(name="reactionrolesreset", description="Reset all reaction roles in the server")
     async def reactionrolesreset(self, interaction: discord.Interaction):
         self.data[str(interaction.guild.id)]["messages"] = {}
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message("🔄 All reaction roles reset.")
 
     # ----------------------------
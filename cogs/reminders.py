@@ -1,54 +1,60 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-import json
-import os
-import asyncio
+import uuid
 from datetime import datetime, timedelta
 from config import GUILD_ID
+from utils import storage
+from utils.scheduler import get_scheduler
 
 DATA_FILE = "reminders.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Reminders(commands.Cog):
     """Reminder system with JSON persistence and 20 commands"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
-        self.check_reminders.start()
+        self.data = storage.open_store(DATA_FILE)
+        self.scheduler = get_scheduler()
+        self.scheduler.register("reminder", self.deliver)
+        # Reminders saved before timers existed (or whose timer was lost) get one now
+        for guild_id, reminders in self.data.items():
+            for user_id, user_reminders in reminders.items():
+                for r in user_reminders:
+                    if not self.scheduler.has(r.get("id")):
+                        self.schedule(guild_id, user_id, r)
+                        self.data.mark_dirty(guild_id)
 
     def cog_unload(self):
-        self.check_reminders.cancel()
+        self.scheduler.unregister("reminder")
 
-    @tasks.loop(seconds=60)
-    async def check_reminders(self):
-        now = datetime.utcnow()
-        data_changed = False
-        for guild_id, reminders in list(self.data.items()):
-            for user_id, user_reminders in list(reminders.items()):
-                for r in list(user_reminders):
-                    remind_time = datetime.fromisoformat(r["time"])
-                    if now >= remind_time:
-                        try:
-                            user = self.bot.get_user(int(user_id))
-                            if user:
-                                await user.send(f"⏰ Reminder: {r['message']}")
-                        except:
-                            pass
-                        user_reminders.remove(r)
-                        data_changed = True
-        if data_changed:
-            save_data(self.data)
+    def schedule(self, guild_id, user_id, r):
+        """Arm or move the timer that delivers this reminder"""
+        r.setdefault("id", uuid.uuid4().hex)
+        self.scheduler.schedule("reminder", datetime.fromisoformat(r["time"]), {
+            "guild_id": guild_id,
+            "user_id": user_id,
+            "id": r["id"]
+        }, timer_id=r["id"])
+
+    async def deliver(self, payload):
+        guild_id = payload["guild_id"]
+        user_reminders = self.data.get(guild_id, {}).get(payload["user_id"], [])
+        r = next((r for r in user_reminders if r.get("id") == payload["id"]), None)
+        if r is None:
+            return
+        await self.bot.wait_until_ready()
+        try:
+            user = self.bot.get_user(int(payload["user_id"]))
+            if user:
+                await user.send(f"⏰ Reminder: {r['message']}")
+        except:
+            pass
+        # The list may have been edited or replaced while the DM was sent
+        user_reminders = self.data.get(guild_id, {}).get(payload["user_id"], [])
+        if r in user_reminders:
+            user_reminders.remove(r)
+            self.data.mark_dirty(guild_id)
 
     # --------------------
     # 1. /add_reminder
@@ -58,11 +64,13 @@ class Reminders(commands.Cog):
         remind_time = datetime.utcnow() + timedelta(minutes=minutes)
         guild_id = str(interaction.guild.id)
         user_id = str(interaction.user.id)
-        self.data.setdefault(guild_id, {}).setdefault(user_id, []).append({
+        r = {
             "message": message,
             "time": remind_time.isoformat()
-        })
-        save_data(self.data)
+        }
+        self.data.setdefault(guild_id, {}).setdefault(user_id, []).append(r)
+        self.schedule(guild_id, user_id, r)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Reminder set in {minutes} minutes: {message}")
 
     # --------------------
@@ -89,7 +97,8 @@ class Reminders(commands.Cog):
         reminders = self.data.get(guild_id, {}).get(user_id, [])
         if 0 <= index-1 < len(reminders):
             removed = reminders.pop(index-1)
-            save_data(self.data)
+            self.scheduler.cancel(removed.get("id"))
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ Removed reminder: {removed['message']}")
         else:
             await interaction.response.send_message("❌ Invalid index.", ephemeral=True)
@@ -101,8 +110,10 @@ class Reminders(commands.Cog):
     async def clear_reminders(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         user_id = str(interaction.user.id)
+        for r in self.data.get(guild_id, {}).get(user_id, []):
+            self.scheduler.cancel(r.get("id"))
         self.data.setdefault(guild_id, {})[user_id] = []
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ All reminders cleared.")
 
     # --------------------
@@ -115,7 +126,7 @@ class Reminders(commands.Cog):
         reminders = self.data.get(guild_id, {}).get(user_id, [])
         if 0 <= index-1 < len(reminders):
             reminders[index-1]["message"] = new_message
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ Reminder {index} updated.")
         else:
             await interaction.response.send_message("❌ Invalid index.", ephemeral=True)
@@ -130,7 +141,8 @@ class Reminders(commands.Cog):
         reminders = self.data.get(guild_id, {}).get(user_id, [])
         if 0 <= index-1 < len(reminders):
             reminders[index-1]["time"] = (datetime.utcnow() + timedelta(minutes=minutes)).isoformat()
-            save_data(self.data)
+            self.schedule(guild_id, user_id, reminders[index-1])
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ Reminder {index} time updated to {minutes} minutes from now.")
         else:
             await interaction.response.send_message("❌ Invalid index.", ephemeral=True)
@@ -238,8 +250,10 @@ class Reminders(commands.Cog):
         user_id = str(interaction.user.id)
         reminders = self.data.get(guild_id, {}).get(user_id, [])
         removed = [r for r in reminders if message.lower() in r["message"].lower()]
+        for r in removed:
+            self.scheduler.cancel(r.get("id"))
         self.data[guild_id][user_id] = [r for r in reminders if message.lower() not in r["message"].lower()]
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         if removed:
             await interaction.response.send_message(f"✅ Removed {len(removed)} reminders.")
         else:
@@ -1,28 +1,17 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from config import GUILD_ID
+from utils import storage
 
 DATA_FILE = "social_data.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Social(commands.Cog):
     """Social and interactive community commands"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
 
     # --------------------
     # 1. /hug
@@ -1,28 +1,17 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from config import GUILD_ID
+from utils import storage
 
 DATA_FILE = "starboard.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Starboard(commands.Cog):
     """Starboard system with 20 functional commands"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
 
     # ----------------------------
     # 1. /set_starboard_channel
@@ -31,7 +20,7 @@ class Starboard(commands.Cog):
     async def set_starboard_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["channel_id"] = channel.id
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Starboard channel set to {channel.mention}")
 
     # ----------------------------
@@ -41,7 +30,7 @@ class Starboard(commands.Cog):
     async def set_star_emoji(self, interaction: discord.Interaction, emoji: str):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["emoji"] = emoji
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Starboard emoji set to {emoji}")
 
     # ----------------------------
@@ -51,7 +40,7 @@ class Starboard(commands.Cog):
     async def set_star_threshold(self, interaction: discord.Interaction, count: int):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["threshold"] = count
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Starboard threshold set to {count}")
 
     # ----------------------------
@@ -61,7 +50,7 @@ class Starboard(commands.Cog):
     async def enable_starboard(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["enabled"] = True
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Starboard enabled")
 
     # ----------------------------
@@ -71,7 +60,7 @@ class Starboard(commands.Cog):
     async def disable_starboard(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["enabled"] = False
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Starboard disabled")
 
     # ----------------------------
@@ -113,7 +102,7 @@ class Starboard(commands.Cog):
         guild_id = str(interaction.guild.id)
         if guild_id in self.data:
             self.data.pop(guild_id)
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Starboard settings reset")
 
     # ----------------------------
@@ -142,7 +131,7 @@ class Starboard(commands.Cog):
     async def clear_starred(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["messages"] = []
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Cleared all starred messages")
 
     # ----------------------------
@@ -152,7 +141,7 @@ class Starboard(commands.Cog):
     async def manual_star(self, interaction: discord.Interaction, message: str):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {}).setdefault("messages", []).append(message)
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Manually added to starboard: {message}")
 
     # ----------------------------
@@ -164,7 +153,7 @@ class Starboard(commands.Cog):
         messages = self.data.get(guild_id, {}).get("messages", [])
         if message in messages:
             messages.remove(message)
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
             await interaction.response.send_message(f"✅ Removed message from starboard: {message}")
         else:
             await interaction.response.send_message("Message not found.", ephemeral=True)
@@ -177,7 +166,7 @@ class Starboard(commands.Cog):
         guild_id = str(interaction.guild.id)
         current = self.data.get(guild_id, {}).get("notify", True)
         self.data.setdefault(guild_id, {})["notify"] = not current
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Star notifications {'enabled' if not current else 'disabled'}")
 
     # ----------------------------
@@ -205,7 +194,7 @@ class Starboard(commands.Cog):
     async def reset_messages(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["messages"] = []
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Cleared all starred messages but kept config")
 
     # ----------------------------
@@ -224,7 +213,7 @@ class Starboard(commands.Cog):
         embed = discord.Embed(title=title, description=description, color=discord.Color.gold())
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {}).setdefault("messages", []).append(f"{title}: {description}")
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(embed=embed)
 
     # ----------------------------
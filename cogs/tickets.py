@@ -1,29 +1,18 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from datetime import datetime
 from config import GUILD_ID
+from utils import storage
 
 DATA_FILE = "tickets.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Tickets(commands.Cog):
     """Ticket system with JSON persistence and 20 slash commands"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
 
     # ----------------------------
     # 1. /createticket
@@ -44,7 +33,7 @@ class Tickets(commands.Cog):
             "assigned_to": None,
             "created_at": datetime.utcnow().isoformat()
         }
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Ticket created: {channel.mention}")
 
     # ----------------------------
@@ -57,7 +46,7 @@ class Tickets(commands.Cog):
             await interaction.response.send_message("❌ Ticket not found", ephemeral=True)
             return
         guild_data[ticket_id]["status"] = "closed"
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         channel = interaction.guild.get_channel(guild_data[ticket_id]["channel_id"])
         await channel.delete()
         await interaction.response.send_message(f"✅ Ticket {ticket_id} closed and channel deleted")
@@ -70,7 +59,7 @@ class Tickets(commands.Cog):
         guild_data = self.data.get(str(interaction.guild.id), {}).get("tickets", {})
         if ticket_id in guild_data:
             guild_data[ticket_id]["assigned_to"] = member.id
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"✅ Ticket {ticket_id} assigned to {member.mention}")
         else:
             await interaction.response.send_message("❌ Ticket not found", ephemeral=True)
@@ -83,7 +72,7 @@ class Tickets(commands.Cog):
         guild_data = self.data.get(str(interaction.guild.id), {}).get("tickets", {})
         if ticket_id in guild_data:
             guild_data[ticket_id]["assigned_to"] = None
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"✅ Ticket {ticket_id} unassigned")
         else:
             await interaction.response.send_message("❌ Ticket not found", ephemeral=True)
@@ -132,7 +121,7 @@ class Tickets(commands.Cog):
         for tid, t in guild_data.items():
             if t["user_id"] == interaction.user.id and t["status"] == "open":
                 t["status"] = "closed"
-                save_data(self.data)
+                self.data.mark_dirty(str(interaction.guild.id))
                 channel = interaction.guild.get_channel(t["channel_id"])
                 await channel.delete()
                 await interaction.response.send_message(f"✅ Your ticket {tid} has been closed")
@@ -171,7 +160,7 @@ class Tickets(commands.Cog):
         guild_data = self.data.get(str(interaction.guild.id), {}).get("tickets", {})
         if ticket_id in guild_data:
             guild_data[ticket_id]["assigned_to"] = interaction.user.id
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"✅ Ticket {ticket_id} assigned to you")
         else:
             await interaction.response.send_message("❌ Ticket not found", ephemeral=True)
@@ -184,7 +173,7 @@ class Tickets(commands.Cog):
         guild_data = self.data.get(str(interaction.guild.id), {}).get("tickets", {})
         if ticket_id in guild_data and guild_data[ticket_id]["assigned_to"] == interaction.user.id:
             guild_data[ticket_id]["assigned_to"] = None
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"✅ Ticket {ticket_id} unassigned from you")
         else:
             await interaction.response.send_message("❌ Ticket not found or not assigned to you", ephemeral=True)
@@ -256,7 +245,7 @@ class Tickets(commands.Cog):
         guild_data = self.data.get(str(interaction.guild.id), {}).get("tickets", {})
         if ticket_id in guild_data:
             del guild_data[ticket_id]
-            save_data(self.data)
+            self.data.mark_dirty(str(interaction.guild.id))
             await interaction.response.send_message(f"🗑️ Ticket {ticket_id} deleted")
         else:
             await interaction.response.send_message("❌ Ticket not found", ephemeral=True)
@@ -267,7 +256,7 @@ class Tickets(commands.Cog):
     @app_commands.command(name="resettickets", description="Delete all tickets in server")
     async def resettickets(self, interaction: discord.Interaction):
         self.data[str(interaction.guild.id)]["tickets"] = {}
-        save_data(self.data)
+        self.data.mark_dirty(str(interaction.guild.id))
         await interaction.response.send_message("🔄 All tickets reset")
 
     # ----------------------------
@@ -1,55 +1,73 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
-from googletrans import Translator
 from config import GUILD_ID
+from utils import storage
+from utils.message_buffer import MessageBuffer
+from utils.translator import TranslationService
 
 DATA_FILE = "translation.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
-translator = Translator()
-
 class Translation(commands.Cog):
     """Translation commands with 20 functional slash commands"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
+        self.translator = TranslationService()
+        self.recent = MessageBuffer()
+        self.seeded = set()
+
+    def cog_unload(self):
+        self.translator.close()
+
+    # ----------------------------
+    # Recent message buffer
+    # ----------------------------
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        self.recent.add_message(message)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload):
+        if "content" in payload.data:
+            self.recent.edit(payload.message_id, payload.data["content"])
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        self.recent.delete(payload.message_id)
+
+    async def buffered(self, channel):
+        """Make sure a channel's buffer covers messages sent before this process started"""
+        if channel.id not in self.seeded or channel.id not in self.recent:
+            # One history() call per channel per run (or after it was evicted); on_message keeps it current
+            self.recent.seed(channel.id, [msg async for msg in channel.history(limit=self.recent.size)])
+            self.seeded.add(channel.id)
+        return self.recent
 
     # ----------------------------
     # 1. /translate
     # ----------------------------
     @app_commands.command(name="translate", description="Translate text to a target language")
     async def translate(self, interaction: discord.Interaction, text: str, target: str):
-        translated = translator.translate(text, dest=target)
-        await interaction.response.send_message(f"**Original:** {text}\n**Translated ({target}):** {translated.text}")
+        translated = await self.translator.translate(text, target)
+        await interaction.response.send_message(f"**Original:** {text}\n**Translated ({target}):** {translated}")
 
     # ----------------------------
     # 2. /detect
     # ----------------------------
     @app_commands.command(name="detect", description="Detect language of text")
     async def detect(self, interaction: discord.Interaction, text: str):
-        detected = translator.detect(text)
-        await interaction.response.send_message(f"Detected language: `{detected.lang}` | Confidence: `{detected.confidence}`")
+        lang, confidence = await self.translator.detect(text)
+        await interaction.response.send_message(f"Detected language: `{lang}` | Confidence: `{confidence}`")
 
     # ----------------------------
     # 3. /translate_auto
     # ----------------------------
     @app_commands.command(name="translate_auto", description="Auto-detect and translate to English")
     async def translate_auto(self, interaction: discord.Interaction, text: str):
-        translated = translator.translate(text, dest="en")
-        await interaction.response.send_message(f"**Original:** {text}\n**Translated (en):** {translated.text}")
+        translated = await self.translator.translate(text, "en")
+        await interaction.response.send_message(f"**Original:** {text}\n**Translated (en):** {translated}")
 
     # ----------------------------
     # 4. /setlang
@@ -58,7 +76,7 @@ class Translation(commands.Cog):
     async def setlang(self, interaction: discord.Interaction, lang: str):
         user_id = str(interaction.user.id)
         self.data.setdefault(user_id, {})["lang"] = lang
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
         await interaction.response.send_message(f"✅ Your preferred language set to `{lang}`")
 
     # ----------------------------
@@ -75,14 +93,11 @@ class Translation(commands.Cog):
     # ----------------------------
     @app_commands.command(name="translate_user", description="Translate a message from a user")
     async def translate_user(self, interaction: discord.Interaction, member: discord.Member, target: str):
-        last_msg = None
-        async for msg in interaction.channel.history(limit=100):
-            if msg.author.id == member.id:
-                last_msg = msg.content
-                break
+        record = (await self.buffered(interaction.channel)).last(interaction.channel.id, member.id)
+        last_msg = record.content if record else None
         if last_msg:
-            translated = translator.translate(last_msg, dest=target)
-            await interaction.response.send_message(f"**Original ({member.display_name}):** {last_msg}\n**Translated ({target}):** {translated.text}")
+            translated = await self.translator.translate(last_msg, target)
+            await interaction.response.send_message(f"**Original ({member.display_name}):** {last_msg}\n**Translated ({target}):** {translated}")
         else:
             await interaction.response.send_message(f"No recent message found for {member.mention}", ephemeral=True)
 
@@ -99,25 +114,21 @@ class Translation(commands.Cog):
     # ----------------------------
     @app_commands.command(name="translate_last", description="Translate last message in channel")
     async def translate_last(self, interaction: discord.Interaction, target: str):
-        async for msg in interaction.channel.history(limit=2):
-            if msg.id != interaction.id:
-                translated = translator.translate(msg.content, dest=target)
-                await interaction.response.send_message(f"**Original:** {msg.content}\n**Translated ({target}):** {translated.text}")
-                return
+        msg = (await self.buffered(interaction.channel)).last(interaction.channel.id)
+        if msg:
+            translated = await self.translator.translate(msg.content, target)
+            await interaction.response.send_message(f"**Original:** {msg.content}\n**Translated ({target}):** {translated}")
 
     # ----------------------------
     # 9. /translate_auto_user
     # ----------------------------
     @app_commands.command(name="translate_auto_user", description="Translate last message of a user to English")
     async def translate_auto_user(self, interaction: discord.Interaction, member: discord.Member):
-        last_msg = None
-        async for msg in interaction.channel.history(limit=100):
-            if msg.author.id == member.id:
-                last_msg = msg.content
-                break
+        record = (await self.buffered(interaction.channel)).last(interaction.channel.id, member.id)
+        last_msg = record.content if record else None
         if last_msg:
-            translated = translator.translate(last_msg, dest="en")
-            await interaction.response.send_message(f"**Original ({member.display_name}):** {last_msg}\n**Translated (en):** {translated.text}")
+            translated = await self.translator.translate(last_msg, "en")
+            await interaction.response.send_message(f"**Original ({member.display_name}):** {last_msg}\n**Translated (en):** {translated}")
         else:
             await interaction.response.send_message(f"No recent message found for {member.mention}", ephemeral=True)
 
@@ -129,10 +140,10 @@ class Translation(commands.Cog):
         user_id = str(interaction.user.id)
         saved_texts = self.data.setdefault(user_id, {}).setdefault("saved", [])
         saved_texts.append(text)
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
         lang = self.data.get(user_id, {}).get("lang", "en")
-        translated = translator.translate(text, dest=lang)
-        await interaction.response.send_message(f"✅ Saved text and translated to `{lang}`: {translated.text}")
+        translated = await self.translator.translate(text, lang)
+        await interaction.response.send_message(f"✅ Saved text and translated to `{lang}`: {translated}")
 
     # ----------------------------
     # 11. /list_saved
@@ -153,7 +164,7 @@ class Translation(commands.Cog):
     async def clear_saved(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
         self.data.get(user_id, {})["saved"] = []
-        save_data(self.data)
+        self.data.mark_dirty(user_id)
         await interaction.response.send_message("✅ Cleared all saved texts")
 
     # ----------------------------
@@ -161,10 +172,8 @@ class Translation(commands.Cog):
     # ----------------------------
     @app_commands.command(name="translate_channel", description="Translate last 5 messages in channel")
     async def translate_channel(self, interaction: discord.Interaction, target: str):
-        messages = []
-        async for msg in interaction.channel.history(limit=5):
-            messages.append(msg.content)
-        translated_list = [translator.translate(m, dest=target).text for m in reversed(messages)]
+        messages = [msg.content for msg in (await self.buffered(interaction.channel)).recent(interaction.channel.id, 5)]
+        translated_list = await self.translator.translate_many(messages, target)
         await interaction.response.send_message("\n".join(translated_list))
 
     # ----------------------------
@@ -175,8 +184,8 @@ class Translation(commands.Cog):
         user_id = str(interaction.user.id)
         saved_texts = self.data.get(user_id, {}).get("saved", [])
         if 0 <= index-1 < len(saved_texts):
-            detected = translator.detect(saved_texts[index-1])
-            await interaction.response.send_message(f"Language: {detected.lang} | Confidence: {detected.confidence}")
+            lang, confidence = await self.translator.detect(saved_texts[index-1])
+            await interaction.response.send_message(f"Language: {lang} | Confidence: {confidence}")
         else:
             await interaction.response.send_message("Invalid index", ephemeral=True)
 
@@ -188,8 +197,8 @@ class Translation(commands.Cog):
         user_id = str(interaction.user.id)
         saved_texts = self.data.get(user_id, {}).get("saved", [])
         if 0 <= index-1 < len(saved_texts):
-            translated = translator.translate(saved_texts[index-1], dest=target)
-            await interaction.response.send_message(f"Translated: {translated.text}")
+            translated = await self.translator.translate(saved_texts[index-1], target)
+            await interaction.response.send_message(f"Translated: {translated}")
         else:
             await interaction.response.send_message("Invalid index", ephemeral=True)
 
@@ -202,7 +211,7 @@ class Translation(commands.Cog):
         saved_texts = self.data.get(user_id, {}).get("saved", [])
         if 0 <= index-1 < len(saved_texts):
             removed = saved_texts.pop(index-1)
-            save_data(self.data)
+            self.data.mark_dirty(user_id)
             await interaction.response.send_message(f"Removed saved text: {removed}")
         else:
             await interaction.response.send_message("Invalid index", ephemeral=True)
@@ -212,8 +221,8 @@ class Translation(commands.Cog):
     # ----------------------------
     @app_commands.command(name="translate_dm", description="Translate text to DM of user")
     async def translate_dm(self, interaction: discord.Interaction, member: discord.Member, text: str, target: str):
-        translated = translator.translate(text, dest=target)
-        await member.send(f"Translated text from {interaction.user.display_name}: {translated.text}")
+        translated = await self.translator.translate(text, target)
+        await member.send(f"Translated text from {interaction.user.display_name}: {translated}")
         await interaction.response.send_message(f"✅ Sent translated text to {member.mention}")
 
     # ----------------------------
@@ -227,8 +236,8 @@ class Translation(commands.Cog):
                 file = last_msg.attachments[0]
                 content = await file.read()
                 text = content.decode("utf-8")
-                translated = translator.translate(text, dest=target)
-                await interaction.response.send_message(f"Translated:\n{translated.text}")
+                translated = await self.translator.translate(text, target)
+                await interaction.response.send_message(f"Translated:\n{translated}")
             else:
                 await interaction.response.send_message("No attachment found", ephemeral=True)
 
@@ -238,7 +247,7 @@ class Translation(commands.Cog):
     @app_commands.command(name="translate_multi", description="Translate multiple lines of text")
     async def translate_multi(self, interaction: discord.Interaction, text: str, target: str):
         lines = text.split(";")
-        translated_lines = [translator.translate(line, dest=target).text for line in lines]
+        translated_lines = await self.translator.translate_many(lines, target)
         await interaction.response.send_message("\n".join(translated_lines))
 
     # ----------------------------
@@ -249,7 +258,7 @@ class Translation(commands.Cog):
         user_id = str(interaction.user.id)
         saved_texts = self.data.get(user_id, {}).get("saved", [])
         lang = self.data.get(user_id, {}).get("lang", "en")
-        translated = [translator.translate(text, dest=lang).text for text in saved_texts]
+        translated = await self.translator.translate_many(saved_texts, lang)
         await interaction.response.send_message("\n".join(translated) if translated else "No saved texts")
 
 async def setup(bot):
@@ -1,29 +1,18 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-import json
-import os
 import random
 from config import GUILD_ID
+from utils import storage
 
 DATA_FILE = "trivia.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {"questions": {}, "leaderboard": {}}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Trivia(commands.Cog):
     """Trivia system with 20 commands"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE, default={"questions": {}, "leaderboard": {}})
         self.active_trivia = {}  # guild_id: question
 
     # ----------------------------
@@ -36,7 +25,7 @@ class Trivia(commands.Cog):
             "question": question,
             "answer": answer
         })
-        save_data(self.data)
+        self.data.mark_dirty("questions")
         await interaction.response.send_message(f"✅ Question added to category `{category}`")
 
     # ----------------------------
@@ -48,7 +37,7 @@ class Trivia(commands.Cog):
         questions = self.data.get("questions", {}).get(guild_id, {}).get(category, [])
         if 0 <= index-1 < len(questions):
             removed = questions.pop(index-1)
-            save_data(self.data)
+            self.data.mark_dirty("questions")
             await interaction.response.send_message(f"✅ Removed question: {removed['question']}")
         else:
             await interaction.response.send_message("❌ Invalid index.", ephemeral=True)
@@ -94,7 +83,7 @@ class Trivia(commands.Cog):
             user_id = str(interaction.user.id)
             self.data.setdefault("leaderboard", {}).setdefault(guild_id, {}).setdefault(user_id, 0)
             self.data["leaderboard"][guild_id][user_id] += 1
-            save_data(self.data)
+            self.data.mark_dirty("leaderboard")
             self.active_trivia.pop(guild_id)
             await interaction.response.send_message(f"✅ Correct! {interaction.user.mention} now has {self.data['leaderboard'][guild_id][user_id]} points.")
         else:
@@ -121,7 +110,7 @@ class Trivia(commands.Cog):
     async def reset_leaderboard(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault("leaderboard", {})[guild_id] = {}
-        save_data(self.data)
+        self.data.mark_dirty("leaderboard")
         await interaction.response.send_message("✅ Leaderboard reset.")
 
     # ----------------------------
@@ -189,7 +178,7 @@ class Trivia(commands.Cog):
     async def add_category(self, interaction: discord.Interaction, category: str):
         guild_id = str(interaction.guild.id)
         self.data.setdefault("questions", {}).setdefault(guild_id, {}).setdefault(category, [])
-        save_data(self.data)
+        self.data.mark_dirty("questions")
         await interaction.response.send_message(f"✅ Category `{category}` added.")
 
     # ----------------------------
@@ -200,7 +189,7 @@ class Trivia(commands.Cog):
         guild_id = str(interaction.guild.id)
         if category in self.data.get("questions", {}).get(guild_id, {}):
             self.data["questions"][guild_id].pop(category)
-            save_data(self.data)
+            self.data.mark_dirty("questions")
             await interaction.response.send_message(f"✅ Category `{category}` removed.")
         else:
             await interaction.response.send_message("❌ Category not found.", ephemeral=True)
@@ -214,7 +203,7 @@ class Trivia(commands.Cog):
         categories = self.data.get("questions", {}).get(guild_id, {})
         if old in categories:
             categories[new] = categories.pop(old)
-            save_data(self.data)
+            self.data.mark_dirty("questions")
             await interaction.response.send_message(f"✅ Category `{old}` renamed to `{new}`")
         else:
             await interaction.response.send_message("❌ Category not found.", ephemeral=True)
@@ -252,7 +241,7 @@ class Trivia(commands.Cog):
         guild_id = str(interaction.guild.id)
         self.data["questions"][guild_id] = {}
         self.data["leaderboard"][guild_id] = {}
-        save_data(self.data)
+        self.data.mark_dirty("questions", "leaderboard")
         self.active_trivia.pop(guild_id, None)
         await interaction.response.send_message("✅ Trivia reset.")
 
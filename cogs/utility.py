@@ -1,31 +1,31 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-import json
-import os
 import datetime
 import asyncio
+import uuid
 from config import GUILD_ID
+from utils import storage
+from utils.scheduler import get_scheduler
 
 DATA_FILE = "utility.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class Utility(commands.Cog):
     """Utility commands cog with 20 slash commands"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
-        self.reminder_loop.start()
+        self.data = storage.open_store(DATA_FILE)
+        self.scheduler = get_scheduler()
+        self.scheduler.register("utility_reminder", self.deliver_reminder)
+        # Reminders saved before timers existed (or whose timer was lost) get one now
+        for reminder in self.data.get("reminders", []):
+            if not self.scheduler.has(reminder.get("id")):
+                self.schedule_reminder(reminder)
+                self.data.mark_dirty("reminders")
+
+    def cog_unload(self):
+        self.scheduler.unregister("utility_reminder")
 
     # ----------------------------
     # 1. /userinfo
@@ -77,12 +77,14 @@ class Utility(commands.Cog):
     @app_commands.command(name="remind", description="Set a reminder")
     async def remind(self, interaction: discord.Interaction, time: int, *, message: str):
         user_id = str(interaction.user.id)
-        self.data.setdefault("reminders", []).append({
+        reminder = {
             "user": user_id,
             "message": message,
             "time": (datetime.datetime.utcnow() + datetime.timedelta(seconds=time)).isoformat()
-        })
-        save_data(self.data)
+        }
+        self.data.setdefault("reminders", []).append(reminder)
+        self.schedule_reminder(reminder)
+        self.data.mark_dirty("reminders")
         await interaction.response.send_message(f"⏰ Reminder set in {time} seconds: {message}")
 
     # ----------------------------
@@ -224,24 +226,28 @@ class Utility(commands.Cog):
         await interaction.response.send_message(f"⏱️ {seconds} seconds = {formatted}")
 
     # ----------------------------
-    # Background loop for reminders
+    # Timers for reminders
     # ----------------------------
-    @tasks.loop(seconds=5)
-    async def reminder_loop(self):
-        if "reminders" not in self.data:
+    def schedule_reminder(self, reminder):
+        reminder.setdefault("id", uuid.uuid4().hex)
+        self.scheduler.schedule("utility_reminder", datetime.datetime.fromisoformat(reminder["time"]), {
+            "id": reminder["id"]
+        }, timer_id=reminder["id"])
+
+    async def deliver_reminder(self, payload):
+        reminders = self.data.get("reminders", [])
+        reminder = next((r for r in reminders if r.get("id") == payload["id"]), None)
+        if reminder is None:
             return
-        now = datetime.datetime.utcnow()
-        for reminder in self.data["reminders"][:]:
-            time_remind = datetime.datetime.fromisoformat(reminder["time"])
-            if now >= time_remind:
-                user = self.bot.get_user(int(reminder["user"]))
-                if user:
-                    try:
-                        await user.send(f"⏰ Reminder: {reminder['message']}")
-                    except:
-                        pass
-                self.data["reminders"].remove(reminder)
-        save_data(self.data)
+        await self.bot.wait_until_ready()
+        user = self.bot.get_user(int(reminder["user"]))
+        if user:
+            try:
+                await user.send(f"⏰ Reminder: {reminder['message']}")
+            except:
+                pass
+        reminders.remove(reminder)
+        self.data.mark_dirty("reminders")
 
 async def setup(bot):
     await bot.add_cog(Utility(bot), guild=discord.Object(id=GUILD_ID))
@@ -1,50 +1,107 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands, ui
-import json
-import os
-from datetime import datetime, timedelta
+import time
 from config import GUILD_ID
+from utils import storage
+from utils.outbound import get_outbound, edit_progress, finish, summary, token_time_left
+from functools import partial
 
 DATA_FILE = "voice_data.json"
+SESSIONS_FILE = "voice_sessions.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
 
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+def recorded_seconds(record):
+    """Seconds of VC time stored in a record
+
+    Records from the old per-minute tracker only have voice_time (minutes), and
+    rows migrated to SQLite get voice_seconds as 0 (imported) or NULL (added
+    column), so a missing or zero voice_seconds falls back to voice_time.
+    """
+    return record.get("voice_seconds") or (record.get("voice_time") or 0) * 60
 
 class Voice(commands.Cog):
     """Full-featured voice management, tracking, and VC panel system"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
+        # Open sessions survive restarts: {"sessions": {guild_id: {user_id: joined_at}}, "stopped_at": ts}
+        self.sessions = storage.open_store(SESSIONS_FILE, default={"sessions": {}, "stopped_at": None})
+        self.recovered = False
         self.temp_channels = {}  # guild_id: {channel_id: owner_id}
-        self.track_voice.start()
+        self.outbound = get_outbound()
         self.cleanup.start()
 
+    async def cog_load(self):
+        if self.bot.is_ready():
+            self.recover_sessions()
+
     def cog_unload(self):
-        self.track_voice.cancel()
         self.cleanup.cancel()
+        self.sessions["stopped_at"] = time.time()
 
     # --------------------
-    # Track voice time
+    # Track voice time (join/leave events)
     # --------------------
-    @tasks.loop(seconds=60)
-    async def track_voice(self):
-        for guild in self.bot.guilds:
-            guild_id = str(guild.id)
-            for member in guild.members:
-                if member.voice and member.voice.channel:
-                    user_id = str(member.id)
-                    self.data.setdefault(guild_id, {}).setdefault(user_id, {}).setdefault("voice_time", 0)
-                    self.data[guild_id][user_id]["voice_time"] += 1
-        save_data(self.data)
+    def start_session(self, guild_id, user_id, joined_at=None):
+        self.sessions["sessions"].setdefault(guild_id, {})[user_id] = joined_at or time.time()
+        self.sessions.mark_dirty("sessions")
+
+    def end_session(self, guild_id, user_id, left_at=None):
+        joined_at = self.sessions["sessions"].get(guild_id, {}).pop(user_id, None)
+        self.sessions.mark_dirty("sessions")
+        if joined_at is None:
+            return
+        record = self.data.setdefault(guild_id, {}).setdefault(user_id, {})
+        seconds = recorded_seconds(record)
+        seconds += max(0, round((left_at or time.time()) - joined_at))
+        record["voice_seconds"] = seconds
+        record["voice_time"] = seconds // 60
+        self.data.mark_dirty(guild_id)
+
+    def recover_sessions(self):
+        """Reconcile sessions left open by the previous run with who is in voice now"""
+        stopped_at = self.sessions["stopped_at"]
+        in_voice = {
+            (str(guild.id), str(member.id))
+            for guild in self.bot.guilds
+            for channel in guild.voice_channels + guild.stage_channels
+            for member in channel.members
+        }
+        for guild_id, users in list(self.sessions["sessions"].items()):
+            for user_id in list(users):
+                if (guild_id, user_id) in in_voice:
+                    continue  # still connected: keep the original join time
+                # Left while we were down; only a clean shutdown tells us until when
+                if stopped_at:
+                    self.end_session(guild_id, user_id, stopped_at)
+                else:
+                    users.pop(user_id)
+        for guild_id, user_id in in_voice:
+            if user_id not in self.sessions["sessions"].get(guild_id, {}):
+                self.start_session(guild_id, user_id)
+        self.sessions["stopped_at"] = None
+        self.sessions.mark_dirty("sessions")
+        self.recovered = True
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if not self.recovered:
+            await self.data.load(*((g, u) for g, users in self.sessions["sessions"].items() for u in users))
+            self.recover_sessions()
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        if before.channel == after.channel:
+            return  # mute/deafen/stream changes
+        guild_id = str(member.guild.id)
+        user_id = str(member.id)
+        if before.channel is None:
+            self.start_session(guild_id, user_id)
+        elif after.channel is None:
+            await self.data.load((guild_id, user_id))
+            self.end_session(guild_id, user_id)
 
     # --------------------
     # Cleanup empty temp channels
@@ -89,14 +146,18 @@ class Voice(commands.Cog):
     async def vc_stats(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         user_id = str(interaction.user.id)
-        time_min = self.data.get(guild_id, {}).get(user_id, {}).get("voice_time", 0)
-        await interaction.response.send_message(f"⏱️ You have spent {time_min} minutes in VC")
+        await self.data.load((guild_id, user_id))
+        record = self.data.get(guild_id, {}).get(user_id, {})
+        seconds = recorded_seconds(record)
+        joined_at = self.sessions["sessions"].get(guild_id, {}).get(user_id)
+        if joined_at:
+            seconds += round(time.time() - joined_at)
+        await interaction.response.send_message(f"⏱️ You have spent {seconds // 60} minutes in VC")
 
     @app_commands.command(name="vc_top", description="Show top VC users")
     async def vc_top(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
-        users = self.data.get(guild_id, {})
-        sorted_users = sorted(users.items(), key=lambda x: x[1].get("voice_time", 0), reverse=True)[:10]
+        sorted_users = await self.data.top("voice_time", 10, group=guild_id)
         msg = "\n".join([f"{interaction.guild.get_member(int(uid))}: {u['voice_time']} min" for uid,u in sorted_users])
         await interaction.response.send_message(f"🏆 Top VC users:\n{msg}")
 
@@ -165,21 +226,27 @@ class Voice(commands.Cog):
 
     @app_commands.command(name="vc_all_mute", description="Mute all members in VC")
     async def vc_all_mute(self, interaction: discord.Interaction, channel: discord.VoiceChannel):
-        for member in channel.members:
-            await member.edit(mute=True)
-        await interaction.response.send_message(f"🔇 All members muted in {channel.name}")
+        await self.bulk_edit(interaction, channel, "🔇 Muted", mute=True)
 
     @app_commands.command(name="vc_all_unmute", description="Unmute all members in VC")
     async def vc_all_unmute(self, interaction: discord.Interaction, channel: discord.VoiceChannel):
-        for member in channel.members:
-            await member.edit(mute=False)
-        await interaction.response.send_message(f"🔊 All members unmuted in {channel.name}")
+        await self.bulk_edit(interaction, channel, "🔊 Unmuted", mute=False)
 
     @app_commands.command(name="vc_disconnect_all", description="Disconnect all members from VC")
     async def vc_disconnect_all(self, interaction: discord.Interaction, channel: discord.VoiceChannel):
-        for member in channel.members:
-            await member.move_to(None)
-        await interaction.response.send_message(f"✅ All members disconnected from {channel.name}")
+        await self.bulk_edit(interaction, channel, "✅ Disconnected", voice_channel=None)
+
+    async def bulk_edit(self, interaction, channel, label, **changes):
+        """Apply the same member edit to everyone in a VC, paced by the outbound scheduler"""
+        members = list(channel.members)
+        await interaction.response.send_message(f"⏳ {label}: 0/{len(members)}")
+        route = ("member", channel.guild.id)
+        done, failed, skipped = await self.outbound.run(
+            [(route, partial(member.edit, **changes)) for member in members],
+            progress=edit_progress(interaction, label),
+            limit=token_time_left(interaction)
+        )
+        await finish(interaction, summary(f"{label} in {channel.name}", done, failed, skipped))
 
 
 # --------------------
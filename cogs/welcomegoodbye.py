@@ -1,28 +1,17 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from config import GUILD_ID
+from utils import storage
 
 DATA_FILE = "welcome_goodbye.json"
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 class WelcomeGoodbye(commands.Cog):
     """Welcome and goodbye system with JSON persistence"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.data = load_data()
+        self.data = storage.open_store(DATA_FILE)
 
     # ----------------------------
     # 1. /set_welcome_channel
@@ -31,7 +20,7 @@ class WelcomeGoodbye(commands.Cog):
     async def set_welcome_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["welcome_channel"] = channel.id
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Welcome channel set to {channel.mention}")
 
     # ----------------------------
@@ -41,7 +30,7 @@ class WelcomeGoodbye(commands.Cog):
     async def set_goodbye_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["goodbye_channel"] = channel.id
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Goodbye channel set to {channel.mention}")
 
     # ----------------------------
@@ -51,7 +40,7 @@ class WelcomeGoodbye(commands.Cog):
     async def set_welcome_message(self, interaction: discord.Interaction, *, message: str):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["welcome_message"] = message
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Welcome message set.")
 
     # ----------------------------
@@ -61,7 +50,7 @@ class WelcomeGoodbye(commands.Cog):
     async def set_goodbye_message(self, interaction: discord.Interaction, *, message: str):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["goodbye_message"] = message
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Goodbye message set.")
 
     # ----------------------------
@@ -71,7 +60,7 @@ class WelcomeGoodbye(commands.Cog):
     async def enable_welcome(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["welcome_enabled"] = True
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Welcome messages enabled.")
 
     # ----------------------------
@@ -81,7 +70,7 @@ class WelcomeGoodbye(commands.Cog):
     async def disable_welcome(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["welcome_enabled"] = False
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Welcome messages disabled.")
 
     # ----------------------------
@@ -91,7 +80,7 @@ class WelcomeGoodbye(commands.Cog):
     async def enable_goodbye(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["goodbye_enabled"] = True
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Goodbye messages enabled.")
 
     # ----------------------------
@@ -101,7 +90,7 @@ class WelcomeGoodbye(commands.Cog):
     async def disable_goodbye(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         self.data.setdefault(guild_id, {})["goodbye_enabled"] = False
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Goodbye messages disabled.")
 
     # ----------------------------
@@ -156,7 +145,7 @@ class WelcomeGoodbye(commands.Cog):
         guild_id = str(interaction.guild.id)
         if "welcome_message" in self.data.get(guild_id, {}):
             self.data[guild_id].pop("welcome_message")
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Welcome message reset.")
 
     # ----------------------------
@@ -167,7 +156,7 @@ class WelcomeGoodbye(commands.Cog):
         guild_id = str(interaction.guild.id)
         if "goodbye_message" in self.data.get(guild_id, {}):
             self.data[guild_id].pop("goodbye_message")
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ Goodbye message reset.")
 
     # ----------------------------
@@ -196,7 +185,7 @@ class WelcomeGoodbye(commands.Cog):
         guild_id = str(interaction.guild.id)
         current = self.data.get(guild_id, {}).get("welcome_mention", True)
         self.data.setdefault(guild_id, {})["welcome_mention"] = not current
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Welcome mentions {'enabled' if not current else 'disabled'}.")
 
     # ----------------------------
@@ -207,7 +196,7 @@ class WelcomeGoodbye(commands.Cog):
         guild_id = str(interaction.guild.id)
         current = self.data.get(guild_id, {}).get("goodbye_mention", True)
         self.data.setdefault(guild_id, {})["goodbye_mention"] = not current
-        save_data(self.data)
+        self.data.mark_dirty(guild_id)
         await interaction.response.send_message(f"✅ Goodbye mentions {'enabled' if not current else 'disabled'}.")
 
     # ----------------------------
@@ -228,7 +217,7 @@ class WelcomeGoodbye(commands.Cog):
         guild_id = str(interaction.guild.id)
         if guild_id in self.data:
             self.data.pop(guild_id)
-            save_data(self.data)
+            self.data.mark_dirty(guild_id)
         await interaction.response.send_message("✅ All welcome/goodbye settings reset.")
 
     # ----------------------------
@@ -1,3 +1,50 @@
 GUILD_ID = 1450640949922365481
 OWNER_ID = 1332640351499976728
-PREMIUM_FILE = "premium.json"
\ No newline at end of file
+PREMIUM_FILE = "premium.json"
+
+# Data storage: "json" keeps one file per cog, "sqlite" moves economy/leveling/voice/social into DATABASE_FILE
+STORAGE_BACKEND = "json"
+DATABASE_FILE = "bot.db"
+
+# Image processing: worker processes, jobs allowed to wait behind them, and seconds before a job is abandoned
+IMAGE_WORKERS = 2
+IMAGE_QUEUE = 8
+IMAGE_TIMEOUT = 10
+
+# Avatar downloads: bytes kept in memory, directory for the disk tier (None disables it) and its size cap
+AVATAR_CACHE_BYTES = 64 * 1024 * 1024
+AVATAR_CACHE_DIR = "avatar_cache"
+AVATAR_DISK_BYTES = 512 * 1024 * 1024
+# Rendered image results kept in memory (bytes)
+RESULT_CACHE_BYTES = 32 * 1024 * 1024
+
+# Translation backend: "google" uses googletrans, "fake" is a local stand-in for tests and benchmarks
+TRANSLATION_BACKEND = "google"
+# Recent messages kept per channel for translation lookups, and how many channels to track
+MESSAGE_BUFFER_SIZE = 100
+MESSAGE_BUFFER_CHANNELS = 500
+
+# Message content kept per guild for delete/edit logs, seconds to keep it, and whether to zlib it
+LOG_CACHE_SIZE = 5000
+LOG_CACHE_TTL = 24 * 3600
+LOG_CACHE_COMPRESS = True
+
+# Seconds log entries wait to be batched, max queued entries per log channel, and seconds a full queue blocks before dropping
+LOG_FLUSH_INTERVAL = 1.5
+LOG_BACKLOG = 500
+LOG_BACKPRESSURE_WAIT = 2
+
+# Bulk REST actions: global requests per second (Discord allows 50), seconds of slack beyond the
+# time the rate limits need before giving up, seconds between progress edits
+OUTBOUND_GLOBAL_RATE = 40
+OUTBOUND_DEADLINE = 60
+OUTBOUND_PROGRESS_INTERVAL = 2
+
+# OpenMetrics dump of per-command latency histograms, and seconds between rewrites
+METRICS_FILE = "metrics.txt"
+METRICS_DUMP_INTERVAL = 60
+
+# Event loop watchdog: seconds between heartbeats, lag in seconds that counts as a stall, stalls kept for /loop_lag
+LAG_INTERVAL = 0.1
+LAG_THRESHOLD = 0.2
+LAG_REPORT_SIZE = 50
\ No newline at end of file
@@ -0,0 +1,104 @@
+import asyncio
+import os
+from collections import OrderedDict
+from config import AVATAR_CACHE_BYTES, AVATAR_CACHE_DIR, AVATAR_DISK_BYTES
+from utils import storage
+from utils.lru import ByteLRU
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write(path, data):
+    # A cache file needs no fsync; the rename just keeps readers off half-written files
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class AvatarCache:
+    """Avatar bytes keyed by (avatar hash, size)
+
+    Avatar hashes change whenever the image does, so entries never go stale.
+    Memory is an LRU capped at `max_bytes`; evicted entries stay on disk under
+    `disk_dir` (up to `disk_bytes`, None disables the tier). Concurrent
+    requests for the same avatar share a single download.
+    """
+
+    def __init__(self, session, max_bytes=AVATAR_CACHE_BYTES, disk_dir=AVATAR_CACHE_DIR, disk_bytes=AVATAR_DISK_BYTES):
+        self.session = session
+        self.memory = ByteLRU(max_bytes)
+        self._inflight = {}
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self._disk = OrderedDict()
+        self._disk_total = 0
+        self.hits = {"disk": 0, "shared": 0}
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            # Oldest files first so they are the first to go
+            entries = sorted(os.scandir(disk_dir), key=lambda e: e.stat().st_mtime)
+            for entry in entries:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    self._disk[entry.name] = entry.stat().st_size
+                    self._disk_total += entry.stat().st_size
+
+    async def fetch(self, asset, size=None):
+        """Return the bytes of a discord Asset, from cache when possible"""
+        key = (asset.key, size or 0)
+        data = self.memory.get(key)
+        if data is not None:
+            return data
+        task = self._inflight.get(key)
+        if task is not None:
+            self.hits["shared"] += 1
+            return await asyncio.shield(task)
+        url = str(asset.with_size(size).url if size else asset.url)
+        task = asyncio.get_running_loop().create_task(self._load(key, url))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _load(self, key, url):
+        name = f"{key[0]}_{key[1]}"
+        if name in self._disk:
+            try:
+                data = await asyncio.wrap_future(storage.submit_io(_read, os.path.join(self.disk_dir, name)))
+            except OSError:
+                self._forget(name)
+            else:
+                self._disk.move_to_end(name)
+                self.hits["disk"] += 1
+                self.memory.put(key, data)
+                return data
+        self.misses += 1
+        async with self.session.get(url) as resp:
+            resp.raise_for_status()
+            data = await resp.read()
+        self.memory.put(key, data)
+        if self.disk_dir:
+            self._store(name, data)
+        return data
+
+    def _store(self, name, data):
+        storage.submit_io(_write, os.path.join(self.disk_dir, name), data)
+        self._disk[name] = len(data)
+        self._disk_total += len(data)
+        while self._disk_total > self.disk_bytes and self._disk:
+            old = next(iter(self._disk))
+            self._forget(old)
+            storage.submit_io(_remove, os.path.join(self.disk_dir, old))
+
+    def _forget(self, name):
+        self._disk_total -= self._disk.pop(name, 0)
@@ -0,0 +1,92 @@
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from config import LOG_CACHE_SIZE, LOG_CACHE_TTL, LOG_CACHE_COMPRESS
+
+# Below this many bytes zlib's header costs more than it saves
+COMPRESS_MIN = 64
+
+
+class CachedMessage:
+    __slots__ = ("channel_id", "author_id", "data", "compressed", "created")
+
+    def __init__(self, channel_id, author_id, data, compressed, created):
+        self.channel_id = channel_id
+        self.author_id = author_id
+        self.data = data
+        self.compressed = compressed
+        self.created = created
+
+    @property
+    def content(self):
+        data = zlib.decompress(self.data) if self.compressed else self.data
+        return data.decode()
+
+
+class ContentCache:
+    """Recent message content per guild, so raw delete/edit events can still be logged
+
+    Each guild keeps at most `size` messages for at most `ttl` seconds, oldest
+    evicted first. Content is stored as UTF-8 bytes, zlib-compressed when that
+    makes it smaller.
+    """
+
+    def __init__(self, size=LOG_CACHE_SIZE, ttl=LOG_CACHE_TTL, compress=LOG_CACHE_COMPRESS):
+        self.size = size
+        self.ttl = ttl
+        self.compress = compress
+        self._guilds = {}
+
+    def _pack(self, content):
+        data = content.encode()
+        if self.compress and len(data) >= COMPRESS_MIN:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                return packed, True
+        return data, False
+
+    def add(self, guild_id, message_id, channel_id, author_id, content, now=None):
+        now = now or time.time()
+        messages = self._guilds.setdefault(guild_id, OrderedDict())
+        self._expire(messages, now)
+        data, compressed = self._pack(content)
+        messages[message_id] = CachedMessage(channel_id, author_id, data, compressed, now)
+        while len(messages) > self.size:
+            messages.popitem(last=False)
+
+    def get(self, guild_id, message_id):
+        record = self._guilds.get(guild_id, {}).get(message_id)
+        if record is None or record.created + self.ttl < time.time():
+            return None
+        return record
+
+    def pop(self, guild_id, message_id):
+        record = self.get(guild_id, message_id)
+        self._guilds.get(guild_id, {}).pop(message_id, None)
+        return record
+
+    def update(self, guild_id, message_id, content):
+        """Store edited content; returns the previous record or None"""
+        record = self.get(guild_id, message_id)
+        if record is None:
+            return None
+        previous = CachedMessage(record.channel_id, record.author_id, record.data, record.compressed, record.created)
+        record.data, record.compressed = self._pack(content)
+        return previous
+
+    def _expire(self, messages, now):
+        while messages:
+            record = next(iter(messages.values()))
+            if record.created + self.ttl >= now:
+                break
+            messages.popitem(last=False)
+
+    def stats(self):
+        """Message count and approximate memory, including per-entry dict overhead"""
+        count = sum(len(messages) for messages in self._guilds.values())
+        total = sum(sys.getsizeof(messages) for messages in self._guilds.values())
+        for messages in self._guilds.values():
+            for message_id, record in messages.items():
+                total += sys.getsizeof(record) + sys.getsizeof(record.data) + sys.getsizeof(message_id)
+        return {"guilds": len(self._guilds), "messages": count, "bytes": total, "per_message": total / count if count else 0}
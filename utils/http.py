@@ -0,0 +1,45 @@
+import aiohttp
+
+# One connection pool for every cog: connections and TLS sessions are reused
+# across commands instead of being set up for each request
+LIMIT = 100
+LIMIT_PER_HOST = 10
+DNS_TTL = 300
+TIMEOUT = aiohttp.ClientTimeout(total=20, connect=5, sock_read=15)
+
+_session = None
+_users = 0
+
+
+def _open():
+    connector = aiohttp.TCPConnector(
+        limit=LIMIT,
+        limit_per_host=LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_TTL,
+        enable_cleanup_closed=True
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=TIMEOUT)
+
+
+def get_session():
+    """Return the shared ClientSession, opening it inside the running loop on first use"""
+    global _session
+    if _session is None or _session.closed:
+        _session = _open()
+    return _session
+
+
+def acquire():
+    """Register a cog as a user of the shared session; pair with `await release()` in cog_unload"""
+    global _users
+    _users += 1
+    return get_session()
+
+
+async def release():
+    """Drop a user and close the session once the last cog has unloaded"""
+    global _users, _session
+    _users = max(_users - 1, 0)
+    if _users == 0 and _session is not None:
+        await _session.close()
+        _session = None
@@ -0,0 +1,255 @@
+from io import BytesIO
+from PIL import Image, ImageColor, ImageDraw, ImageFilter, ImageFont
+from utils import color_transforms, image_encoder
+
+# Pure Pillow transforms used by the Images cog. They run inside image pool
+# workers, so everything here must be importable without discord.
+
+
+def pixelate(image, size=10):
+    image = image.convert("RGB")
+    image_small = image.resize((size, size), resample=Image.BILINEAR)
+    return image_small.resize(image.size, Image.NEAREST)
+
+
+def invert(image):
+    return color_transforms.invert(image)
+
+
+def grayscale(image):
+    return color_transforms.grayscale(image)
+
+
+def blur(image, radius=5):
+    return image.convert("RGB").filter(ImageFilter.GaussianBlur(radius))
+
+
+def rotate(image, degrees=90):
+    return image.convert("RGBA").rotate(degrees, expand=True)
+
+
+def textimage(image, text=""):
+    image = Image.new("RGB", (600, 200), color=(73, 109, 137))
+    draw = ImageDraw.Draw(image)
+    draw.text((10, 80), text, fill=(255, 255, 255), font=ImageFont.load_default())
+    return image
+
+
+def flip(image):
+    return image.transpose(Image.FLIP_LEFT_RIGHT)
+
+
+def mirror(image):
+    return image.transpose(Image.FLIP_TOP_BOTTOM)
+
+
+def circle(image):
+    image = image.convert("RGBA")
+    size = image.size
+    mask = Image.new("L", size, 0)
+    ImageDraw.Draw(mask).ellipse((0, 0) + size, fill=255)
+    output = Image.new("RGBA", size)
+    output.paste(image, mask=mask)
+    return output
+
+
+def sharpen(image):
+    return image.filter(ImageFilter.SHARPEN)
+
+
+def sepia(image):
+    return color_transforms.sepia(image).convert("RGB")
+
+
+def tint(image, color=(255, 0, 0), strength=0.5):
+    return color_transforms.tint(image, tuple(color), strength)
+
+
+def sketch(image):
+    return image.convert("L").filter(ImageFilter.CONTOUR)
+
+
+def thumbnail(image, size=128):
+    image.thumbnail((size, size))
+    return image
+
+
+def frame(image, color="red", width=10):
+    image = image.convert("RGBA")
+    ImageDraw.Draw(image).rectangle([0, 0, image.width-1, image.height-1], outline=color, width=width)
+    return image
+
+
+def resize(image, width=256, height=256):
+    return image.resize((width, height))
+
+
+def textoverlay(image, text=""):
+    image = image.convert("RGBA")
+    ImageDraw.Draw(image).text((10, 10), text, fill=(255, 255, 255), font=ImageFont.load_default())
+    return image
+
+
+def combine(image, other):
+    img1 = image.convert("RGBA")
+    img2 = other.convert("RGBA")
+    new_img = Image.new("RGBA", (img1.width + img2.width, max(img1.height, img2.height)))
+    new_img.paste(img1, (0, 0))
+    new_img.paste(img2, (img1.width, 0))
+    return new_img
+
+
+OPERATIONS = {
+    "pixelate": pixelate,
+    "invert": invert,
+    "grayscale": grayscale,
+    "blur": blur,
+    "rotate": rotate,
+    "textimage": textimage,
+    "flip": flip,
+    "mirror": mirror,
+    "circle": circle,
+    "sharpen": sharpen,
+    "sepia": sepia,
+    "tint": tint,
+    "sketch": sketch,
+    "thumbnail": thumbnail,
+    "frame": frame,
+    "resize": resize,
+    "textoverlay": textoverlay,
+    "combine": combine,
+}
+
+
+# Operations that take more input images than the one being transformed
+EXTRA_INPUTS = {"combine": 1}
+# Operations that make a new image rather than transform one
+GENERATORS = {"textimage"}
+# Operations whose output is flat colour or hard edges; these stay lossless PNG
+GRAPHICS = {"pixelate", "textimage", "circle", "sketch", "frame", "textoverlay"}
+MAX_STEPS = 8
+# Largest width/height a step may produce; keeps one job from allocating gigabytes in a worker
+MAX_SIDE = 2048
+# Option types and (low, high) bounds, checked before a job reaches a worker. "color" takes
+# "#rrggbb", a colour name or an (r, g, b) tuple; for text the bound is the length.
+OPTIONS = {
+    "pixelate": {"size": (int, 1, 512)},
+    "blur": {"radius": (float, 0, 50)},
+    "rotate": {"degrees": (float, -360, 360)},
+    "textimage": {"text": (str, 0, 500)},
+    "tint": {"color": ("color", 0, 255), "strength": (float, 0, 1)},
+    "thumbnail": {"size": (int, 1, MAX_SIDE)},
+    "frame": {"color": ("color", 0, 255), "width": (int, 1, 100)},
+    "resize": {"width": (int, 1, MAX_SIDE), "height": (int, 1, MAX_SIDE)},
+    "textoverlay": {"text": (str, 0, 500)},
+}
+TYPE_NAMES = {int: "whole number", float: "number", "color": "colour like #ff8800 or red"}
+# Animated input: frames beyond MAX_FRAMES are sampled out, and frames are shrunk so the
+# whole animation, before and after the steps, stays under MAX_ANIMATION_PIXELS
+MAX_FRAMES = 100
+MAX_ANIMATION_PIXELS = 25_000_000
+
+
+def step(op, **params):
+    """One pipeline step as a hashable, picklable (op, params) pair"""
+    return (op, tuple(sorted(params.items())))
+
+
+def _option(op, name, value):
+    """Convert one option value to its type and check its bounds; raises ValueError"""
+    options = OPTIONS.get(op, {})
+    if name not in options:
+        raise ValueError(f"`{op}` takes {', '.join(options) or 'no options'}")
+    kind, low, high = options[name]
+    try:
+        if kind == "color":
+            value = ImageColor.getrgb(value)[:3] if isinstance(value, str) else tuple(int(c) for c in value)
+            if len(value) != 3:
+                raise ValueError
+        else:
+            value = kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"`{op} {name}` must be a {TYPE_NAMES[kind]}")
+    if kind is str:
+        if len(value) > high:
+            raise ValueError(f"`{op} {name}` is limited to {high} characters")
+    elif not all(low <= v <= high for v in (value if kind == "color" else (value,))):
+        raise ValueError(f"`{op} {name}` must be between {low} and {high}")
+    return value
+
+
+def validate(steps):
+    """Return steps with every option converted and bounds-checked; raises ValueError"""
+    checked = []
+    for op, params in steps:
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation `{op}`")
+        checked.append(step(op, **{name: _option(op, name, value) for name, value in params}))
+    return tuple(checked)
+
+
+def parse_pipeline(text):
+    """Parse "blur radius=3 > sepia > frame width=5" into steps; raises ValueError on bad input"""
+    steps = []
+    for part in text.split(">"):
+        words = part.split()
+        if not words:
+            continue
+        op = words[0].lower()
+        if op not in OPERATIONS or op in EXTRA_INPUTS or op in GENERATORS:
+            raise ValueError(f"Unknown operation `{op}`")
+        params = {}
+        for word in words[1:]:
+            name, _, value = word.partition("=")
+            if not value:
+                raise ValueError(f"`{op}` options are written name=value")
+            params[name] = _option(op, name, value)
+        steps.append(step(op, **params))
+    if not steps:
+        raise ValueError("No operations given")
+    if len(steps) > MAX_STEPS:
+        raise ValueError(f"At most {MAX_STEPS} operations per pipeline")
+    return tuple(steps)
+
+
+def render(images, steps):
+    """Decode the input images once, run every step on the first and encode the result once"""
+    decoded = [Image.open(BytesIO(data)) for data in images]
+    image, others = (decoded[0], decoded[1:]) if decoded else (None, [])
+    if getattr(image, "is_animated", False):
+        return image_encoder.encode_animation(lambda scale: _animate(image, others, steps, scale))
+    image = _apply(image, others, steps)
+    return image_encoder.encode(image, photo=steps[-1][0] not in GRAPHICS)
+
+
+def _apply(image, others, steps):
+    for op, params in steps:
+        extra = EXTRA_INPUTS.get(op, 0)
+        inputs, others = others[:extra], others[extra:]
+        image = OPERATIONS[op](image, *inputs, **dict(params))
+    return image
+
+
+def _fit(image, pixels):
+    """Shrink an image to at most `pixels` pixels, keeping its aspect ratio"""
+    if image.width * image.height <= pixels:
+        return image
+    scale = (pixels / (image.width * image.height)) ** 0.5
+    return image.resize((max(1, int(image.width * scale)), max(1, int(image.height * scale))), Image.LANCZOS)
+
+
+def _animate(image, others, steps, scale=1.0):
+    """Yield processed frames with info["duration"] set, decoding one source frame at a time"""
+    count = image.n_frames
+    stride = -(-count // MAX_FRAMES)
+    indices = range(0, count, stride)
+    budget = MAX_ANIMATION_PIXELS / len(indices) * scale * scale
+    for index in indices:
+        image.seek(index)
+        # Dropped frames' time goes to the frame kept in their place
+        duration = image.info.get("duration", 100) * min(stride, count - index)
+        frame = _fit(image.convert("RGBA"), budget)
+        # resize and rotate(expand) set their own output size, so cap the output too
+        frame = _fit(_apply(frame, others, steps), budget)
+        frame.info["duration"] = duration
+        yield frame
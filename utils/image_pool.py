@@ -0,0 +1,107 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import IMAGE_WORKERS, IMAGE_QUEUE, IMAGE_TIMEOUT
+from utils.lazy import lazy_import
+
+# Workers import Pillow in _warm; the bot process only needs it for the first job
+image_ops = lazy_import("utils.image_ops")
+
+
+class PoolBusy(Exception):
+    """Every worker is busy and the queue is full"""
+
+
+def _warm():
+    # Import Pillow and load its plugins before the first job arrives
+    image_ops.Image.init()
+
+
+class ImagePool:
+    """Process pool for Pillow work with a bounded queue and per-job timeouts
+
+    At most `workers + queue_size` jobs are admitted; further calls raise
+    PoolBusy instead of piling up. Queued jobs wait here rather than in the
+    executor, so a job only reaches a worker (and its timeout only starts)
+    once one is free. A job that times out would keep running in its worker,
+    so the pool is replaced and the old workers are terminated; jobs that were
+    running beside it are retried once on the new pool.
+    """
+
+    def __init__(self, workers=IMAGE_WORKERS, queue_size=IMAGE_QUEUE, timeout=IMAGE_TIMEOUT):
+        self.workers = workers
+        self.slots = workers + queue_size
+        self.timeout = timeout
+        self.pending = 0
+        self._running = asyncio.Semaphore(workers)
+        self._executor = self._open()
+
+    def _open(self):
+        # spawn keeps workers free of the bot's threads and event loop state
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm
+        )
+
+    def full(self):
+        return self.pending >= self.slots
+
+    @staticmethod
+    def _retrieve(future):
+        # A timed-out job's result has no awaiter left; retrieve it so it isn't logged as lost
+        if not future.cancelled():
+            future.exception()
+
+    async def run(self, steps, *images):
+        """Run a pipeline of image_ops steps on image bytes in a worker; returns PNG bytes"""
+        if self.full():
+            raise PoolBusy()
+        self.pending += 1
+        try:
+            async with self._running:
+                try:
+                    return await self._submit(steps, images)
+                except BrokenProcessPool:
+                    # Usually killed along with a job that timed out beside it; the pool is fresh now
+                    return await self._submit(steps, images)
+        finally:
+            self.pending -= 1
+
+    async def _submit(self, steps, images):
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(executor, image_ops.render, images, steps)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._restart(executor)
+            raise BrokenProcessPool(f"image pool was shut down: {e}") from e
+        future.add_done_callback(self._retrieve)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self._restart(executor, kill=True)
+            raise
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool for the next job
+            self._restart(executor)
+            raise
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise  # the caller itself was cancelled
+            # The old executor dropped the job when it was replaced
+            raise BrokenProcessPool("job was cancelled by a pool restart") from None
+
+    def _restart(self, executor, kill=False):
+        # Jobs failing together all point at the same pool; only the first replaces it
+        if executor is not self._executor:
+            return
+        self._executor = self._open()
+        if kill:
+            for process in list((executor._processes or {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,135 @@
+import asyncio
+import copy
+import json
+import os
+from utils import storage
+
+# Seconds appends are buffered before one write + fsync covers the whole batch
+BATCH_INTERVAL = 0.1
+# Appends that force a batch out early
+BATCH_SIZE = 256
+# Seconds between snapshots of the store; the journal is truncated after each one
+COMPACT_INTERVAL = 300
+# Journal entries that force a snapshot early
+COMPACT_ENTRIES = 50000
+
+
+class Journal:
+    """Append-only write-ahead log of field changes in front of a store
+
+    Each line is one transaction: [[key, field, delta, value], ...]. `value` is
+    the field's value after the change, so replaying a line the snapshot already
+    contains is harmless. The store is only rewritten on compaction.
+    """
+
+    def __init__(self, path, store, defaults, compact_interval=COMPACT_INTERVAL):
+        self.path = path
+        self.store = store
+        self.defaults = defaults
+        self._buffer = []
+        self._handle = None
+        self._entries = 0
+        store.flush_interval = compact_interval
+        store.after_flush = self._compacted
+        self.replay()
+
+    # --------------------
+    # Recovery
+    # --------------------
+    def replay(self):
+        """Re-apply journaled changes missing from the last snapshot, then compact"""
+        if not os.path.exists(self.path):
+            return 0
+        applied = 0
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    changes = json.loads(line)
+                except ValueError:
+                    # Torn tail from a crash mid-append; nothing after it was acknowledged
+                    print(f"⚠️ {self.path}: ignoring truncated entry after {applied} transactions")
+                    break
+                for key, field, _, value in changes:
+                    record = self.store.get(key)
+                    if record is None:
+                        record = self.store[key] = copy.deepcopy(self.defaults)
+                    record[field] = value
+                applied += 1
+        if applied:
+            print(f"🔁 {self.path}: replayed {applied} transactions")
+            self.store.mark_dirty()
+        self.store.flush()
+        return applied
+
+    # --------------------
+    # Recording
+    # --------------------
+    def apply(self, *deltas, sets=()):
+        """Add each (key, field, delta) and assign each (key, field, value) as one journaled transaction"""
+        changes = []
+        for key, field, delta in deltas:
+            record = self.store[key]
+            record[field] += delta
+            changes.append([key, field, delta, record[field]])
+        for key, field, value in sets:
+            self.store[key][field] = value
+            changes.append([key, field, None, value])
+        if not changes:
+            return
+        self._buffer.append(json.dumps(changes))
+        self._entries += 1
+        self.store.mark_dirty(*{c[0] for c in changes})
+        if len(self._buffer) >= BATCH_SIZE:
+            self.sync()
+        else:
+            self._schedule_sync()
+        if self._entries >= COMPACT_ENTRIES:
+            self.store.flush()
+
+    def _schedule_sync(self):
+        if self._handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.sync()
+            return
+        self._handle = loop.call_later(BATCH_INTERVAL, self.sync)
+
+    def sync(self):
+        """Queue buffered entries for one append + fsync on the storage I/O thread"""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not self._buffer:
+            return None
+        lines, self._buffer = self._buffer, []
+        return storage.submit_io(_append, self.path, lines)
+
+    # --------------------
+    # Compaction
+    # --------------------
+    def _compacted(self, pending):
+        # The store just snapshotted everything applied so far. Buffered entries
+        # still go to the journal first: if that snapshot fails, they are kept
+        self.sync()
+        self._entries = 0
+        storage.submit_io(_truncate, self.path, pending)
+
+
+def _append(path, lines):
+    with open(path, "a") as f:
+        f.write("".join(line + "\n" for line in lines))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _truncate(path, pending):
+    if pending is not None:
+        try:
+            pending.result()  # the snapshot may be written by another worker (SQLite)
+        except Exception as e:
+            print(f"⚠️ {path}: snapshot failed, keeping the journal: {e}")
+            return
+    with open(path, "w") as f:
+        os.fsync(f.fileno())
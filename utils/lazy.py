@@ -0,0 +1,20 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Return a module whose body only runs on first attribute access
+
+    For heavy dependencies such as Pillow: the cog loads without paying for
+    them, and the first command that actually needs one does.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,149 @@
+import asyncio
+from collections import deque
+from config import LOG_FLUSH_INTERVAL, LOG_BACKLOG, LOG_BACKPRESSURE_WAIT
+
+# Discord's per-message limits
+EMBEDS_PER_MESSAGE = 10
+EMBED_CHARS_PER_MESSAGE = 6000
+FIELD_VALUE_LIMIT = 1024
+DESCRIPTION_LIMIT = 4096
+CONTENT_LIMIT = 2000
+
+_dispatcher = None
+
+
+def clip(text, limit):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def fit(embed):
+    """Clip an embed to Discord's limits so it can't get a whole batch rejected"""
+    for i, field in enumerate(embed.fields):
+        if len(field.value) > FIELD_VALUE_LIMIT:
+            embed.set_field_at(i, name=field.name, value=clip(field.value, FIELD_VALUE_LIMIT), inline=field.inline)
+    if embed.description and len(embed.description) > DESCRIPTION_LIMIT:
+        embed.description = clip(embed.description, DESCRIPTION_LIMIT)
+    excess = len(embed) - EMBED_CHARS_PER_MESSAGE
+    # Still too long in total: take it out of the longest field values first
+    for i, field in sorted(enumerate(embed.fields), key=lambda item: -len(item[1].value)):
+        if excess <= 0:
+            break
+        value = clip(field.value, max(len(field.value) - excess, 1))
+        excess -= len(field.value) - len(value)
+        embed.set_field_at(i, name=field.name, value=value, inline=field.inline)
+    if excess > 0 and embed.description:
+        embed.description = clip(embed.description, max(len(embed.description) - excess, 1))
+    return embed
+
+
+class LogDispatcher:
+    """Per-channel queue that coalesces log entries into as few messages as possible
+
+    Entries wait up to `interval` seconds, then go out as messages holding up to
+    10 embeds plus text lines. Each channel's backlog is capped: put() waits up
+    to `wait` seconds for room, then drops the entry and counts it. A batch
+    Discord rejects as malformed is resent entry by entry, so one bad entry
+    only loses itself.
+    """
+
+    def __init__(self, interval=LOG_FLUSH_INTERVAL, backlog=LOG_BACKLOG, wait=LOG_BACKPRESSURE_WAIT):
+        self.interval = interval
+        self.backlog = backlog
+        self.wait = wait
+        self._queues = {}
+        self._channels = {}
+        self._tasks = {}
+        self._space = {}
+        self._wake = asyncio.Event()
+        self.entries = 0
+        self.messages = 0
+        self.dropped = {}
+
+    async def put(self, channel, content=None, embed=None):
+        """Queue a log entry for a channel; returns False if it had to be dropped"""
+        queue = self._queues.setdefault(channel.id, deque())
+        self._channels[channel.id] = channel
+        if len(queue) >= self.backlog:
+            space = self._space.setdefault(channel.id, asyncio.Event())
+            space.clear()
+            try:
+                await asyncio.wait_for(space.wait(), self.wait)
+            except asyncio.TimeoutError:
+                pass
+            if len(queue) >= self.backlog:
+                self.dropped[channel.id] = self.dropped.get(channel.id, 0) + 1
+                return False
+        queue.append((content, fit(embed) if embed is not None else None))
+        task = self._tasks.get(channel.id)
+        if task is None or task.done():
+            self._tasks[channel.id] = asyncio.create_task(self._flusher(channel.id))
+        return True
+
+    def _batch(self, queue):
+        entries, lines, embeds, chars = [], [], 0, 0
+        while queue:
+            content, embed = queue[0]
+            if embed is not None and (embeds == EMBEDS_PER_MESSAGE or chars + len(embed) > EMBED_CHARS_PER_MESSAGE):
+                break
+            if content is not None and lines and len("\n".join(lines + [content])) > CONTENT_LIMIT:
+                break
+            entries.append(queue.popleft())
+            if embed is not None:
+                embeds += 1
+                chars += len(embed)
+            if content is not None:
+                lines.append(content[:CONTENT_LIMIT])
+        return entries
+
+    async def _flusher(self, channel_id):
+        queue = self._queues[channel_id]
+        try:
+            await asyncio.wait_for(self._wake.wait(), self.interval)  # let a burst pile up
+        except asyncio.TimeoutError:
+            pass
+        while queue:
+            entries = self._batch(queue)
+            space = self._space.get(channel_id)
+            if space is not None:
+                space.set()
+            await self._send(channel_id, entries)
+
+    async def _send(self, channel_id, entries, retry=True):
+        content = "\n".join(c[:CONTENT_LIMIT] for c, _ in entries if c is not None) or None
+        embeds = [embed for _, embed in entries if embed is not None]
+        try:
+            await self._channels[channel_id].send(content=content, embeds=embeds)
+            self.messages += 1
+            self.entries += len(entries)
+        except Exception as e:
+            if retry and len(entries) > 1 and getattr(e, "status", None) == 400:
+                print(f"⚠️ Log batch to {channel_id} rejected ({e}), sending its {len(entries)} entries one by one")
+                for entry in entries:
+                    await self._send(channel_id, [entry], retry=False)
+                return
+            self.dropped[channel_id] = self.dropped.get(channel_id, 0) + len(entries)
+            print(f"⚠️ Log delivery to {channel_id} failed: {e}")
+
+    async def flush(self):
+        """Send everything still queued, without waiting for the interval"""
+        self._wake.set()
+        try:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        finally:
+            self._wake.clear()
+
+    def stats(self):
+        return {
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "entries": self.entries,
+            "messages": self.messages,
+            "dropped": sum(self.dropped.values()),
+        }
+
+
+def get_dispatcher():
+    """Return the log dispatcher shared by every logging cog"""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = LogDispatcher()
+    return _dispatcher
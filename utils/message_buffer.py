@@ -0,0 +1,96 @@
+from collections import OrderedDict, deque
+from config import MESSAGE_BUFFER_SIZE, MESSAGE_BUFFER_CHANNELS
+
+
+class Record:
+    __slots__ = ("id", "author_id", "content")
+
+    def __init__(self, message_id, author_id, content):
+        self.id = message_id
+        self.author_id = author_id
+        self.content = content
+
+
+class MessageBuffer:
+    """Ring buffer of the last `size` messages in each of up to `channels` channels
+
+    Keeps a (channel, author) -> latest message index so "last message by X"
+    is a dict lookup instead of a history() scan. Memory is bounded by
+    size * channels records; the least recently active channel goes first.
+    """
+
+    def __init__(self, size=MESSAGE_BUFFER_SIZE, channels=MESSAGE_BUFFER_CHANNELS):
+        self.size = size
+        self.channels = channels
+        self._channels = OrderedDict()
+        self._last = {}
+        self._by_id = {}
+
+    def __contains__(self, channel_id):
+        return channel_id in self._channels
+
+    def add(self, channel_id, message_id, author_id, content):
+        ring = self._channels.get(channel_id)
+        if ring is None:
+            ring = self._channels[channel_id] = deque()
+            while len(self._channels) > self.channels:
+                self._drop_channel(*self._channels.popitem(last=False))
+        else:
+            self._channels.move_to_end(channel_id)
+        if len(ring) >= self.size:
+            self._forget(channel_id, ring.popleft())
+        record = Record(message_id, author_id, content)
+        ring.append(record)
+        self._by_id[message_id] = (channel_id, record)
+        self._last[(channel_id, author_id)] = record
+
+    def seed(self, channel_id, messages):
+        """Replace a channel's buffer with fetched messages, given newest first as history() yields them"""
+        ring = self._channels.pop(channel_id, None)
+        if ring is not None:
+            self._drop_channel(channel_id, ring)
+        for message in reversed(messages):
+            self.add_message(message)
+
+    def add_message(self, message):
+        self.add(message.channel.id, message.id, message.author.id, message.content)
+
+    def edit(self, message_id, content):
+        entry = self._by_id.get(message_id)
+        if entry is not None:
+            entry[1].content = content
+
+    def delete(self, message_id):
+        entry = self._by_id.get(message_id)
+        if entry is None:
+            return
+        channel_id, record = entry
+        ring = self._channels[channel_id]
+        ring.remove(record)
+        self._forget(channel_id, record)
+        # The author's previous message, if still buffered, becomes their latest
+        for older in reversed(ring):
+            if older.author_id == record.author_id:
+                self._last.setdefault((channel_id, record.author_id), older)
+                break
+
+    def last(self, channel_id, author_id=None):
+        """Latest buffered message in a channel, optionally by one author"""
+        if author_id is not None:
+            return self._last.get((channel_id, author_id))
+        ring = self._channels.get(channel_id)
+        return ring[-1] if ring else None
+
+    def recent(self, channel_id, n):
+        """Up to n latest buffered messages in a channel, oldest first"""
+        ring = self._channels.get(channel_id, ())
+        return list(ring)[-n:] if n else []
+
+    def _forget(self, channel_id, record):
+        self._by_id.pop(record.id, None)
+        if self._last.get((channel_id, record.author_id)) is record:
+            del self._last[(channel_id, record.author_id)]
+
+    def _drop_channel(self, channel_id, ring):
+        for record in ring:
+            self._forget(channel_id, record)
@@ -0,0 +1,128 @@
+import functools
+import time
+from bisect import bisect_left
+from discord import app_commands
+from utils import storage
+
+# Upper bounds in seconds; anything slower lands in the implicit +Inf bucket
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_metrics = None
+
+
+class Histogram:
+    """Call count, error count and latency distribution for one handler"""
+
+    __slots__ = ("counts", "count", "errors", "total")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def merge(self, other):
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.errors += other.errors
+        self.total += other.total
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (inf if past the last bucket)"""
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """Histograms keyed by (kind, cog, name), where kind is "command" or "listener" """
+
+    def __init__(self):
+        self.series = {}
+
+    def histogram(self, kind, cog, name):
+        key = (kind, cog, name)
+        histogram = self.series.get(key)
+        if histogram is None:
+            histogram = self.series[key] = Histogram()
+        return histogram
+
+    def by_cog(self):
+        cogs = {}
+        for (kind, cog, name), histogram in self.series.items():
+            cogs.setdefault(cog, Histogram()).merge(histogram)
+        return cogs
+
+    def openmetrics(self):
+        """Render every series in the OpenMetrics text format"""
+        lines = [
+            "# TYPE bot_handler_duration_seconds histogram",
+            "# UNIT bot_handler_duration_seconds seconds",
+            "# HELP bot_handler_duration_seconds Time spent in slash command callbacks and event listeners.",
+        ]
+        errors = [
+            "# TYPE bot_handler_errors counter",
+            "# HELP bot_handler_errors Handler calls that raised.",
+        ]
+        for (kind, cog, name), histogram in sorted(self.series.items()):
+            if not histogram.count:
+                continue
+            labels = f'kind="{kind}",cog="{cog}",name="{name}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS + ("+Inf",), histogram.counts):
+                cumulative += n
+                lines.append(f'bot_handler_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"bot_handler_duration_seconds_count{{{labels}}} {histogram.count}")
+            lines.append(f"bot_handler_duration_seconds_sum{{{labels}}} {histogram.total:.6f}")
+            errors.append(f"bot_handler_errors_total{{{labels}}} {histogram.errors}")
+        return "\n".join(lines + errors + ["# EOF", ""])
+
+    def dump(self, path):
+        """Write the OpenMetrics text to a file on the storage I/O thread"""
+        return storage.write_text(path, self.openmetrics())
+
+
+def _timed(func, histogram):
+    @functools.wraps(func)
+    async def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            histogram.errors += 1
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    return timed
+
+
+def instrument(cog):
+    """Time every slash command callback and listener of a cog; call before the cog is added"""
+    metrics = get_metrics()
+    cog_name = cog.qualified_name
+    for command in cog.walk_app_commands():
+        if isinstance(command, app_commands.Command):
+            histogram = metrics.histogram("command", cog_name, command.qualified_name)
+            command._callback = _timed(command._callback, histogram)
+    # Instance attributes shadow the methods, so add_cog and remove_cog both see the wrapper
+    for _, method_name in cog.__cog_listeners__:
+        histogram = metrics.histogram("listener", cog_name, method_name)
+        setattr(cog, method_name, _timed(getattr(cog, method_name), histogram))
+
+
+def get_metrics():
+    """Return the metrics registry shared by the bot and every cog"""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from config import OUTBOUND_GLOBAL_RATE, OUTBOUND_DEADLINE, OUTBOUND_PROGRESS_INTERVAL
+
+# (requests, seconds) per route kind. Discord only reveals its buckets through
+# response headers, so these are conservative guesses that keep bulk actions
+# from piling into a 429; discord.py still retries anything that slips through.
+ROUTE_LIMITS = {
+    "member": (10, 10.0),      # PATCH /guilds/{guild}/members/{user}: mute, move
+    "kick": (5, 5.0),          # DELETE /guilds/{guild}/members/{user}
+    "ban": (5, 5.0),           # PUT /guilds/{guild}/bans/{user}
+    "permissions": (5, 5.0),   # PUT /channels/{channel}/permissions/{target}
+}
+DEFAULT_LIMIT = (5, 5.0)
+RETRIES = 3
+# An interaction's token (and so its original response) can be edited for 15 minutes;
+# bulk runs stop this many seconds short of that to leave room for the summary
+TOKEN_LIFETIME = 15 * 60
+TOKEN_MARGIN = 30
+
+_outbound = None
+
+
+class Bucket:
+    """Token bucket: `rate` requests per `per` seconds, waiters served in order"""
+
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now > self.updated:
+                    self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+                    self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep(max(self.updated - now, 0) + (1 - self.tokens) * self.per / self.rate)
+
+    def hold(self, seconds):
+        """Empty the bucket and refill nothing for `seconds` (after a 429)"""
+        self.tokens = 0
+        self.updated = max(self.updated, time.monotonic() + seconds)
+
+
+class Outbound:
+    """Paces REST calls per route so independent routes run side by side"""
+
+    def __init__(self, global_rate=OUTBOUND_GLOBAL_RATE, limits=ROUTE_LIMITS):
+        self.limits = limits
+        self._global = Bucket(global_rate, 1.0)
+        self._buckets = {}
+
+    def bucket(self, route):
+        """Bucket for a route such as ("member", guild_id); the id is Discord's major parameter"""
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            bucket = self._buckets[route] = Bucket(*self.limits.get(route[0], DEFAULT_LIMIT))
+        return bucket
+
+    async def call(self, route, fn):
+        """Await fn() once its route and the global bucket allow it"""
+        bucket = self.bucket(route)
+        for attempt in range(RETRIES):
+            await bucket.acquire()
+            await self._global.acquire()
+            try:
+                return await fn()
+            except Exception as e:
+                if getattr(e, "status", None) != 429 or attempt == RETRIES - 1:
+                    raise
+                bucket.hold(getattr(e, "retry_after", None) or bucket.per)
+
+    def pacing(self, routes):
+        """Seconds the route and global limits alone need to let all `routes` through"""
+        needed = len(routes) / self._global.rate * self._global.per
+        for route, count in Counter(routes).items():
+            bucket = self.bucket(route)
+            needed = max(needed, max(count - bucket.rate, 0) * bucket.per / bucket.rate)
+        return needed
+
+    async def run(self, jobs, progress=None, deadline=OUTBOUND_DEADLINE, limit=None):
+        """Run (route, fn) jobs concurrently; returns (done, failed, skipped)
+
+        `progress(done, failed, total)` is awaited every few seconds. Jobs still
+        running `deadline` seconds after the pacing alone would have finished
+        them are cancelled and counted as skipped, so long lists get longer.
+        `limit` caps the whole run in seconds, e.g. at token_time_left().
+        """
+        jobs = list(jobs)
+        pending = {asyncio.create_task(self.call(route, fn)) for route, fn in jobs}
+        total = len(pending)
+        end = time.monotonic() + self.pacing([route for route, _ in jobs]) + deadline
+        if limit is not None:
+            end = min(end, time.monotonic() + limit)
+        done = failed = 0
+        while pending:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            finished, pending = await asyncio.wait(pending, timeout=min(OUTBOUND_PROGRESS_INTERVAL, remaining))
+            for task in finished:
+                if task.exception() is None:
+                    done += 1
+                else:
+                    failed += 1
+                    print(f"⚠️ Bulk action failed: {task.exception()}")
+            if progress and pending:
+                try:
+                    await progress(done, failed, total)
+                except Exception as e:
+                    print(f"⚠️ Progress update failed: {e}")
+        for task in pending:
+            task.cancel()
+        return done, failed, len(pending)
+
+
+def token_time_left(interaction):
+    """Seconds a bulk run may take while the interaction's response can still be edited"""
+    elapsed = (datetime.now(timezone.utc) - interaction.created_at).total_seconds()
+    return TOKEN_LIFETIME - TOKEN_MARGIN - elapsed
+
+
+async def finish(interaction, text):
+    """Put the final summary on the original response, or in the channel if that can't be edited"""
+    try:
+        await interaction.edit_original_response(content=text)
+    except Exception as e:
+        print(f"⚠️ Couldn't edit the bulk action response ({e}), posting the summary instead")
+        try:
+            await interaction.channel.send(text)
+        except Exception as e:
+            print(f"⚠️ Couldn't post the bulk action summary: {e}")
+
+
+def edit_progress(interaction, label):
+    """Progress callback that edits the interaction's original response"""
+    async def report(done, failed, total):
+        await interaction.edit_original_response(content=f"⏳ {label}: {done + failed}/{total}")
+    return report
+
+
+def summary(label, done, failed, skipped):
+    """One-line result for a bulk action"""
+    text = f"{label}: {done} done"
+    if failed:
+        text += f", {failed} failed"
+    if skipped:
+        text += f", {skipped} skipped (took too long)"
+    return text
+
+
+def get_outbound():
+    """Return the outbound scheduler shared by every cog"""
+    global _outbound
+    if _outbound is None:
+        _outbound = Outbound()
+    return _outbound
@@ -0,0 +1,118 @@
+import random
+
+MAX_LEVEL = 32
+
+
+class _Node:
+    __slots__ = ("score", "key", "next", "width")
+
+    def __init__(self, score, key, level):
+        self.score = score
+        self.key = key
+        self.next = [None] * level
+        self.width = [1] * level
+
+
+class RankIndex:
+    """Indexable skip list ordered by score (highest first), ties broken by key
+
+    top(k) walks k nodes and rank(key) is O(log n); update() moves one key.
+    """
+
+    def __init__(self, items=()):
+        self._head = _Node(None, None, MAX_LEVEL)
+        self._level = 1
+        self._scores = {}
+        for key, score in items:
+            self.update(key, score)
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __contains__(self, key):
+        return key in self._scores
+
+    @staticmethod
+    def _before(node, score, key):
+        # True if node sorts ahead of (score, key)
+        return node.score > score or (node.score == score and node.key < key)
+
+    def _path(self, score, key):
+        # Rightmost node ahead of (score, key) on each level, and its 0-based position
+        update = [self._head] * MAX_LEVEL
+        pos = [0] * MAX_LEVEL
+        node, rank = self._head, 0
+        for lvl in range(self._level - 1, -1, -1):
+            while node.next[lvl] is not None and self._before(node.next[lvl], score, key):
+                rank += node.width[lvl]
+                node = node.next[lvl]
+            update[lvl] = node
+            pos[lvl] = rank
+        return update, pos
+
+    def _insert(self, key, score):
+        update, pos = self._path(score, key)
+        level = 1
+        while level < MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        if level > self._level:
+            for lvl in range(self._level, level):
+                update[lvl] = self._head
+                pos[lvl] = 0
+                self._head.width[lvl] = len(self._scores) + 1
+            self._level = level
+        node = _Node(score, key, level)
+        rank = pos[0] + 1  # 1-based position of the new node
+        for lvl in range(level):
+            prev = update[lvl]
+            node.next[lvl] = prev.next[lvl]
+            prev.next[lvl] = node
+            node.width[lvl] = prev.width[lvl] - (rank - 1 - pos[lvl])
+            prev.width[lvl] = rank - pos[lvl]
+        for lvl in range(level, self._level):
+            update[lvl].width[lvl] += 1
+        self._scores[key] = score
+
+    def _remove(self, key):
+        score = self._scores.pop(key)
+        update, _ = self._path(score, key)
+        target = update[0].next[0]
+        for lvl in range(self._level):
+            prev = update[lvl]
+            if prev.next[lvl] is target:
+                prev.width[lvl] += target.width[lvl] - 1
+                prev.next[lvl] = target.next[lvl]
+            else:
+                prev.width[lvl] -= 1
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+
+    def update(self, key, score):
+        """Insert key or move it to its new score"""
+        old = self._scores.get(key)
+        if old is not None:
+            if old == score:
+                return
+            self._remove(key)
+        self._insert(key, score)
+
+    def discard(self, key):
+        if key in self._scores:
+            self._remove(key)
+
+    def rank(self, key):
+        """1-based position of key, or None if it is not indexed"""
+        score = self._scores.get(key)
+        if score is None:
+            return None
+        _, pos = self._path(score, key)
+        return pos[0] + 1
+
+    def top(self, k):
+        """The k highest (key, score) pairs"""
+        result = []
+        node = self._head.next[0]
+        while node is not None and len(result) < k:
+            result.append((node.key, node.score))
+            node = node.next[0]
+        return result
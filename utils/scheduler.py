@@ -0,0 +1,140 @@
+import asyncio
+import heapq
+import time
+import uuid
+from datetime import datetime, timezone
+from utils import storage
+
+TIMERS_FILE = "timers.json"
+
+_scheduler = None
+
+
+def timestamp(when):
+    """Unix time for a datetime; naive datetimes are taken as UTC like the rest of the bot"""
+    if isinstance(when, datetime):
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return when.timestamp()
+    return float(when)
+
+
+class Scheduler:
+    """Persistent min-heap of timers shared by every cog
+
+    Timers are stored as {timer_id: {"kind", "due", "payload"}} and fire the
+    callback registered for their kind. The runner sleeps until the earliest
+    due time, so idle timers cost nothing. A timer is only deleted once its
+    callback has finished, so one cut short by a crash fires again on restart.
+    """
+
+    def __init__(self, path=TIMERS_FILE):
+        self.timers = storage.open_store(path)
+        self._heap = [(t["due"], timer_id) for timer_id, t in self.timers.items()]
+        heapq.heapify(self._heap)
+        self._handlers = {}
+        self._wakeup = None
+        self._task = None
+        self._firing = {}  # timer_id: timer whose callback is running
+        self._fires = set()  # keeps the callback tasks referenced until they finish
+
+    # --------------------
+    # Cog API
+    # --------------------
+    def register(self, kind, callback):
+        """Fire `await callback(payload)` for due timers of this kind"""
+        self._handlers[kind] = callback
+        # Timers that came due while nobody handled them go back on the heap
+        for timer_id, t in self.timers.items():
+            if t["kind"] == kind:
+                heapq.heappush(self._heap, (t["due"], timer_id))
+        self._wake()
+
+    def unregister(self, kind):
+        self._handlers.pop(kind, None)
+
+    def schedule(self, kind, when, payload=None, timer_id=None):
+        """Add a timer, or move an existing one when timer_id is reused; returns the id"""
+        timer_id = timer_id or uuid.uuid4().hex
+        due = timestamp(when)
+        self.timers[timer_id] = {"kind": kind, "due": due, "payload": payload or {}}
+        heapq.heappush(self._heap, (due, timer_id))
+        self._wake()
+        return timer_id
+
+    def cancel(self, timer_id):
+        # The heap entry is skipped lazily when it comes up
+        if timer_id in self.timers:
+            del self.timers[timer_id]
+
+    def has(self, timer_id):
+        return timer_id in self.timers
+
+    # --------------------
+    # Runner
+    # --------------------
+    def _wake(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # started by the first call made from inside the bot
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        self._wakeup.set()
+
+    def _next_due(self):
+        # Drop cancelled, moved and unhandled entries from the top of the heap
+        while self._heap:
+            due, timer_id = self._heap[0]
+            t = self.timers.get(timer_id)
+            if t is not None and t["due"] == due and t["kind"] in self._handlers and self._firing.get(timer_id) is not t:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            due = self._next_due()
+            if due is None:
+                await self._wakeup.wait()
+                continue
+            delay = due - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, timer_id = heapq.heappop(self._heap)
+            t = self._firing[timer_id] = self.timers[timer_id]
+            task = asyncio.create_task(self._fire(timer_id, t))
+            self._fires.add(task)
+            task.add_done_callback(self._fires.discard)
+
+    async def _fire(self, timer_id, t):
+        try:
+            await self._handlers[t["kind"]](t["payload"])
+        except Exception as e:
+            print(f"⚠️ Timer {t['kind']} {timer_id} failed: {e}")
+        finally:
+            if self._firing.get(timer_id) is t:
+                del self._firing[timer_id]
+            # Unless the callback rescheduled or cancelled it, the timer is done
+            if self.timers.get(timer_id) is t:
+                del self.timers[timer_id]
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+def get_scheduler():
+    """Return the bot-wide scheduler, loading persisted timers on first use"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+    return _scheduler
@@ -0,0 +1,62 @@
+# Table layouts for the data files the SQLite backend can hold.
+# Files without an entry here always stay on the JSON backend.
+
+
+class Table:
+    """Column layout and ranking scores for one data file"""
+
+    def __init__(self, name, keys, columns, scores=None):
+        self.name = name
+        self.keys = keys        # ("user_id",) or ("guild_id", "user_id")
+        self.columns = columns  # column: default value for new records
+        self.scores = scores or {}  # score: (SQL expressions, Python sort key)
+
+    @property
+    def grouped(self):
+        return len(self.keys) > 1
+
+    def sort_key(self, score):
+        return self.scores[score][1]
+
+    def score_sql(self, score):
+        return self.scores[score][0]
+
+
+ECONOMY = Table(
+    "economy",
+    keys=("user_id",),
+    columns={"wallet": 100, "bank": 0, "inventory": [], "last_daily": None, "last_work": None},
+    scores={"total": (("wallet + bank",), lambda r: r["wallet"] + r["bank"])},
+)
+
+LEVELING = Table(
+    "leveling",
+    keys=("user_id",),
+    columns={"xp": 0, "level": 1},
+    scores={
+        "xp": (("xp",), lambda r: r["xp"]),
+        "level": (("level",), lambda r: r["level"]),
+        "all": (("level", "xp"), lambda r: (r["level"], r["xp"])),
+    },
+)
+
+VOICE = Table(
+    "voice",
+    keys=("guild_id", "user_id"),
+    columns={"voice_time": 0, "voice_seconds": 0},
+    scores={"voice_time": (("voice_time",), lambda r: r.get("voice_time", 0))},
+)
+
+SOCIAL = Table(
+    "social",
+    keys=("guild_id", "user_id"),
+    columns={"interactions": 0},
+    scores={"interactions": (("interactions",), lambda r: r.get("interactions", 0))},
+)
+
+TABLES = {
+    "economy.json": ECONOMY,
+    "leveling.json": LEVELING,
+    "voice_data.json": VOICE,
+    "social_data.json": SOCIAL,
+}
@@ -0,0 +1,420 @@
+import asyncio
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Clean records kept in memory per table; dirty records are never evicted
+CACHE_SIZE = 10000
+
+_databases = {}
+
+
+class Database:
+    """One SQLite connection (WAL mode) owned by a dedicated worker thread"""
+
+    def __init__(self, path):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._conn = None
+        self.submit(self._connect).result()
+
+    def _connect(self, _):
+        # Only ever touched from the worker thread
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def submit(self, fn, *args):
+        try:
+            return self._executor.submit(lambda: fn(self._conn, *args))
+        except RuntimeError:
+            # Interpreter shutdown has already stopped the worker: run inline
+            done = Future()
+            done.set_result(fn(self._conn, *args))
+            return done
+
+    def call(self, fn, *args):
+        return self.submit(fn, *args).result()
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+
+def open_database(path):
+    db = _databases.get(path)
+    if db is None:
+        db = _databases[path] = Database(path)
+    return db
+
+
+class _Group(MutableMapping):
+    """Per-guild view of a table keyed by (guild_id, user_id)"""
+
+    def __init__(self, store, prefix):
+        self._store = store
+        self._prefix = prefix
+
+    def __getitem__(self, key):
+        return self._store._get(self._prefix + (key,))
+
+    def __setitem__(self, key, value):
+        self._store._set(self._prefix + (key,), value)
+
+    def __delitem__(self, key):
+        self._store._delete(self._prefix + (key,))
+
+    def __contains__(self, key):
+        return self._store._has(self._prefix + (key,))
+
+    def __iter__(self):
+        return iter(self._store._keys(self._prefix))
+
+    def __len__(self):
+        return len(self._store._keys(self._prefix))
+
+
+class SQLiteStore(MutableMapping):
+    """Dict-like view of one SQLite table; rows load on demand and dirty rows are written back on flush
+
+    A record missing from the cache is read synchronously, which blocks the
+    event loop for one query. Hot paths await load() first so the read happens
+    on the worker thread instead.
+    """
+
+    # Called with the write future (or None) after every flush, e.g. to compact a journal
+    after_flush = None
+
+    def __init__(self, db_path, table, json_path=None, flush_interval=5, cache_size=CACHE_SIZE):
+        self.table = table
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+        self._db = open_database(db_path)
+        self._cache = OrderedDict()  # key tuple: record
+        self._dirty = set()
+        self._deleted = set()  # key tuples or guild prefixes pending deletion
+        self._missing = set()  # key tuples known to have no row
+        self._key_sets = {}  # prefix: set of keys one level below it, built by _keys()
+        self._handle = None
+        self._json_columns = [c for c, d in table.columns.items() if isinstance(d, (list, dict))]
+        self._column_list = ", ".join(list(table.keys) + list(table.columns))
+        empty = self._db.call(self._create_table)
+        if empty and json_path and os.path.exists(json_path):
+            self._import_json(json_path)
+
+    # --------------------
+    # Schema and migration
+    # --------------------
+    def _create_table(self, conn):
+        t = self.table
+        types = {col: "INTEGER" if isinstance(default, int) else "TEXT" for col, default in t.columns.items()}
+        cols = [f"{k} TEXT NOT NULL" for k in t.keys]
+        cols += [f"{col} {sql_type}" for col, sql_type in types.items()]
+        cols.append(f"PRIMARY KEY ({', '.join(t.keys)})")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {t.name} ({', '.join(cols)})")
+        # Columns added to the schema after the table was created
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({t.name})")}
+        for col, sql_type in types.items():
+            if col not in existing:
+                conn.execute(f"ALTER TABLE {t.name} ADD COLUMN {col} {sql_type}")
+        for score, (exprs, _) in t.scores.items():
+            order = [f"{e} DESC" for e in exprs]
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {t.name}_{score} ON {t.name} ({', '.join(list(t.keys[:-1]) + order)})"
+            )
+        conn.commit()
+        return conn.execute(f"SELECT 1 FROM {t.name} LIMIT 1").fetchone() is None
+
+    def _import_json(self, json_path):
+        # One-off migration from the legacy flat JSON file
+        with open(json_path, "r") as f:
+            data = json.load(f)
+        if self.table.grouped:
+            rows = [self._encode((g, u), rec) for g, users in data.items() for u, rec in users.items()]
+        else:
+            rows = [self._encode((k,), rec) for k, rec in data.items()]
+        self._db.call(self._write, rows, [])
+
+    def _encode(self, key, record):
+        row = list(key)
+        for col, default in self.table.columns.items():
+            value = record.get(col, default)
+            row.append(json.dumps(value) if col in self._json_columns else value)
+        return row
+
+    def _decode(self, row):
+        n = len(self.table.keys)
+        record = dict(zip(self.table.columns, row[n:]))
+        for col in self._json_columns:
+            if record[col] is not None:
+                record[col] = json.loads(record[col])
+        return tuple(row[:n]), record
+
+    # --------------------
+    # Worker-thread queries
+    # --------------------
+    def _where(self, key):
+        return " AND ".join(f"{k} = ?" for k in self.table.keys[:len(key)])
+
+    def _write(self, conn, rows, deleted, checkpoint=False):
+        t = self.table
+        for key in deleted:
+            conn.execute(f"DELETE FROM {t.name} WHERE {self._where(key)}", key)
+        if rows:
+            marks = ", ".join("?" * (len(t.keys) + len(t.columns)))
+            conn.executemany(f"INSERT OR REPLACE INTO {t.name} ({self._column_list}) VALUES ({marks})", rows)
+        conn.commit()
+        if checkpoint:
+            # synchronous=NORMAL leaves WAL commits unsynced; a checkpoint fsyncs the
+            # WAL and then the database, covering every commit made so far
+            conn.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def _select(self, conn, key):
+        sql = f"SELECT {self._column_list} FROM {self.table.name} WHERE {self._where(key)}"
+        return conn.execute(sql, key).fetchone()
+
+    def _select_many(self, conn, keys):
+        return [row for row in (self._select(conn, key) for key in keys) if row is not None]
+
+    def _select_exists(self, conn, key):
+        sql = f"SELECT 1 FROM {self.table.name} WHERE {self._where(key)} LIMIT 1"
+        return conn.execute(sql, key).fetchone() is not None
+
+    def _select_keys(self, conn, prefix):
+        col = self.table.keys[len(prefix)]
+        sql = f"SELECT DISTINCT {col} FROM {self.table.name}"
+        if prefix:
+            sql += f" WHERE {self._where(prefix)}"
+        return [r[0] for r in conn.execute(sql, prefix)]
+
+    def _select_top(self, conn, score, n, prefix):
+        order = ", ".join(f"{e} DESC" for e in self.table.score_sql(score))
+        where = f"WHERE {self._where(prefix)} " if prefix else ""
+        sql = f"SELECT {self._column_list} FROM {self.table.name} {where}ORDER BY {order} LIMIT ?"
+        return conn.execute(sql, prefix + (n,)).fetchall()
+
+    def _select_rank(self, conn, score, key):
+        exprs = ", ".join(self.table.score_sql(score))
+        mine = conn.execute(f"SELECT {exprs} FROM {self.table.name} WHERE {self._where(key)}", key).fetchone()
+        if mine is None:
+            return None
+        where = f"{self._where(key[:-1])} AND " if len(key) > 1 else ""
+        sql = f"SELECT COUNT(*) + 1 FROM {self.table.name} WHERE {where}({exprs}) > ({', '.join('?' * len(mine))})"
+        return conn.execute(sql, key[:-1] + tuple(mine)).fetchone()[0]
+
+    # --------------------
+    # Record cache
+    # --------------------
+    def _is_deleted(self, key):
+        return any(key[:i] in self._deleted for i in range(1, len(key) + 1))
+
+    def _get(self, key):
+        record = self._cache.get(key)
+        if record is not None:
+            self._cache.move_to_end(key)
+            return record
+        if key in self._missing or self._is_deleted(key):
+            raise KeyError(key[-1])
+        row = self._db.call(self._select, key)
+        if row is None:
+            self._remember_missing(key)
+            raise KeyError(key[-1])
+        _, record = self._decode(row)
+        self._cache[key] = record
+        return record
+
+    def _has(self, key):
+        # Membership without loading the record: cache, key sets, then SELECT 1
+        if key in self._cache:
+            return True
+        known = self._key_sets.get(key[:-1])
+        if known is not None:
+            return key[-1] in known
+        if key in self._missing:
+            return False
+        if len(key) < len(self.table.keys):
+            if any(k[:len(key)] == key for k in self._cache):
+                return True
+            if any(d[:len(key)] == key for d in self._deleted):
+                self._write_back()  # queued ahead of the query below on the same worker
+        elif self._is_deleted(key):
+            return False
+        found = self._db.call(self._select_exists, key)
+        if not found:
+            self._remember_missing(key)
+        return found
+
+    def _remember_missing(self, key):
+        if len(self._missing) >= self.cache_size:
+            self._missing.clear()
+        self._missing.add(key)
+
+    async def load(self, *keys):
+        """Read the given records (keys, or (guild, user) tuples) into the cache on the worker thread"""
+        keys = [key if isinstance(key, tuple) else (key,) for key in keys]
+        wanted = [k for k in keys if k not in self._cache and k not in self._missing and not self._is_deleted(k)]
+        if not wanted:
+            return
+        rows = await self._db.run(self._select_many, wanted)
+        found = dict(self._decode(row) for row in rows)
+        for key in wanted:
+            if key in self._cache or self._is_deleted(key):
+                continue  # written or deleted while the query ran
+            if key in found:
+                self._cache[key] = found[key]
+            else:
+                self._remember_missing(key)
+
+    def _set(self, key, record):
+        self._cache[key] = record
+        self._cache.move_to_end(key)
+        self._dirty.add(key)
+        for i in range(len(key)):
+            self._missing.discard(key[:i + 1])
+            known = self._key_sets.get(key[:i])
+            if known is not None:
+                known.add(key[i])
+        self._schedule_flush()
+
+    def _delete(self, key):
+        if not self._has(key):
+            raise KeyError(key[-1])
+        for cached in [k for k in self._cache if k[:len(key)] == key]:
+            del self._cache[cached]
+            self._dirty.discard(cached)
+        self._deleted.add(key)
+        for prefix in [p for p in self._key_sets if p[:len(key)] == key]:
+            del self._key_sets[prefix]
+        known = self._key_sets.get(key[:-1])
+        if known is not None:
+            known.discard(key[-1])
+            if not known and len(key) > 1:
+                self._key_sets.get(key[:-2], set()).discard(key[-2])
+        elif len(key) > 1:
+            # The parent may have lost its last record; recount it when next asked
+            self._key_sets.pop(key[:-2], None)
+        self._schedule_flush()
+
+    def _keys(self, prefix):
+        known = self._key_sets.get(prefix)
+        if known is None:
+            self._write_back()  # queued ahead of the query, so the database is current
+            known = self._key_sets[prefix] = set(self._db.call(self._select_keys, prefix))
+        return list(known)
+
+    # --------------------
+    # Mapping interface
+    # --------------------
+    def __getitem__(self, key):
+        if self.table.grouped:
+            return _Group(self, (key,))
+        return self._get((key,))
+
+    def __setitem__(self, key, value):
+        if not self.table.grouped:
+            self._set((key,), value)
+            return
+        if key in self:
+            self._delete((key,))
+        for user_id, record in value.items():
+            self._set((key, user_id), record)
+
+    def __delitem__(self, key):
+        if self.table.grouped and key not in self:
+            raise KeyError(key)
+        self._delete((key,))
+
+    def __contains__(self, key):
+        if not self.table.grouped:
+            try:
+                self._get((key,))
+            except KeyError:
+                return False
+            return True
+        return self._has((key,))
+
+    def __iter__(self):
+        return iter(self._keys(()))
+
+    def __len__(self):
+        return len(self._keys(()))
+
+    def __repr__(self):
+        return f"<SQLiteStore {self.table.name!r} cached={len(self._cache)}>"
+
+    # --------------------
+    # Persistence
+    # --------------------
+    def mark_dirty(self, *keys):
+        """Schedule cached records under the given top-level keys (or all of them) for the next flush"""
+        if not keys:
+            self._dirty.update(self._cache)
+        else:
+            wanted = set(keys)
+            self._dirty.update(k for k in self._cache if k[0] in wanted)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        self._handle = loop.call_later(self.flush_interval, self.flush)
+
+    def _evict(self):
+        excess = len(self._cache) - self.cache_size
+        for key in list(self._cache):
+            if excess <= 0:
+                break
+            if key not in self._dirty:
+                del self._cache[key]
+                excess -= 1
+
+    def _write_back(self, checkpoint=False):
+        # Queries call this directly so they see pending changes without
+        # counting as a flush: after_flush (journal compaction) doesn't run
+        rows = [self._encode(key, self._cache[key]) for key in self._dirty if key in self._cache]
+        deleted = list(self._deleted)
+        self._dirty.clear()
+        self._deleted.clear()
+        self._evict()
+        if rows or deleted or checkpoint:
+            return self._db.submit(self._write, rows, deleted, checkpoint)
+        return None
+
+    def flush(self):
+        """Hand pending writes to the worker thread; returns its future, or None if nothing was pending"""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        # A listener such as the journal discards its own copy next, so the
+        # write it waits on must be durable, not just committed to the WAL
+        pending = self._write_back(checkpoint=self.after_flush is not None)
+        if self.after_flush is not None:
+            self.after_flush(pending)
+        return pending
+
+    # --------------------
+    # Indexed queries
+    # --------------------
+    async def top(self, score, n=10, group=None):
+        """Highest n records by score as (key, record) pairs, optionally within one guild"""
+        self._write_back()
+        prefix = (group,) if group is not None else ()
+        rows = await self._db.run(self._select_top, score, n, prefix)
+        result = []
+        for row in rows:
+            key, record = self._decode(row)
+            result.append((key[-1], self._cache.get(key, record)))
+        return result
+
+    async def rank(self, score, key, group=None):
+        """1-based position of key by score, or None if it has no record"""
+        self._write_back()
+        full_key = (group, key) if group is not None else (key,)
+        return await self._db.run(self._select_rank, score, full_key)
@@ -0,0 +1,268 @@
+import asyncio
+import atexit
+import copy
+import json
+import os
+from collections.abc import MutableMapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from config import STORAGE_BACKEND, DATABASE_FILE
+from utils.ranking import RankIndex
+from utils.schemas import TABLES
+from utils.sqlite_store import SQLiteStore
+
+# Seconds between a mutation and the coalesced write that persists it
+FLUSH_INTERVAL = 5
+
+_stores = {}
+_preloaded = {}  # path: parsed JSON read ahead of open_store by preload()
+
+# All JSON file writes happen here, in submission order, never on the event loop
+_io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage-io")
+
+
+def _encode(key, value):
+    # Same layout json.dump(..., indent=4) produces for one top-level entry
+    return f"    {json.dumps(str(key))}: " + json.dumps(value, indent=4).replace("\n", "\n    ")
+
+
+class JSONStore(MutableMapping):
+    """Dict-like JSON file with per-key dirty tracking, coalesced flushes and atomic writes"""
+
+    # Called with the write future (or None) after every flush, e.g. to compact a journal
+    after_flush = None
+
+    def __init__(self, path, default=None, flush_interval=FLUSH_INTERVAL, table=None):
+        self.path = path
+        self.table = table
+        self.flush_interval = flush_interval
+        self._data = self._load(default)
+        self._fragments = {}  # key: serialized entry from the last flush
+        self._raw = {}  # key: compact JSON captured for a write that hasn't encoded it yet
+        self._writing = None  # future of the last write, returns the fragments it encoded
+        self._dirty = set()
+        self._changed = False
+        self._handle = None
+        self._indexes = {}  # (score, guild or None): RankIndex, built on first query
+
+    def _load(self, default):
+        if self.path in _preloaded:
+            return _preloaded.pop(self.path)
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                return json.load(f)
+        return copy.deepcopy(default) if default is not None else {}
+
+    # --------------------
+    # Mapping interface
+    # --------------------
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self.mark_dirty(key)
+
+    def __delitem__(self, key):
+        del self._data[key]
+        self._fragments.pop(key, None)
+        self._raw.pop(key, None)
+        self._dirty.discard(key)
+        self._reindex(key)
+        self._changed = True
+        self._schedule_flush()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"<JSONStore {self.path!r} keys={len(self._data)}>"
+
+    async def load(self, *keys):
+        """Nothing to read: every record is already in memory (SQLiteStore fetches them here)"""
+
+    # --------------------
+    # Persistence
+    # --------------------
+    def mark_dirty(self, *keys):
+        """Schedule the given top-level keys (or every key when none given) for the next flush"""
+        if keys:
+            self._dirty.update(keys)
+            if self._indexes:
+                for key in keys:
+                    self._reindex(key)
+        else:
+            self._fragments.clear()
+            self._raw.clear()
+            self._indexes.clear()
+        self._changed = True
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, shutdown): write straight away
+            self.flush()
+            return
+        self._handle = loop.call_later(self.flush_interval, self.flush)
+
+    def _snapshot(self):
+        # Dirty entries are only copied here, as compact JSON (C encoder); the
+        # indented fragments are built on the I/O thread and picked up next time
+        if self._writing is not None and self._writing.done() and self._writing.exception() is None:
+            for key, (raw, fragment) in self._writing.result().items():
+                if self._raw.get(key) is raw:
+                    del self._raw[key]
+                    self._fragments[key] = fragment
+        self._writing = None
+        for key in self._dirty:
+            self._fragments.pop(key, None)
+            self._raw.pop(key, None)
+        self._dirty.clear()
+        entries = []
+        for key, value in self._data.items():
+            fragment = self._fragments.get(key)
+            if fragment is None:
+                raw = self._raw.get(key)
+                if raw is None:
+                    raw = self._raw[key] = json.dumps(value)
+                fragment = (key, raw)
+            entries.append(fragment)
+        return entries
+
+    def flush(self):
+        """Queue pending changes for the I/O thread; returns the write future, or None if nothing was pending"""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._writing is not None and self._writing.done() and self._writing.exception() is not None:
+            # The last write failed (disk full...): everything it carried is still unsaved
+            print(f"⚠️ Writing {self.path} failed, retrying: {self._writing.exception()}")
+            self._changed = True
+        pending = None
+        if self._changed:
+            self._changed = False
+            pending = self._writing = submit_io(_write_entries, self.path, self._snapshot())
+        if self.after_flush is not None:
+            # With nothing new to write, pass on the write still in flight so its outcome counts
+            self.after_flush(pending or self._writing)
+        return pending
+
+    # --------------------
+    # Ranking (in-memory order-statistic index; the SQLite backend uses its own)
+    # --------------------
+    def _records(self, group):
+        return self._data.get(group, {}) if group is not None else self._data
+
+    def _index(self, score, group):
+        index = self._indexes.get((score, group))
+        if index is None:
+            sort_key = self.table.sort_key(score)
+            items = ((k, sort_key(r)) for k, r in self._records(group).items())
+            index = self._indexes[(score, group)] = RankIndex(items)
+        return index
+
+    def _reindex(self, key):
+        # Move one top-level record in every built index; a changed guild drops its indexes
+        for score, group in list(self._indexes):
+            if group is not None:
+                if group == key:
+                    del self._indexes[(score, group)]
+                continue
+            index = self._indexes[(score, group)]
+            record = self._data.get(key)
+            if record is None:
+                index.discard(key)
+            else:
+                index.update(key, self.table.sort_key(score)(record))
+
+    async def top(self, score, n=10, group=None):
+        """Highest n records by score as (key, record) pairs, optionally within one guild"""
+        records = self._records(group)
+        return [(key, records[key]) for key, _ in self._index(score, group).top(n)]
+
+    async def rank(self, score, key, group=None):
+        """1-based position of key by score, or None if it has no record"""
+        return self._index(score, group).rank(key)
+
+
+def submit_io(fn, *args):
+    """Run fn on the storage I/O thread, after every write queued before it"""
+    try:
+        return _io.submit(fn, *args)
+    except RuntimeError:
+        # Interpreter shutdown has already drained the I/O thread: write inline
+        done = Future()
+        done.set_result(fn(*args))
+        return done
+
+
+def write_text(path, text):
+    """Atomically replace a text file on the storage I/O thread; returns the write future"""
+    return submit_io(_atomic_write, path, text)
+
+
+def _write_entries(path, entries):
+    # Runs on the I/O thread: encode the copied entries, assemble the document
+    # and swap it in atomically; returns the new fragments for the store to reuse
+    encoded = {}
+    for i, entry in enumerate(entries):
+        if isinstance(entry, tuple):
+            key, raw = entry
+            entries[i] = _encode(key, json.loads(raw))
+            encoded[key] = (raw, entries[i])
+    text = "{\n" + ",\n".join(entries) + "\n}" if entries else "{}"
+    _atomic_write(path, text)
+    return encoded
+
+
+def _atomic_write(path, text):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def preload(*paths):
+    """Read and parse JSON files before their stores are opened; safe to call from any thread"""
+    for path in paths:
+        if path in _stores or path in _preloaded or not os.path.exists(path):
+            continue
+        if STORAGE_BACKEND == "sqlite" and path in TABLES:
+            continue
+        with open(path, "r") as f:
+            _preloaded[path] = json.load(f)
+
+
+def open_store(path, default=None, flush_interval=FLUSH_INTERVAL):
+    """Return the shared store for a JSON file, loading it on first use"""
+    store = _stores.get(path)
+    if store is None:
+        table = TABLES.get(path)
+        if STORAGE_BACKEND == "sqlite" and table is not None:
+            store = SQLiteStore(DATABASE_FILE, table, path, flush_interval)
+        else:
+            store = JSONStore(path, default, flush_interval, table)
+        _stores[path] = store
+    return store
+
+
+def flush_all():
+    """Flush every store and wait for the writes to land (used at shutdown)"""
+    for store in _stores.values():
+        pending = store.flush()
+        if pending is not None:
+            pending.result()
+
+
+atexit.register(flush_all)
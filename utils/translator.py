@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import TRANSLATION_BACKEND
+
+WORKERS = 4
+CACHE_SIZE = 5000
+
+
+class GoogleBackend:
+    """googletrans; blocking, so it only ever runs on the service's threads"""
+
+    def __init__(self):
+        from googletrans import Translator
+        self.translator = Translator()
+
+    def translate(self, texts, dest):
+        return [result.text for result in self.translator.translate(list(texts), dest=dest)]
+
+    def detect(self, text):
+        detected = self.translator.detect(text)
+        return detected.lang, detected.confidence
+
+
+class FakeBackend:
+    """Deterministic local translator for tests, benchmarks and load tests"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def translate(self, texts, dest):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [f"[{dest}] {text}" for text in texts]
+
+    def detect(self, text):
+        self.calls += 1
+        return "en", 1.0
+
+
+BACKENDS = {"google": GoogleBackend, "fake": FakeBackend}
+
+
+def _key(text, dest):
+    return hashlib.blake2b(text.encode(), digest_size=16).digest(), dest
+
+
+class TranslationService:
+    """Async front for a blocking translation backend
+
+    Calls run on a small thread pool so the event loop never waits on the
+    network. Results are cached by (text hash, target), and translate_many
+    sends every uncached text in a single backend call. The backend itself is
+    built on first use, on a pool thread, so loading the cog imports nothing.
+    """
+
+    def __init__(self, backend=None, workers=WORKERS, cache_size=CACHE_SIZE):
+        self._backend = backend
+        self._backend_lock = threading.Lock()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate")
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = BACKENDS[TRANSLATION_BACKEND]()
+        return self._backend
+
+    def _translate(self, texts, dest):
+        return self.backend.translate(texts, dest)
+
+    def _detect(self, text):
+        return self.backend.detect(text)
+
+    def _get(self, key):
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+        return result
+
+    def _put(self, key, result):
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def translate(self, text, dest):
+        return (await self.translate_many([text], dest))[0]
+
+    async def translate_many(self, texts, dest):
+        """Translate a list of texts in order; empty texts come back empty"""
+        keys = [_key(text, dest) for text in texts]
+        results = [self._get(key) if text else "" for key, text in zip(keys, texts)]
+        missing = {}
+        for key, text, result in zip(keys, texts, results):
+            if result is None:
+                missing.setdefault(key, text)
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            loop = asyncio.get_running_loop()
+            translated = await loop.run_in_executor(self._executor, self._translate, list(missing.values()), dest)
+            for key, result in zip(missing, translated):
+                self._put(key, result)
+            fresh = dict(zip(missing, translated))
+            results = [fresh[key] if result is None else result for key, result in zip(keys, results)]
+        return results
+
+    async def detect(self, text):
+        """Return (language code, confidence)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._detect, text)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
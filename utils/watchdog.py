@@ -0,0 +1,122 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from config import LAG_INTERVAL, LAG_THRESHOLD, LAG_REPORT_SIZE
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COGS = os.path.join(ROOT, "cogs") + os.sep
+
+
+def attribute(stack):
+    """(cog, handler, where) for a captured loop stack
+
+    The cog and handler come from the outermost frame in cogs/, i.e. the slash
+    command or listener that was running; `where` is the innermost frame in
+    this repository, the line that was actually blocking.
+    """
+    own = [frame for frame in stack if frame.filename.startswith(ROOT) and "watchdog" not in frame.filename]
+    handler = next((frame for frame in stack if frame.filename.startswith(COGS)), None)
+    cog = os.path.splitext(os.path.basename(handler.filename))[0] if handler else "-"
+    name = handler.name if handler else (own[0].name if own else stack[-1].name)
+    inner = own[-1] if own else stack[-1]
+    return cog, name, f"{os.path.relpath(inner.filename, ROOT)}:{inner.lineno}"
+
+
+class Stall:
+    __slots__ = ("at", "lag", "cog", "handler", "where", "stack")
+
+    def __init__(self, lag, stack):
+        self.at = time.time()
+        self.lag = lag
+        self.stack = stack
+        if stack:
+            self.cog, self.handler, self.where = attribute(stack)
+        else:
+            # The blocking call held the GIL the whole time, or ended between checks
+            self.cog, self.handler, self.where = "?", "?", "not caught in the act"
+
+
+class Watchdog:
+    """Measures event loop lag and captures what the loop was running when it stalls
+
+    A heartbeat task sleeps `interval` seconds and records how late it woke.
+    A thread watches the heartbeat; once it is `threshold` seconds overdue the
+    loop is stuck, and the thread grabs the loop thread's stack right then.
+    """
+
+    def __init__(self, interval=LAG_INTERVAL, threshold=LAG_THRESHOLD, size=LAG_REPORT_SIZE):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags = deque(maxlen=max(int(60 / interval), 1))  # about a minute of samples
+        self.stalls = deque(maxlen=size)
+        self.offenders = {}  # (cog, handler): [count, total lag, worst lag, where]
+        self._beat = time.monotonic()
+        self._pending = None
+        self._stop = threading.Event()
+        self._task = None
+        self._thread = None
+
+    def start(self):
+        """Start watching the running loop; calling it again restarts the heartbeat"""
+        if self._task is not None:
+            self._task.cancel()
+        self._stop.clear()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._pending = None
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        # A thread left over from stop() sees the cleared event and keeps going
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _heartbeat(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self._beat = time.monotonic()
+            lag = self._beat - start - self.interval
+            self.lags.append(lag)
+            stack, self._pending = self._pending, None
+            if lag >= self.threshold:
+                self._record(Stall(lag, stack))
+
+    def _watch(self):
+        while not self._stop.wait(self.interval / 2):
+            if self._pending is None and time.monotonic() - self._beat >= self.interval + self.threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self._pending = traceback.extract_stack(frame)
+
+    def _record(self, stall):
+        self.stalls.append(stall)
+        entry = self.offenders.setdefault((stall.cog, stall.handler), [0, 0.0, 0.0, stall.where])
+        entry[0] += 1
+        entry[1] += stall.lag
+        if stall.lag > entry[2]:
+            entry[2], entry[3] = stall.lag, stall.where
+        print(f"🐢 Event loop blocked {stall.lag * 1000:.0f} ms in {stall.cog}.{stall.handler} ({stall.where})")
+
+    def percentile(self, q):
+        lags = sorted(self.lags)
+        return lags[int(q * (len(lags) - 1))] if lags else 0.0
+
+
+_watchdog = None
+
+
+def get_watchdog():
+    """Return the loop watchdog shared by the bot"""
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = Watchdog()
+    return _watchdog